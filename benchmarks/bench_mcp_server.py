@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+⏱️ Бенчмарк локального MCP сервера
+==================================
+Генерирует документацию на N endpoints (generate_corpus), разбирает ее
+парсером, собирает снимок (mcp_server.py build) и замеряет:
+
+- загрузку данных в процессе: json.load(mcp_server_ultimate_final.json)
+  против открытия снимка (marshal-индекс и mmap блока)
+- старт сервера: от запуска процесса до ответа на initialize
+- задержку запросов к запущенному серверу (stdin/stdout): tools/list по
+  всем страницам через cursor, resources/list и resources/read
+  случайных uri - медиана, p99 и максимум
+
+Использование:
+    python benchmarks/bench_mcp_server.py
+    python benchmarks/bench_mcp_server.py --endpoints 20000 --page-size 500 --requests 2000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generate_corpus import generate_document
+
+from fleethand_ultimate_parser import FleethandUltimateParser
+from mcp_server import MCP_DATA_FILE, build_snapshot_from_results, load_snapshot
+
+SERVER_SCRIPT = str(ROOT / "mcp_server.py")
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+class ServerProcess:
+    def __init__(self, snapshot: str, page_size: int):
+        self.process = subprocess.Popen(
+            [sys.executable, SERVER_SCRIPT, "serve", snapshot, "--page-size", str(page_size)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        self.next_id = 0
+
+    def request(self, method: str, params: Dict = None) -> Dict:
+        self.next_id += 1
+        message = {"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params or {}}
+        self.process.stdin.write(json.dumps(message).encode('utf-8') + b'\n')
+        self.process.stdin.flush()
+        response = json.loads(self.process.stdout.readline())
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+def bench_startup(snapshot: str, page_size: int, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        server = ServerProcess(snapshot, page_size)
+        server.request("initialize", {"protocolVersion": "2025-06-18"})
+        timings.append(time.perf_counter() - start)
+        server.close()
+    return statistics.median(timings)
+
+
+def bench_requests(snapshot: str, page_size: int, requests: int, tools: int) -> Dict[str, List[float]]:
+    server = ServerProcess(snapshot, page_size)
+    server.request("initialize", {"protocolVersion": "2025-06-18"})
+    timings: Dict[str, List[float]] = {"tools/list": [], "resources/list": [], "resources/read": []}
+
+    def timed(method: str, params: Dict = None) -> Dict:
+        start = time.perf_counter()
+        result = server.request(method, params)
+        timings[method].append(time.perf_counter() - start)
+        return result
+
+    listed = 0
+    cursor = None
+    while True:
+        result = timed("tools/list", {"cursor": cursor} if cursor else {})
+        listed += len(result["tools"])
+        cursor = result.get("nextCursor")
+        if cursor is None:
+            break
+    if listed != tools:
+        raise RuntimeError(f"tools/list вернул {listed} tools вместо {tools}")
+
+    uris = []
+    cursor = None
+    while True:
+        result = timed("resources/list", {"cursor": cursor} if cursor else {})
+        uris.extend(resource["uri"] for resource in result["resources"])
+        cursor = result.get("nextCursor")
+        if cursor is None:
+            break
+
+    rng = random.Random(1)
+    for _ in range(requests):
+        timed("resources/read", {"uri": rng.choice(uris)})
+    server.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк MCP сервера по снимку")
+    parser.add_argument("--endpoints", type=int, default=5000, help="Endpoints в синтетическом документе")
+    parser.add_argument("--page-size", type=int, default=100, help="Размер страницы tools/list")
+    parser.add_argument("--requests", type=int, default=1000, help="Запросов resources/read")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов замеров загрузки и старта")
+    parser.add_argument("--mcp-format", choices=("inline", "compact"), default="compact")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workspace:
+        text_file = Path(workspace) / "corpus.txt"
+        text_file.write_text(generate_document(args.endpoints), encoding='utf-8')
+        results_dir = Path(workspace) / "results"
+        print(f"📄 Синтетический документ: {args.endpoints} endpoints, парсинг...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            FleethandUltimateParser().parse(text_file=str(text_file), pdf_path=None, use_cache=False,
+                                            output_dir=str(results_dir), mcp_format=args.mcp_format)
+        snapshot = str(build_snapshot_from_results(str(results_dir)))
+        mcp_file = results_dir / MCP_DATA_FILE
+
+        with open(mcp_file, 'r', encoding='utf-8') as f:
+            tools = len(json.load(f)["tools"])
+
+        def load_json():
+            with open(mcp_file, 'r', encoding='utf-8') as f:
+                json.load(f)
+
+        def open_snapshot():
+            load_snapshot(snapshot).close()
+
+        json_seconds = best_of(args.repeat, load_json)
+        snapshot_seconds = best_of(args.repeat, open_snapshot)
+        print(f"🧰 Tools: {tools}, {args.mcp_format} JSON {mcp_file.stat().st_size / 1e6:.2f} MB, "
+              f"снимок {Path(snapshot).stat().st_size / 1e6:.2f} MB")
+        print(f"📥 Загрузка: json.load {json_seconds * 1000:.1f} мс, снимок (индекс + mmap) "
+              f"{snapshot_seconds * 1000:.1f} мс")
+
+        startup = bench_startup(snapshot, args.page_size, args.repeat)
+        print(f"🚀 Старт сервера до ответа на initialize (медиана): {startup * 1000:.1f} мс")
+
+        timings = bench_requests(snapshot, args.page_size, args.requests, tools)
+        print(f"{'request':>16} {'count':>6} {'p50, мс':>9} {'p99, мс':>9} {'max, мс':>9}")
+        for method, values in timings.items():
+            values.sort()
+            print(f"{method:>16} {len(values):>6} {percentile(values, 0.50) * 1000:>9.3f} "
+                  f"{percentile(values, 0.99) * 1000:>9.3f} {values[-1] * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
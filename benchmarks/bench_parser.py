@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+⏱️ Бенчмарк стадий парсера
+==========================
+Замеряет на синтетических документах разного размера (generate_corpus)
+или на готовом extracted_text.txt стадии FleethandUltimateParser:
+
+    extract_endpoints_ultimate -> create_mcp_data_ultimate
+    -> analyze_quality_ultimate -> save_results_ultimate
+
+Для каждой стадии выводятся время, endpoints/s, MB/s (объем текста
+документа в UTF-8 на время стадии) и пиковый RSS процесса после стадии.
+Каждый размер замеряется в отдельном процессе, чтобы пиковый RSS одного
+размера не переходил в следующий.
+
+Использование:
+    python benchmarks/bench_parser.py
+    python benchmarks/bench_parser.py --sizes 10,1000,50000 --response-items 10
+    python benchmarks/bench_parser.py --text extracted_text.txt --json results.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generate_corpus import generate_document
+
+from fleethand_ultimate_parser import FleethandUltimateParser
+
+DEFAULT_SIZES = "10,100,1000,10000"
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса (ru_maxrss: КБ в Linux, байты в macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_stages(text: str, repeat: int = 1) -> Dict:
+    """Все стадии парсера на одном тексте (лучшее время из repeat)"""
+    megabytes = len(text.encode("utf-8")) / (1024 * 1024)
+    best: Dict[str, float] = {}
+    rss: Dict[str, float] = {}
+    endpoint_count = 0
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for _ in range(repeat):
+            parser = FleethandUltimateParser()
+            with contextlib.redirect_stdout(io.StringIO()):
+                timings = {}
+
+                start = time.perf_counter()
+                endpoints = parser.extract_endpoints_ultimate(text)
+                timings["extract_endpoints_ultimate"] = time.perf_counter() - start
+                rss["extract_endpoints_ultimate"] = peak_rss_mb()
+
+                start = time.perf_counter()
+                mcp_data = parser.create_mcp_data_ultimate(endpoints)
+                timings["create_mcp_data_ultimate"] = time.perf_counter() - start
+                rss["create_mcp_data_ultimate"] = peak_rss_mb()
+
+                start = time.perf_counter()
+                quality_report = parser.analyze_quality_ultimate(endpoints)
+                timings["analyze_quality_ultimate"] = time.perf_counter() - start
+                rss["analyze_quality_ultimate"] = peak_rss_mb()
+
+                start = time.perf_counter()
+                parser.save_results_ultimate(endpoints, mcp_data, quality_report, output_dir,
+                                             parser.payloads.to_dict())
+                timings["save_results_ultimate"] = time.perf_counter() - start
+                rss["save_results_ultimate"] = peak_rss_mb()
+
+            endpoint_count = len(endpoints)
+            for stage, seconds in timings.items():
+                best[stage] = min(best.get(stage, seconds), seconds)
+
+    stages = []
+    for stage, seconds in best.items():
+        stages.append({
+            "stage": stage,
+            "seconds": round(seconds, 4),
+            "endpoints_per_second": round(endpoint_count / seconds, 1) if seconds else None,
+            "mb_per_second": round(megabytes / seconds, 2) if seconds else None,
+            "peak_rss_mb": round(rss[stage], 1)
+        })
+    total = sum(best.values())
+    return {
+        "endpoints": endpoint_count,
+        "megabytes": round(megabytes, 3),
+        "total_seconds": round(total, 4),
+        "endpoints_per_second": round(endpoint_count / total, 1) if total else None,
+        "stages": stages
+    }
+
+
+def bench_generated(size: int, response_items: int, seed: int, repeat: int) -> Dict:
+    text = generate_document(size, response_items=response_items, seed=seed)
+    result = run_stages(text, repeat)
+    result["size"] = size
+    return result
+
+
+def bench_text_file(path: str, repeat: int) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    result = run_stages(text, repeat)
+    result["size"] = path
+    return result
+
+
+def in_fresh_process(function, *args) -> Dict:
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(function, *args).result()
+
+
+def print_result(result: Dict):
+    print(f"\n📄 {result['size']}: {result['endpoints']} endpoints, {result['megabytes']:.2f} MB, "
+          f"всего {result['total_seconds']:.3f}с ({result['endpoints_per_second']} endpoints/s)")
+    print(f"{'stage':>28} {'wall, s':>9} {'endpoints/s':>12} {'MB/s':>8} {'peak RSS, MB':>13}")
+    for row in result["stages"]:
+        print(f"{row['stage']:>28} {row['seconds']:>9.4f} {row['endpoints_per_second'] or 0:>12.0f} "
+              f"{row['mb_per_second'] or 0:>8.2f} {row['peak_rss_mb']:>13.1f}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Бенчмарк стадий парсера")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Размеры документов в endpoints через запятую (по умолчанию {DEFAULT_SIZES})")
+    parser.add_argument("--text", help="Замерить готовый файл извлеченного текста вместо генерации")
+    parser.add_argument("--response-items", type=int, default=3,
+                        help="Максимум элементов в payload примера ответа")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1, help="Повторов на размер (берется лучшее)")
+    parser.add_argument("--json", help="Сохранить результаты в JSON файл")
+    args = parser.parse_args(argv)
+
+    results = []
+    if args.text:
+        results.append(in_fresh_process(bench_text_file, args.text, args.repeat))
+        print_result(results[-1])
+    else:
+        for size in (int(s) for s in args.sizes.split(",")):
+            results.append(in_fresh_process(bench_generated, size, args.response_items,
+                                            args.seed, args.repeat))
+            print_result(results[-1])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Результаты сохранены в {args.json}")
+
+
+if __name__ == "__main__":
+    main()
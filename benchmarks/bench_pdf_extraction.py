@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+⏱️ Бенчмарк извлечения текста из PDF
+====================================
+Сравнивает последовательное и многопроцессное извлечение страниц
+(pdf_text.iter_pdf_pages с разным workers) на одном документе.
+
+Использование:
+    python benchmarks/bench_pdf_extraction.py documentation.pdf
+    python benchmarks/bench_pdf_extraction.py --generate 1500 --workers 1,2,4,8,16
+
+--generate N создает синтетический PDF на N страниц (нужен PyMuPDF),
+если реального документа на 1000+ страниц под рукой нет.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdf_text import format_pages, iter_pdf_pages, open_pdf
+
+
+def generate_pdf(path: str, pages: int):
+    """Создает PDF с разметкой API документации в формате Fleethand"""
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for page_no in range(pages):
+        page = doc.new_page()
+        lines = []
+        for block in range(4):
+            n = page_no * 4 + block
+            lines += [
+                f"Get vehicle data {n}",
+                f"This method returns information about vehicle {n}.",
+                "Request", "Method", "URL", "GET", f"/api/vehicle/item{n}",
+                "Request headers", "Key", "Data type", "Required", "Description",
+                "apiKey", "String", "Yes", "Encoded api key",
+                "Response example", "Status", "200", "Response",
+                '{ "status": 200, "payload": [] }',
+            ]
+        page.insert_text((40, 40), "\n".join(lines), fontsize=7)
+    doc.save(path)
+    doc.close()
+
+
+def run_once(pdf_path: str, workers: int):
+    start = time.perf_counter()
+    characters = 0
+    pages = 0
+    for chunk in format_pages(iter_pdf_pages(pdf_path, workers)):
+        characters += len(chunk)
+        pages += 1
+    return time.perf_counter() - start, pages, characters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк извлечения текста из PDF")
+    parser.add_argument("pdf", nargs="?", help="Путь к PDF (по умолчанию - сгенерированный)")
+    parser.add_argument("--generate", type=int, default=1200,
+                        help="Сколько страниц сгенерировать, если PDF не указан")
+    parser.add_argument("--workers", default=None,
+                        help="Список значений workers через запятую (по умолчанию 1,2,4,...,cpu)")
+    parser.add_argument("--repeat", type=int, default=3, help="Повторов на каждое значение")
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+    else:
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= cpu_count:
+            worker_counts.append(worker_counts[-1] * 2)
+        if worker_counts[-1] != cpu_count:
+            worker_counts.append(cpu_count)
+
+    tmp_dir = None
+    pdf_path = args.pdf
+    if not pdf_path:
+        tmp_dir = tempfile.TemporaryDirectory()
+        pdf_path = os.path.join(tmp_dir.name, "synthetic.pdf")
+        print(f"📄 Генерируем синтетический PDF на {args.generate} страниц...")
+        generate_pdf(pdf_path, args.generate)
+
+    doc = open_pdf(pdf_path)
+    page_count = len(doc)
+    doc.close()
+
+    print(f"📄 {pdf_path}: {page_count} страниц, CPU: {cpu_count}")
+    print(f"{'workers':>8} {'best, s':>10} {'pages/s':>10} {'speedup':>8}")
+
+    baseline = None
+    for workers in worker_counts:
+        timings = []
+        for _ in range(args.repeat):
+            elapsed, pages, characters = run_once(pdf_path, workers)
+            timings.append(elapsed)
+        best = min(timings)
+        if baseline is None:
+            baseline = best
+        print(f"{workers:>8} {best:>10.3f} {pages / best:>10.0f} {baseline / best:>7.2f}x")
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
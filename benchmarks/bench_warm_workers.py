@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+⏱️ Бенчмарк: прогретые процессы против запуска парсера на каждый документ
+=========================================================================
+Сравнивает два способа обработки загрузки в веб-интерфейсе:
+- subprocess: новый интерпретатор python fleethand_ultimate_parser.py на
+  каждый документ, результаты читаются из JSON файлов (прежний run_parser)
+- warm: процесс пула с уже загруженными парсером и PyMuPDF
+  (parser_worker.init_worker + parser_worker.parse_pdf)
+
+Для каждого способа выводятся холодный старт (от запуска до первого
+результата) и среднее/медиана на запрос после него, а также накладные
+расходы на запрос относительно парсинга прямо в текущем процессе.
+Кэш парсера отключен, чтобы каждый запрос выполнял полный парсинг.
+
+Использование:
+    python benchmarks/bench_warm_workers.py documentation.pdf
+    python benchmarks/bench_warm_workers.py --generate 50 --requests 20
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_pdf_extraction import generate_pdf
+from parser_worker import init_worker, parse_pdf
+
+PARSER_SCRIPT = str(ROOT / "fleethand_ultimate_parser.py")
+
+
+def run_subprocess(pdf_path: str) -> dict:
+    """Прежний путь: отдельный интерпретатор и обмен через файлы"""
+    workspace = tempfile.mkdtemp(prefix="bench_job_")
+    try:
+        results_dir = Path(workspace) / "out"
+        subprocess.run(
+            [sys.executable, PARSER_SCRIPT, "--pdf", pdf_path,
+             "--text", os.path.join(workspace, "extracted_text.txt"),
+             "--output", str(results_dir), "--no-cache"],
+            capture_output=True, text=True, check=True
+        )
+        results = {}
+        for json_file in results_dir.glob("*.json"):
+            with open(json_file, "r", encoding="utf-8") as f:
+                results[json_file.stem] = json.load(f)
+        return results
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def bench_subprocess(pdf_path: str, requests: int):
+    timings = []
+    for _ in range(requests + 1):
+        start = time.perf_counter()
+        run_subprocess(pdf_path)
+        timings.append(time.perf_counter() - start)
+    return timings[0], timings[1:]
+
+
+def bench_warm(pdf_path: str, requests: int):
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=1, initializer=init_worker) as executor:
+        result = executor.submit(parse_pdf, pdf_path, False).result()
+        if not result["success"]:
+            raise RuntimeError(result["error"])
+        cold = time.perf_counter() - start
+
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            executor.submit(parse_pdf, pdf_path, False).result()
+            timings.append(time.perf_counter() - start)
+    return cold, timings
+
+
+def bench_in_process(pdf_path: str, requests: int):
+    """Чистое время парсинга, без пересылки между процессами"""
+    init_worker()
+    parse_pdf(pdf_path, use_cache=False)
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        parse_pdf(pdf_path, use_cache=False)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк прогретых процессов парсера")
+    parser.add_argument("pdf", nargs="?", help="Путь к PDF (по умолчанию - сгенерированный)")
+    parser.add_argument("--generate", type=int, default=20,
+                        help="Сколько страниц сгенерировать, если PDF не указан")
+    parser.add_argument("--requests", type=int, default=10,
+                        help="Запросов после холодного старта")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    pdf_path = args.pdf
+    if not pdf_path:
+        tmp_dir = tempfile.TemporaryDirectory()
+        pdf_path = os.path.join(tmp_dir.name, "synthetic.pdf")
+        print(f"📄 Генерируем синтетический PDF на {args.generate} страниц...")
+        generate_pdf(pdf_path, args.generate)
+    pdf_path = os.path.abspath(pdf_path)
+
+    print(f"📄 {pdf_path}, запросов: {args.requests}")
+    baseline = statistics.mean(bench_in_process(pdf_path, args.requests))
+
+    print(f"{'mode':>12} {'cold, s':>9} {'mean, s':>9} {'median, s':>10} {'overhead, s':>12}")
+    print(f"{'in-process':>12} {'-':>9} {baseline:>9.3f} {'-':>10} {'-':>12}")
+    for name, bench in (("subprocess", bench_subprocess), ("warm", bench_warm)):
+        cold, timings = bench(pdf_path, args.requests)
+        mean = statistics.mean(timings)
+        print(f"{name:>12} {cold:>9.3f} {mean:>9.3f} {statistics.median(timings):>10.3f} "
+              f"{mean - baseline:>12.3f}")
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+🏭 Генератор синтетической документации API
+===========================================
+Создает текст в том же формате, что дает извлечение из PDF Fleethand и
+что ожидает FleethandUltimateParser: страницы "=== Страница N ===",
+блоки Request / Method / URL, таблицы заголовков и параметров по четыре
+строки (Key / Data type / Required / Description), тело запроса и
+Response example с JSON заданного размера.
+
+Использование:
+    python benchmarks/generate_corpus.py 1000 -o corpus_1000.txt
+    python benchmarks/generate_corpus.py 50000 --response-items 20 -o big.txt
+
+Генерация детерминирована (--seed), поэтому замеры на одном и том же
+размере сравнимы между запусками.
+"""
+
+import argparse
+import json
+import random
+import sys
+from typing import Iterator, List
+
+CATEGORIES = [
+    'activities', 'vehicle', 'driver', 'document', 'report', 'task', 'order',
+    'partner', 'poi', 'payment-card', 'eco', 'tacho', 'forms', 'misc'
+]
+METHODS = ['GET', 'POST', 'PUT', 'DELETE']
+
+HEADERS = [
+    ('apiKey', 'String', 'Yes', 'Encoded api key'),
+    ('externalId', 'String', 'Yes', 'External id of client'),
+]
+PARAMETERS = [
+    ('vehicleId', 'Long', 'Yes', 'Vehicle identifier'),
+    ('from', 'DateTime', 'No', 'Start of period'),
+    ('to', 'DateTime', 'No', 'End of period'),
+]
+
+
+def table(title: str, first_column: str, rows) -> List[str]:
+    """Таблица в построчном формате PDF: заголовок, 4 колонки, строки по 4 ячейки"""
+    lines = [title, first_column, 'Data type', 'Required', 'Description']
+    for row in rows:
+        lines.extend(row)
+    return lines
+
+
+def response_payload(rng: random.Random, index: int, items: int) -> dict:
+    return {
+        "status": 200,
+        "payload": [
+            {
+                "id": index * 1000 + j,
+                "vehicleId": rng.randint(1000, 9999),
+                "code": rng.choice(["ACTIVITY_BUY", "ACTIVITY_SELL", "TRIP_START"]),
+                "createdAt": "2024-01-01T00:00:00Z",
+                "tags": [f"tag{k}" for k in range(j % 3)]
+            }
+            for j in range(items)
+        ]
+    }
+
+
+def iter_endpoint_blocks(endpoints: int, response_items: int = 3,
+                         seed: int = 1) -> Iterator[str]:
+    """Блоки endpoints в порядке документа"""
+    rng = random.Random(seed)
+    for i in range(endpoints):
+        method = rng.choice(METHODS)
+        category = rng.choice(CATEGORIES)
+        url = f"/api/{category}/item{i}"
+
+        lines = [
+            f"Get {category} item {i}",
+            f"This method returns information about {category} number {i}.",
+            "Request", "Method", "URL", method, url,
+        ]
+        lines += table("Request headers", "Key", HEADERS)
+        if i % 2:
+            lines += table("Request parameters", "Parameter", PARAMETERS[:1 + i % len(PARAMETERS)])
+        if method in ('POST', 'PUT'):
+            lines.append("Request body")
+            lines.append(json.dumps({"code": "ACT", "idx": i, "active": True}, indent=2))
+        lines += ["Response example", "Status", "200", "Response"]
+        lines.append(json.dumps(response_payload(rng, i, rng.randint(0, response_items)), indent=2))
+        yield " \n".join(lines) + " \n\n"
+
+
+def iter_document(endpoints: int, response_items: int = 3, seed: int = 1,
+                  endpoints_per_page: int = 3) -> Iterator[str]:
+    """Документ порциями: страница за страницей, как pdf_text.format_pages"""
+    page_no = 1
+    yield f"=== Страница {page_no} ===\n\nFleethand API \n"
+    for i, block in enumerate(iter_endpoint_blocks(endpoints, response_items, seed)):
+        if i and i % endpoints_per_page == 0:
+            page_no += 1
+            yield f"\n=== Страница {page_no} ===\n\n{page_no} \n"
+        yield block
+
+
+def generate_document(endpoints: int, response_items: int = 3, seed: int = 1,
+                      endpoints_per_page: int = 3) -> str:
+    return ''.join(iter_document(endpoints, response_items, seed, endpoints_per_page)).strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генератор синтетической документации API")
+    parser.add_argument("endpoints", type=int, help="Количество endpoints (10 - 50000+)")
+    parser.add_argument("-o", "--output", help="Файл для текста (по умолчанию stdout)")
+    parser.add_argument("--response-items", type=int, default=3,
+                        help="Максимум элементов в payload примера ответа")
+    parser.add_argument("--per-page", type=int, default=3, help="Endpoints на страницу")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    text = generate_document(args.endpoints, args.response_items, args.seed, args.per_page)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"📄 {args.output}: {args.endpoints} endpoints, "
+              f"{len(text.encode('utf-8')) / (1024 * 1024):.1f} MB", file=sys.stderr)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,10 +11,131 @@ from typing import Dict, List, Any
 from datetime import datetime
 import os
 
+from json_scanner import JsonSpanIndex
+from multi_pattern_scanner import MultiPatternScanner
+from patterns import REGISTRY
+from payload_table import PayloadTable
+from text_span import TextSource
+from word_index import WordIndex, iter_words
+
+# 🧩 Паттерны компилируются один раз при импорте (общий реестр patterns.py)
+
+# Используем улучшенный паттерн для Fleethand
+ENDPOINT_PATTERN = REGISTRY.compile(
+    'complete.endpoint',
+    r'Method\s*\n\s*URL\s*\n\s*(GET|POST|PUT|DELETE|PATCH)\s*\n\s*(/api/[^\s\n]+)',
+    re.MULTILINE
+)
+
+# JSON структуры документации находит json_scanner.JsonSpanIndex (один
+# проход по тексту); моделью считается значение хотя бы с одним ключом
+JSON_KEY_RE = REGISTRY.compile('complete.json_key', r'"[^"\n]*"\s*:')
+
+# Подпись перед JSON (ближайшая непустая строка) -> тип примера
+JSON_EXAMPLE_LABELS = {
+    'response': 'response',
+    'request body': 'request',
+    '```json': 'json'
+}
+# Строки разрыва страницы между подписью и JSON пропускаются
+PAGE_BREAK_LINE_RE = REGISTRY.compile('complete.page_break_line', r'=== Страница \d+ ===|\d+')
+MAX_LABEL_LINES = 6
+
+# Ищем все упоминания параметров в тексте
+PARAM_PATTERNS = REGISTRY.compile_all('complete.param', [
+    r'(\w+Id)\s*[-–:]\s*([^.\n]+)',  # ID параметры
+    r'(\w+)\s*\(([^)]+)\)\s*[-–:]\s*([^.\n]+)', # Параметры с типами
+    r'`(\w+)`\s*[-–:]\s*([^.\n]+)', # Параметры в backticks
+    r'(\w+)\s*parameter\s*[-–:]\s*([^.\n]+)', # Явные параметры
+], re.IGNORECASE)
+
+# Примеры, которые не являются JSON (JSON примеры - из JsonSpanIndex)
+EXAMPLE_PATTERNS = [
+    (REGISTRY.compile(f'complete.example.{example_type}', pattern, re.DOTALL | re.IGNORECASE), example_type)
+    for pattern, example_type in [
+        (r'curl\s+.*?(?=\n\n|\nMethod|\n[A-Z])', 'curl'),
+        (r'```\n(.*?)\n```', 'code')
+    ]
+]
+
+# Ищем HTTP коды и описания ошибок
+ERROR_PATTERNS = REGISTRY.compile_all('complete.error', [
+    r'\b([4-5]\d{2})\s*[-–:]\s*([^.\n]+)',  # HTTP коды
+    r'error[:\s]*([^.\n]+)', # Общие ошибки
+    r'Error[:\s]*([^.\n]+)', # Ошибки с заглавной буквы
+    r'failed[:\s]*([^.\n]+)', # Сбои
+], re.IGNORECASE)
+
+# Ищем упоминания авторизации и ключей
+AUTH_PATTERNS = REGISTRY.compile_all('complete.auth', [
+    r'(API[_\s]?[Kk]ey|Token|Bearer|Authorization)[:\s]*([^.\n]+)',
+    r'(authentication|authorization)[:\s]*([^.\n]+)',
+    r'(key|token|bearer)[:\s]*([^.\n]+)',
+], re.IGNORECASE)
+
+WEBHOOK_PATTERNS = REGISTRY.compile_all('complete.webhook', [
+    r'(webhook|event|notification|callback)[:\s]*([^.\n]+)',
+    r'(event[_\s]?type|eventType)[:\s]*([^.\n]+)',
+], re.IGNORECASE)
+
+LIMIT_PATTERNS = REGISTRY.compile_all('complete.limit', [
+    r'(limit|maximum|max|minimum|min|rate)[:\s]*([^.\n]+)',
+    r'(\d+)\s*(per|/)\s*(second|minute|hour|day|request)',
+    r'(timeout|delay)[:\s]*([^.\n]+)',
+], re.IGNORECASE)
+
+RULE_PATTERNS = REGISTRY.compile_all('complete.rule', [
+    r'(must|should|cannot|required|mandatory|optional)[:\s]*([^.\n]+)',
+    r'(rule|constraint|limitation|requirement)[:\s]*([^.\n]+)',
+    r'(note|important|warning)[:\s]*([^.\n]+)',
+], re.IGNORECASE)
+
+# Ищем последовательности действий
+WORKFLOW_PATTERNS = REGISTRY.compile_all('complete.workflow', [
+    r'(first|then|next|after|finally)[:\s]*([^.\n]+)',
+    r'(step\s*\d+)[:\s]*([^.\n]+)',
+    r'(workflow|process|scenario)[:\s]*([^.\n]+)',
+], re.IGNORECASE)
+
+INTEGRATION_PATTERNS = REGISTRY.compile_all('complete.integration', [
+    r'(integration|connect|sync|import|export)[:\s]*([^.\n]+)',
+    r'(third[_\s]?party|external)[:\s]*([^.\n]+)',
+], re.IGNORECASE)
+
+PERMISSION_PATTERNS = REGISTRY.compile_all('complete.permission', [
+    r'(role|permission|access|privilege)[:\s]*([^.\n]+)',
+    r'(admin|user|manager|operator)[:\s]*([^.\n]+)',
+], re.IGNORECASE)
+
+VALIDATION_PATTERNS = REGISTRY.compile_all('complete.validation', [
+    r'(valid|invalid|validate|validation)[:\s]*([^.\n]+)',
+    r'(format|pattern|regex)[:\s]*([^.\n]+)',
+    r'(length|size|range)[:\s]*([^.\n]+)',
+], re.IGNORECASE)
+
+# Паттерны-триггеры всех текстовых баз знаний сканируются за один проход
+TRIGGER_SCANNER = MultiPatternScanner({
+    'errors': ERROR_PATTERNS,
+    'auth': AUTH_PATTERNS,
+    'webhooks': WEBHOOK_PATTERNS,
+    'rate_limits': LIMIT_PATTERNS,
+    'business_rules': RULE_PATTERNS,
+    'workflows': WORKFLOW_PATTERNS,
+    'integrations': INTEGRATION_PATTERNS,
+    'permissions': PERMISSION_PATTERNS,
+    'validations': VALIDATION_PATTERNS,
+})
+
+
 class CompleteFleethandExtractor:
     def __init__(self, text_file='extracted_text.txt'):
         self.text_file = text_file
         self.text = self.load_text()
+        # Окна контекста совпадений - смещения в этом тексте (text_span)
+        self.source = TextSource(self.text)
+        
+        # Уникальные структуры моделей: models ссылаются на них по structure_id
+        self.model_structures = PayloadTable()
         
         # Создаем папку для всех баз знаний
         self.output_dir = 'complete_knowledge_bases'
@@ -38,27 +159,92 @@ class CompleteFleethandExtractor:
             'data_types': [],      # Типы данных и форматы
             'validations': []      # Правила валидации
         }
+        
+        # Совпадения триггеров по базам знаний (заполняются при первом обращении)
+        self._trigger_matches = None
+        
+        # Индексы слов документа и путей endpoints (строятся при первом обращении)
+        self._word_index = None
+        # JSON значения документа (строится при первом обращении)
+        self._json_spans = None
+        self._endpoint_word_index = None
     
     def load_text(self):
         """Загружаем текст документации"""
         with open(self.text_file, 'r', encoding='utf-8') as f:
             return f.read()
     
+    def trigger_matches(self, kb_name):
+        """Совпадения паттернов базы знаний в порядке прежних циклов finditer.
+        
+        Текст сканируется один раз сразу для всех баз знаний.
+        """
+        if self._trigger_matches is None:
+            self._trigger_matches = TRIGGER_SCANNER.scan(self.text)
+        return self._trigger_matches[kb_name]
+    
+    @property
+    def word_index(self):
+        """Позиционный индекс слов документа (строится один раз)"""
+        if self._word_index is None:
+            self._word_index = WordIndex(self.text)
+        return self._word_index
+    
+    @property
+    def json_spans(self):
+        """Все JSON объекты и массивы верхнего уровня (один проход по тексту)"""
+        if self._json_spans is None:
+            self._json_spans = JsonSpanIndex(self.text)
+        return self._json_spans
+    
+    def json_label(self, position):
+        """Подпись перед JSON в position: ближайшая непустая строка выше
+        (или текст строки перед скобкой) в нижнем регистре, без двоеточия"""
+        end = position
+        for _ in range(MAX_LABEL_LINES):
+            line_start = self.text.rfind('\n', 0, end) + 1
+            line = self.text[line_start:end].strip()
+            if line and not PAGE_BREAK_LINE_RE.fullmatch(line):
+                return line.rstrip(':').strip().lower()
+            if line_start == 0:
+                break
+            end = line_start - 1
+        return ''
+    
+    def json_example_type(self, span):
+        """Тип примера для JSON значения по его подписи (None - не пример)"""
+        label = self.json_label(span.start)
+        if label in JSON_EXAMPLE_LABELS:
+            return JSON_EXAMPLE_LABELS[label]
+        if label.endswith('example'):
+            return 'example'
+        return None
+    
+    def labeled_json(self, context, example_type):
+        """Первое JSON значение окна context с подписью нужного типа"""
+        for span in self.json_spans.between(context.start, context.end):
+            if self.json_example_type(span) == example_type:
+                value = self.json_spans.value(span)
+                try:
+                    return json.loads(value)
+                except ValueError:
+                    return value
+        return None
+    
     def extract_endpoints(self):
         """1. Извлекаем все API endpoints"""
         print("📍 Извлекаем Endpoints...")
         
-        # Используем улучшенный паттерн для Fleethand
-        pattern = r'Method\s*\n\s*URL\s*\n\s*(GET|POST|PUT|DELETE|PATCH)\s*\n\s*(/api/[^\s\n]+)'
-        
-        for match in re.finditer(pattern, self.text, re.MULTILINE):
+        matches = list(ENDPOINT_PATTERN.finditer(self.text))
+        for i, match in enumerate(matches):
             method = match.group(1)
             path = match.group(2)
             
-            # Получаем контекст
-            start = max(0, match.start() - 1000)
-            end = min(len(self.text), match.end() + 2000)
-            context = self.text[start:end]
+            # Получаем контекст (окно без копирования текста)
+            context = self.source.around(match.start(), match.end(), before=1000, after=2000)
+            # Тело запроса и пример ответа - до следующего endpoint
+            next_start = matches[i + 1].start() if i + 1 < len(matches) else len(self.text)
+            details = self.source.span(match.end(), next_start)
             
             endpoint_data = {
                 'id': f"{method}_{path.replace('/', '_').replace('-', '_')}",
@@ -68,14 +254,14 @@ class CompleteFleethandExtractor:
                 'description': self.extract_description(context),
                 'summary': self.extract_summary(context),
                 'auth_required': True,
-                'deprecated': 'deprecated' in context.lower(),
+                'deprecated': context.contains_lower('deprecated'),
                 'request_content_type': 'application/json',
                 'response_content_type': 'application/json',
                 'tags': self.extract_tags(path, context),
                 'complexity': self.assess_complexity(context),
                 'parameters': self.extract_endpoint_parameters(context),
-                'request_body': self.extract_request_body(context),
-                'response_example': self.extract_response_example(context)
+                'request_body': self.extract_request_body(details),
+                'response_example': self.extract_response_example(details)
             }
             
             self.knowledge_bases['endpoints'].append(endpoint_data)
@@ -86,57 +272,49 @@ class CompleteFleethandExtractor:
         """2. Извлекаем модели данных"""
         print("📊 Извлекаем Models & Schemas...")
         
-        # Ищем JSON структуры в документации
-        json_patterns = [
-            r'\{[^{}]*"[^"]*"\s*:[^{}]*\}',  # Простые объекты
-            r'\{[^{}]*\{[^{}]*\}[^{}]*\}',   # Вложенные объекты
-            r'\[[^\[\]]*\{[^{}]*\}[^\[\]]*\]' # Массивы объектов
-        ]
-        
         model_id = 1
-        for pattern in json_patterns:
-            for match in re.finditer(pattern, self.text, re.DOTALL):
-                json_str = match.group(0)
+        for span in self.json_spans:
+            # Разумные размеры и хотя бы один ключ
+            if not 50 < span.end - span.start < 2000:
+                continue
+            if not JSON_KEY_RE.search(self.text, span.start, span.end):
+                continue
+            json_str = self.json_spans.value(span)
+            try:
+                structure = json.loads(json_str)
+            except ValueError:
+                structure = json_str
+            try:
+                # Пытаемся понять что это за модель
+                context = self.source.around(span.start, span.end, before=200, after=200)
                 
-                if len(json_str) > 50 and len(json_str) < 2000:  # Разумные размеры
-                    try:
-                        # Пытаемся понять что это за модель
-                        context = self.text[max(0, match.start()-200):min(len(self.text), match.end()+200)]
-                        
-                        model_data = {
-                            'id': f'model_{model_id}',
-                            'model_name': self.extract_model_name(context, json_str),
-                            'structure': json_str,
-                            'fields': self.parse_json_fields(json_str),
-                            'category': self.detect_model_category(context),
-                            'usage_context': context[:300],
-                            'is_request': 'request' in context.lower(),
-                            'is_response': 'response' in context.lower(),
-                            'validation_rules': self.extract_validation_from_context(context)
-                        }
-                        
-                        self.knowledge_bases['models'].append(model_data)
-                        model_id += 1
-                    except Exception as e:
-                        continue
+                model_data = {
+                    'id': f'model_{model_id}',
+                    'model_name': self.extract_model_name(context, json_str),
+                    'structure_id': self.model_structures.intern(structure),
+                    'fields': self.parse_json_fields(json_str),
+                    'category': self.detect_model_category(context),
+                    'usage_context': context.head(300).as_offsets(),
+                    'is_request': context.contains_lower('request'),
+                    'is_response': context.contains_lower('response'),
+                    'validation_rules': self.extract_validation_from_context(context)
+                }
+                
+                self.knowledge_bases['models'].append(model_data)
+                model_id += 1
+            except Exception as e:
+                continue
         
-        print(f"   ✅ Найдено {len(self.knowledge_bases['models'])} моделей")
+        print(f"   ✅ Найдено {len(self.knowledge_bases['models'])} моделей "
+              f"({len(self.model_structures)} уникальных структур)")
     
     def extract_parameters(self):
         """3. Детально извлекаем параметры"""
         print("🔧 Извлекаем Parameters...")
         
-        # Ищем все упоминания параметров в тексте
-        param_patterns = [
-            r'(\w+Id)\s*[-–:]\s*([^.\n]+)',  # ID параметры
-            r'(\w+)\s*\(([^)]+)\)\s*[-–:]\s*([^.\n]+)', # Параметры с типами
-            r'`(\w+)`\s*[-–:]\s*([^.\n]+)', # Параметры в backticks
-            r'(\w+)\s*parameter\s*[-–:]\s*([^.\n]+)', # Явные параметры
-        ]
-        
         param_id = 1
-        for pattern in param_patterns:
-            for match in re.finditer(pattern, self.text, re.IGNORECASE):
+        for pattern in PARAM_PATTERNS:
+            for match in pattern.finditer(self.text):
                 if len(match.groups()) >= 2:
                     param_name = match.group(1)
                     param_desc = match.groups()[-1]
@@ -164,24 +342,15 @@ class CompleteFleethandExtractor:
         """4. Извлекаем примеры кода"""
         print("💻 Извлекаем Examples...")
         
-        # Ищем различные типы примеров
-        example_patterns = [
-            (r'curl\s+.*?(?=\n\n|\nMethod|\n[A-Z])', 'curl'),
-            (r'```json\n(.*?)\n```', 'json'),
-            (r'```\n(.*?)\n```', 'code'),
-            (r'Example[:\s]*\n([^=]+?)(?=\n=|\nMethod|\n[A-Z])', 'example'),
-            (r'Response[:\s]*\n([^=]+?)(?=\n=|\nMethod|\n[A-Z])', 'response')
-        ]
-        
         example_id = 1
-        for pattern, example_type in example_patterns:
-            for match in re.finditer(pattern, self.text, re.DOTALL | re.IGNORECASE):
+        for pattern, example_type in EXAMPLE_PATTERNS:
+            for match in pattern.finditer(self.text):
                 example_text = match.group(1) if len(match.groups()) > 0 else match.group(0)
                 example_text = example_text.strip()
                 
                 if len(example_text) > 20 and len(example_text) < 5000:
                     # Получаем контекст для понимания к какому endpoint относится
-                    context = self.text[max(0, match.start()-500):min(len(self.text), match.end()+100)]
+                    context = self.source.around(match.start(), match.end(), before=500, after=100)
                     
                     example_data = {
                         'id': f'example_{example_id}',
@@ -197,46 +366,57 @@ class CompleteFleethandExtractor:
                     self.knowledge_bases['examples'].append(example_data)
                     example_id += 1
         
+        # JSON примеры: значения с подписью Response / ... example / Request body
+        for span in self.json_spans:
+            example_type = self.json_example_type(span)
+            if example_type is None or not 20 < span.end - span.start < 5000:
+                continue
+            example_text = self.json_spans.value(span)
+            context = self.source.around(span.start, span.end, before=500, after=100)
+            
+            self.knowledge_bases['examples'].append({
+                'id': f'example_{example_id}',
+                'type': example_type,
+                'content': example_text,
+                'title': self.extract_example_title(context),
+                'related_endpoint': self.find_related_endpoint(context),
+                'category': self.detect_example_category(context),
+                'language': self.detect_language(example_text),
+                'description': self.extract_example_description(context)
+            })
+            example_id += 1
+        
         print(f"   ✅ Найдено {len(self.knowledge_bases['examples'])} примеров")
     
     def extract_errors(self):
         """5. Извлекаем коды ошибок"""
         print("❌ Извлекаем Error Codes...")
         
-        # Ищем HTTP коды и описания ошибок
-        error_patterns = [
-            r'\b([4-5]\d{2})\s*[-–:]\s*([^.\n]+)',  # HTTP коды
-            r'error[:\s]*([^.\n]+)', # Общие ошибки
-            r'Error[:\s]*([^.\n]+)', # Ошибки с заглавной буквы
-            r'failed[:\s]*([^.\n]+)', # Сбои
-        ]
-        
         error_id = 1
-        for pattern in error_patterns:
-            for match in re.finditer(pattern, self.text, re.IGNORECASE):
-                if len(match.groups()) >= 2:
-                    error_code = match.group(1)
-                    error_desc = match.group(2)
-                elif len(match.groups()) == 1:
-                    error_code = f'ERR_{error_id:03d}'
-                    error_desc = match.group(1)
-                else:
-                    continue
+        for match in self.trigger_matches('errors'):
+            if len(match.groups()) >= 2:
+                error_code = match.group(1)
+                error_desc = match.group(2)
+            elif len(match.groups()) == 1:
+                error_code = f'ERR_{error_id:03d}'
+                error_desc = match.group(1)
+            else:
+                continue
+            
+            if len(error_desc.strip()) > 10:
+                error_data = {
+                    'id': f'error_{error_id}',
+                    'code': error_code,
+                    'description': error_desc.strip()[:200],
+                    'type': self.classify_error_type(error_code),
+                    'severity': self.assess_error_severity(error_desc),
+                    'retryable': self.is_retryable_error(error_code),
+                    'solution': self.suggest_solution(error_desc),
+                    'category': self.categorize_error(error_desc)
+                }
                 
-                if len(error_desc.strip()) > 10:
-                    error_data = {
-                        'id': f'error_{error_id}',
-                        'code': error_code,
-                        'description': error_desc.strip()[:200],
-                        'type': self.classify_error_type(error_code),
-                        'severity': self.assess_error_severity(error_desc),
-                        'retryable': self.is_retryable_error(error_code),
-                        'solution': self.suggest_solution(error_desc),
-                        'category': self.categorize_error(error_desc)
-                    }
-                    
-                    self.knowledge_bases['errors'].append(error_data)
-                    error_id += 1
+                self.knowledge_bases['errors'].append(error_data)
+                error_id += 1
         
         print(f"   ✅ Найдено {len(self.knowledge_bases['errors'])} ошибок")
     
@@ -244,32 +424,24 @@ class CompleteFleethandExtractor:
         """6. Извлекаем информацию об авторизации"""
         print("🔐 Извлекаем Authentication...")
         
-        # Ищем упоминания авторизации и ключей
-        auth_patterns = [
-            r'(API[_\s]?[Kk]ey|Token|Bearer|Authorization)[:\s]*([^.\n]+)',
-            r'(authentication|authorization)[:\s]*([^.\n]+)',
-            r'(key|token|bearer)[:\s]*([^.\n]+)',
-        ]
-        
         auth_id = 1
-        for pattern in auth_patterns:
-            for match in re.finditer(pattern, self.text, re.IGNORECASE):
-                auth_type = match.group(1)
-                auth_desc = match.group(2)
+        for match in self.trigger_matches('auth'):
+            auth_type = match.group(1)
+            auth_desc = match.group(2)
+            
+            if len(auth_desc.strip()) > 5:
+                auth_data = {
+                    'id': f'auth_{auth_id}',
+                    'method': auth_type,
+                    'description': auth_desc.strip()[:300],
+                    'type': self.detect_auth_type(auth_type, auth_desc),
+                    'header_name': self.extract_header_name(auth_desc),
+                    'format': self.extract_auth_format(auth_desc),
+                    'example': self.extract_auth_example(auth_desc)
+                }
                 
-                if len(auth_desc.strip()) > 5:
-                    auth_data = {
-                        'id': f'auth_{auth_id}',
-                        'method': auth_type,
-                        'description': auth_desc.strip()[:300],
-                        'type': self.detect_auth_type(auth_type, auth_desc),
-                        'header_name': self.extract_header_name(auth_desc),
-                        'format': self.extract_auth_format(auth_desc),
-                        'example': self.extract_auth_example(auth_desc)
-                    }
-                    
-                    self.knowledge_bases['auth'].append(auth_data)
-                    auth_id += 1
+                self.knowledge_bases['auth'].append(auth_data)
+                auth_id += 1
         
         print(f"   ✅ Найдено {len(self.knowledge_bases['auth'])} методов авторизации")
     
@@ -277,29 +449,23 @@ class CompleteFleethandExtractor:
         """7. Извлекаем webhooks и события"""
         print("🪝 Извлекаем Webhooks...")
         
-        webhook_patterns = [
-            r'(webhook|event|notification|callback)[:\s]*([^.\n]+)',
-            r'(event[_\s]?type|eventType)[:\s]*([^.\n]+)',
-        ]
-        
         webhook_id = 1
-        for pattern in webhook_patterns:
-            for match in re.finditer(pattern, self.text, re.IGNORECASE):
-                webhook_type = match.group(1)
-                webhook_desc = match.group(2)
+        for match in self.trigger_matches('webhooks'):
+            webhook_type = match.group(1)
+            webhook_desc = match.group(2)
+            
+            if len(webhook_desc.strip()) > 10:
+                webhook_data = {
+                    'id': f'webhook_{webhook_id}',
+                    'event_name': webhook_type,
+                    'description': webhook_desc.strip()[:300],
+                    'trigger': self.extract_webhook_trigger(webhook_desc),
+                    'payload': self.extract_webhook_payload(webhook_desc),
+                    'frequency': self.extract_webhook_frequency(webhook_desc)
+                }
                 
-                if len(webhook_desc.strip()) > 10:
-                    webhook_data = {
-                        'id': f'webhook_{webhook_id}',
-                        'event_name': webhook_type,
-                        'description': webhook_desc.strip()[:300],
-                        'trigger': self.extract_webhook_trigger(webhook_desc),
-                        'payload': self.extract_webhook_payload(webhook_desc),
-                        'frequency': self.extract_webhook_frequency(webhook_desc)
-                    }
-                    
-                    self.knowledge_bases['webhooks'].append(webhook_data)
-                    webhook_id += 1
+                self.knowledge_bases['webhooks'].append(webhook_data)
+                webhook_id += 1
         
         print(f"   ✅ Найдено {len(self.knowledge_bases['webhooks'])} webhooks")
     
@@ -307,27 +473,20 @@ class CompleteFleethandExtractor:
         """8. Извлекаем ограничения и лимиты"""
         print("⏱️ Извлекаем Rate Limits...")
         
-        limit_patterns = [
-            r'(limit|maximum|max|minimum|min|rate)[:\s]*([^.\n]+)',
-            r'(\d+)\s*(per|/)\s*(second|minute|hour|day|request)',
-            r'(timeout|delay)[:\s]*([^.\n]+)',
-        ]
-        
         limit_id = 1
-        for pattern in limit_patterns:
-            for match in re.finditer(pattern, self.text, re.IGNORECASE):
-                if 'limit' in match.group(0).lower() or 'rate' in match.group(0).lower():
-                    limit_data = {
-                        'id': f'limit_{limit_id}',
-                        'type': match.group(1),
-                        'description': match.group(0)[:200],
-                        'value': self.extract_limit_value(match.group(0)),
-                        'unit': self.extract_limit_unit(match.group(0)),
-                        'scope': self.extract_limit_scope(match.group(0))
-                    }
-                    
-                    self.knowledge_bases['rate_limits'].append(limit_data)
-                    limit_id += 1
+        for match in self.trigger_matches('rate_limits'):
+            if 'limit' in match.group(0).lower() or 'rate' in match.group(0).lower():
+                limit_data = {
+                    'id': f'limit_{limit_id}',
+                    'type': match.group(1),
+                    'description': match.group(0)[:200],
+                    'value': self.extract_limit_value(match.group(0)),
+                    'unit': self.extract_limit_unit(match.group(0)),
+                    'scope': self.extract_limit_scope(match.group(0))
+                }
+                
+                self.knowledge_bases['rate_limits'].append(limit_data)
+                limit_id += 1
         
         print(f"   ✅ Найдено {len(self.knowledge_bases['rate_limits'])} лимитов")
     
@@ -335,30 +494,23 @@ class CompleteFleethandExtractor:
         """9. Извлекаем бизнес-правила"""
         print("📋 Извлекаем Business Rules...")
         
-        rule_patterns = [
-            r'(must|should|cannot|required|mandatory|optional)[:\s]*([^.\n]+)',
-            r'(rule|constraint|limitation|requirement)[:\s]*([^.\n]+)',
-            r'(note|important|warning)[:\s]*([^.\n]+)',
-        ]
-        
         rule_id = 1
-        for pattern in rule_patterns:
-            for match in re.finditer(pattern, self.text, re.IGNORECASE):
-                rule_type = match.group(1)
-                rule_desc = match.group(2)
+        for match in self.trigger_matches('business_rules'):
+            rule_type = match.group(1)
+            rule_desc = match.group(2)
+            
+            if len(rule_desc.strip()) > 20:
+                rule_data = {
+                    'id': f'rule_{rule_id}',
+                    'type': rule_type,
+                    'description': rule_desc.strip()[:300],
+                    'severity': self.assess_rule_severity(rule_type),
+                    'category': self.categorize_rule(rule_desc),
+                    'enforcement': self.detect_rule_enforcement(rule_type)
+                }
                 
-                if len(rule_desc.strip()) > 20:
-                    rule_data = {
-                        'id': f'rule_{rule_id}',
-                        'type': rule_type,
-                        'description': rule_desc.strip()[:300],
-                        'severity': self.assess_rule_severity(rule_type),
-                        'category': self.categorize_rule(rule_desc),
-                        'enforcement': self.detect_rule_enforcement(rule_type)
-                    }
-                    
-                    self.knowledge_bases['business_rules'].append(rule_data)
-                    rule_id += 1
+                self.knowledge_bases['business_rules'].append(rule_data)
+                rule_id += 1
         
         print(f"   ✅ Найдено {len(self.knowledge_bases['business_rules'])} правил")
     
@@ -384,24 +536,28 @@ class CompleteFleethandExtractor:
         ]
         
         for term in common_terms:
-            if term in self.text.lower():
+            if self.word_index.contains_substring(term):
                 terms.add(term)
         
+        # Индекс путей строится заново: endpoints уже извлечены
+        self._endpoint_word_index = None
+        
         term_id = 1
         for term in sorted(terms):
-            # Находим контекст где термин упоминается
-            pattern = rf'\b{re.escape(term)}\b[^.\n]*'
-            matches = re.findall(pattern, self.text, re.IGNORECASE)
+            # Находим контекст где термин упоминается: вхождение слова и
+            # остаток предложения после него, по одному на предложение
+            occurrences = self.word_index.segment_occurrences(term)
             
-            if matches:
-                definition = matches[0][:200]
+            if occurrences:
+                start, end = occurrences[0]
+                definition = self.text[start:end][:200]
                 
                 glossary_data = {
                     'id': f'term_{term_id}',
                     'term': term,
                     'definition': definition,
                     'category': self.categorize_term(term),
-                    'usage_count': len(matches),
+                    'usage_count': len(occurrences),
                     'related_endpoints': self.find_related_endpoints_for_term(term)
                 }
                 
@@ -414,31 +570,23 @@ class CompleteFleethandExtractor:
         """11. Извлекаем workflows и сценарии"""
         print("🔄 Извлекаем Workflows...")
         
-        # Ищем последовательности действий
-        workflow_patterns = [
-            r'(first|then|next|after|finally)[:\s]*([^.\n]+)',
-            r'(step\s*\d+)[:\s]*([^.\n]+)',
-            r'(workflow|process|scenario)[:\s]*([^.\n]+)',
-        ]
-        
         workflow_id = 1
-        for pattern in workflow_patterns:
-            for match in re.finditer(pattern, self.text, re.IGNORECASE):
-                step_indicator = match.group(1)
-                step_desc = match.group(2)
+        for match in self.trigger_matches('workflows'):
+            step_indicator = match.group(1)
+            step_desc = match.group(2)
+            
+            if len(step_desc.strip()) > 15:
+                workflow_data = {
+                    'id': f'workflow_{workflow_id}',
+                    'step_indicator': step_indicator,
+                    'description': step_desc.strip()[:300],
+                    'order': self.extract_step_order(step_indicator),
+                    'category': self.categorize_workflow(step_desc),
+                    'related_endpoints': self.find_endpoints_in_text(step_desc)
+                }
                 
-                if len(step_desc.strip()) > 15:
-                    workflow_data = {
-                        'id': f'workflow_{workflow_id}',
-                        'step_indicator': step_indicator,
-                        'description': step_desc.strip()[:300],
-                        'order': self.extract_step_order(step_indicator),
-                        'category': self.categorize_workflow(step_desc),
-                        'related_endpoints': self.find_endpoints_in_text(step_desc)
-                    }
-                    
-                    self.knowledge_bases['workflows'].append(workflow_data)
-                    workflow_id += 1
+                self.knowledge_bases['workflows'].append(workflow_data)
+                workflow_id += 1
         
         print(f"   ✅ Найдено {len(self.knowledge_bases['workflows'])} workflow шагов")
     
@@ -446,28 +594,22 @@ class CompleteFleethandExtractor:
         """12. Извлекаем информацию об интеграциях"""
         print("🔗 Извлекаем Integrations...")
         
-        integration_patterns = [
-            r'(integration|connect|sync|import|export)[:\s]*([^.\n]+)',
-            r'(third[_\s]?party|external)[:\s]*([^.\n]+)',
-        ]
-        
         integration_id = 1
-        for pattern in integration_patterns:
-            for match in re.finditer(pattern, self.text, re.IGNORECASE):
-                integration_type = match.group(1)
-                integration_desc = match.group(2)
+        for match in self.trigger_matches('integrations'):
+            integration_type = match.group(1)
+            integration_desc = match.group(2)
+            
+            if len(integration_desc.strip()) > 20:
+                integration_data = {
+                    'id': f'integration_{integration_id}',
+                    'type': integration_type,
+                    'description': integration_desc.strip()[:300],
+                    'direction': self.detect_integration_direction(integration_desc),
+                    'format': self.detect_integration_format(integration_desc)
+                }
                 
-                if len(integration_desc.strip()) > 20:
-                    integration_data = {
-                        'id': f'integration_{integration_id}',
-                        'type': integration_type,
-                        'description': integration_desc.strip()[:300],
-                        'direction': self.detect_integration_direction(integration_desc),
-                        'format': self.detect_integration_format(integration_desc)
-                    }
-                    
-                    self.knowledge_bases['integrations'].append(integration_data)
-                    integration_id += 1
+                self.knowledge_bases['integrations'].append(integration_data)
+                integration_id += 1
         
         print(f"   ✅ Найдено {len(self.knowledge_bases['integrations'])} интеграций")
     
@@ -475,28 +617,22 @@ class CompleteFleethandExtractor:
         """13. Извлекаем роли и разрешения"""
         print("👥 Извлекаем Permissions...")
         
-        permission_patterns = [
-            r'(role|permission|access|privilege)[:\s]*([^.\n]+)',
-            r'(admin|user|manager|operator)[:\s]*([^.\n]+)',
-        ]
-        
         permission_id = 1
-        for pattern in permission_patterns:
-            for match in re.finditer(pattern, self.text, re.IGNORECASE):
-                permission_type = match.group(1)
-                permission_desc = match.group(2)
+        for match in self.trigger_matches('permissions'):
+            permission_type = match.group(1)
+            permission_desc = match.group(2)
+            
+            if len(permission_desc.strip()) > 10:
+                permission_data = {
+                    'id': f'permission_{permission_id}',
+                    'type': permission_type,
+                    'description': permission_desc.strip()[:300],
+                    'level': self.detect_permission_level(permission_type),
+                    'scope': self.detect_permission_scope(permission_desc)
+                }
                 
-                if len(permission_desc.strip()) > 10:
-                    permission_data = {
-                        'id': f'permission_{permission_id}',
-                        'type': permission_type,
-                        'description': permission_desc.strip()[:300],
-                        'level': self.detect_permission_level(permission_type),
-                        'scope': self.detect_permission_scope(permission_desc)
-                    }
-                    
-                    self.knowledge_bases['permissions'].append(permission_data)
-                    permission_id += 1
+                self.knowledge_bases['permissions'].append(permission_data)
+                permission_id += 1
         
         print(f"   ✅ Найдено {len(self.knowledge_bases['permissions'])} разрешений")
     
@@ -537,29 +673,22 @@ class CompleteFleethandExtractor:
         """15. Извлекаем правила валидации"""
         print("✅ Извлекаем Validations...")
         
-        validation_patterns = [
-            r'(valid|invalid|validate|validation)[:\s]*([^.\n]+)',
-            r'(format|pattern|regex)[:\s]*([^.\n]+)',
-            r'(length|size|range)[:\s]*([^.\n]+)',
-        ]
-        
         validation_id = 1
-        for pattern in validation_patterns:
-            for match in re.finditer(pattern, self.text, re.IGNORECASE):
-                validation_type = match.group(1)
-                validation_desc = match.group(2)
+        for match in self.trigger_matches('validations'):
+            validation_type = match.group(1)
+            validation_desc = match.group(2)
+            
+            if len(validation_desc.strip()) > 10:
+                validation_data = {
+                    'id': f'validation_{validation_id}',
+                    'type': validation_type,
+                    'description': validation_desc.strip()[:300],
+                    'rule': self.extract_validation_rule(validation_desc),
+                    'error_message': self.extract_validation_error(validation_desc)
+                }
                 
-                if len(validation_desc.strip()) > 10:
-                    validation_data = {
-                        'id': f'validation_{validation_id}',
-                        'type': validation_type,
-                        'description': validation_desc.strip()[:300],
-                        'rule': self.extract_validation_rule(validation_desc),
-                        'error_message': self.extract_validation_error(validation_desc)
-                    }
-                    
-                    self.knowledge_bases['validations'].append(validation_data)
-                    validation_id += 1
+                self.knowledge_bases['validations'].append(validation_data)
+                validation_id += 1
         
         print(f"   ✅ Найдено {len(self.knowledge_bases['validations'])} правил валидации")
     
@@ -613,6 +742,10 @@ class CompleteFleethandExtractor:
             else:
                 print(f"   ⚠️ {kb_name}: пустая база")
         
+        # Общая таблица структур моделей {structure_id: структура}
+        with open(os.path.join(self.output_dir, 'model_structures.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.model_structures.to_dict(), f, indent=2, ensure_ascii=False)
+        
         # Создаем мастер-файл
         master_data = {
             'api_name': 'Fleethand API',
@@ -625,6 +758,13 @@ class CompleteFleethandExtractor:
                     'count': len(data),
                     'description': self.get_kb_description(name)
                 } for name, data in self.knowledge_bases.items()
+            },
+            'shared_tables': {
+                'model_structures': {
+                    'file': 'model_structures.json',
+                    'count': len(self.model_structures),
+                    'description': 'Уникальные структуры моделей (models.structure_id)'
+                }
             }
         }
         
@@ -688,6 +828,7 @@ class CompleteFleethandExtractor:
         return self.output_dir
 
     # Минимальные реализации helper методов
+    # (context - TextSpan: str(context) дает текст окна, context.search() ищет в нем без копирования)
     def extract_description(self, context): 
         return "API endpoint"
     def extract_summary(self, context): 
@@ -699,9 +840,9 @@ class CompleteFleethandExtractor:
     def extract_endpoint_parameters(self, context): 
         return []
     def extract_request_body(self, context): 
-        return None
+        return self.labeled_json(context, 'request')
     def extract_response_example(self, context): 
-        return None
+        return self.labeled_json(context, 'response')
     def extract_model_name(self, context, json_str): 
         return "DataModel"
     def parse_json_fields(self, json_str): 
@@ -771,7 +912,13 @@ class CompleteFleethandExtractor:
     def categorize_term(self, term): 
         return "general"
     def find_related_endpoints_for_term(self, term): 
-        return []
+        if self._endpoint_word_index is None:
+            self._endpoint_word_index = {}
+            for endpoint in self.knowledge_bases['endpoints']:
+                for word in iter_words(endpoint['path']):
+                    # dict как упорядоченное множество id
+                    self._endpoint_word_index.setdefault(word, {})[endpoint['id']] = None
+        return list(self._endpoint_word_index.get(term.lower(), ()))
     def extract_step_order(self, indicator): 
         return 1
     def categorize_workflow(self, desc): 
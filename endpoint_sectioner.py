@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Однопроходный поиск секций endpoints
+====================================
+Находит все пары Method/URL и границы их секций за один проход по тексту.
+
+Раньше для каждого уникального endpoint заново запускался re.finditer по
+всему документу и re.search по копии хвоста text[match.end():], что давало
+O(endpoints × размер документа). Здесь оба паттерна проходят текст один раз,
+а секции выдаются в порядке документа как (method, url, start, end).
+
+Текст можно подавать частями (например, постранично из PDF): EndpointSectioner
+хранит только хвост, в котором еще возможны незавершенные совпадения, и
+открытые секции, поэтому память не растет с размером документа.
+"""
+
+import re
+from collections import deque
+from typing import Deque, Iterator, List, NamedTuple, Optional, Tuple
+
+# Пара Method/URL - тот же паттерн, что использует парсер для поиска endpoints
+METHOD_URL_RE = re.compile(r'(GET|POST|PUT|DELETE)\s+(\S+)')
+
+# Граница секции - перевод строки перед следующим Method/URL.
+# Lookahead делает совпадение шириной в один символ, поэтому ни одна
+# граница не "прячется" внутри предыдущего совпадения.
+SECTION_BOUNDARY_RE = re.compile(r'\n(?=(?:GET|POST|PUT|DELETE)\s+\S)')
+
+# Самый длинный метод (DELETE) + перевод строки границы: ближе этого к концу
+# буфера совпадение еще может измениться после следующей порции текста
+_UNSETTLED_TAIL = 7
+
+_WORD_CHAR_RE = re.compile(r'\w')
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    """Совпадение ограничено \\b с обеих сторон (как в прежнем поиске секции)"""
+    if start > 0 and _WORD_CHAR_RE.match(text, start - 1):
+        return False
+    return bool(_WORD_CHAR_RE.match(text, end - 1))
+
+
+class EndpointSection(NamedTuple):
+    method: str
+    url: str
+    start: int
+    end: int
+    text: Optional[str]
+
+
+class EndpointSectioner:
+    """Инкрементальный поиск секций endpoints.
+
+    feed() принимает очередную порцию текста и возвращает секции, границы
+    которых уже известны; finish() закрывает оставшиеся концом документа.
+    Позиции start/end - абсолютные смещения в полном тексте.
+    """
+
+    def __init__(self, keep_text: bool = True):
+        self.keep_text = keep_text
+        self.total_length = 0
+
+        self._buffer = ""
+        self._offset = 0          # абсолютная позиция начала буфера
+        self._match_pos = 0       # откуда продолжать поиск Method/URL
+        self._boundary_pos = 0    # откуда продолжать поиск границ
+        # Открытые секции: (method, url, start, end_of_match)
+        self._pending: Deque[Tuple[str, str, int, int]] = deque()
+        self._seen = set()
+
+    def feed(self, chunk: str) -> List[EndpointSection]:
+        """Добавляет порцию текста и возвращает закрытые секции"""
+        if chunk:
+            self._buffer += chunk
+            self.total_length += len(chunk)
+        return self._scan(final=False)
+
+    def finish(self) -> List[EndpointSection]:
+        """Закрывает все оставшиеся секции концом документа"""
+        sections = self._scan(final=True)
+        while self._pending:
+            sections.append(self._close(self.total_length))
+        self._buffer = ""
+        self._offset = self.total_length
+        return sections
+
+    def _scan(self, final: bool) -> List[EndpointSection]:
+        buffer = self._buffer
+        offset = self._offset
+
+        # Граница "устоявшегося" текста: после нее совпадения могут
+        # измениться, когда придет следующая порция
+        if final:
+            limit = len(buffer)
+        else:
+            settled = len(buffer)
+            while settled > 0 and buffer[settled - 1].isspace():
+                settled -= 1
+            limit = max(settled - _UNSETTLED_TAIL, self._boundary_pos - offset)
+
+        matches = []
+        match_pos = self._match_pos - offset
+        for match in METHOD_URL_RE.finditer(buffer, match_pos):
+            if match.start() >= limit:
+                break
+            if not final and match.end() == len(buffer):
+                # URL может продолжиться в следующей порции
+                limit = match.start()
+                break
+            matches.append(match)
+            match_pos = match.end()
+        match_pos = max(match_pos, limit)
+
+        boundaries: Deque[int] = deque()
+        for boundary in SECTION_BOUNDARY_RE.finditer(buffer, self._boundary_pos - offset):
+            if boundary.start() >= limit:
+                break
+            boundaries.append(boundary.start() + offset)
+
+        sections: List[EndpointSection] = []
+        for match in matches:
+            self._close_until(match.start() + offset, boundaries, sections)
+
+            method, url = match.group(1), match.group(2)
+            key = f"{method} {url}"
+            if key in self._seen or not _is_whole_word(buffer, match.start(), match.end()):
+                continue
+            self._seen.add(key)
+            self._pending.append((method, url, match.start() + offset, match.end() + offset))
+
+        self._close_until(limit + offset, boundaries, sections)
+
+        self._match_pos = match_pos + offset
+        self._boundary_pos = limit + offset
+
+        # В буфере остается только то, что еще понадобится: открытые секции
+        # и хвост после точки продолжения (плюс символ для проверки \b)
+        keep_from = self._boundary_pos - 1
+        if self._pending:
+            keep_from = min(keep_from, self._pending[0][2])
+        if keep_from > offset:
+            self._buffer = buffer[keep_from - offset:]
+            self._offset = keep_from
+
+        return sections
+
+    def _close_until(self, position: int, boundaries: Deque[int], sections: List[EndpointSection]):
+        """Закрывает открытые секции границами, лежащими до position"""
+        while self._pending and boundaries and boundaries[0] < position:
+            if boundaries[0] >= self._pending[0][3]:
+                sections.append(self._close(boundaries[0]))
+            else:
+                boundaries.popleft()
+
+    def _close(self, end: int) -> EndpointSection:
+        method, url, start, _ = self._pending.popleft()
+        text = None
+        if self.keep_text:
+            text = self._buffer[start - self._offset:end - self._offset]
+        return EndpointSection(method, url, start, end, text)
+
+
+def iter_endpoint_sections(text: str) -> Iterator[Tuple[str, str, int, int]]:
+    """Выдает (method, url, start, end) для каждого уникального endpoint.
+
+    Секция начинается с первого вхождения пары Method/URL и заканчивается
+    на ближайшей границе после него (или в конце текста). Дубликаты
+    пропускаются, порядок - порядок первого появления в документе.
+    Вхождения, не ограниченные границами слова (например, "TARGET /x" или
+    URL, оканчивающийся на "}"), секцию не открывают - прежний поиск по
+    \\b{method}\\s+{url}\\b их тоже не находил.
+    """
+    sectioner = EndpointSectioner(keep_text=False)
+    for section in sectioner.feed(text) + sectioner.finish():
+        yield section.method, section.url, section.start, section.end
@@ -11,10 +11,45 @@ import os
 from typing import Dict, List, Any
 from datetime import datetime
 
+from patterns import REGISTRY
+from text_span import TextSource
+
+# 🧩 Паттерны компилируются один раз при импорте (общий реестр patterns.py)
+
+# Паттерн: Method \n URL \n METHOD \n /api/path
+ENDPOINT_PATTERN = REGISTRY.compile(
+    'enhanced.endpoint',
+    r'Method\s*\n\s*URL\s*\n\s*(GET|POST|PUT|DELETE|PATCH)\s*\n\s*(/api/[^\s\n]+)',
+    re.MULTILINE
+)
+
+# Ищем описание перед Method
+DESCRIPTION_PATTERNS = REGISTRY.compile_all('enhanced.description', [
+    r'([^\n]+)\s*\n\s*Method',
+    r'Description[:\s]*([^\n]+)',
+    r'Purpose[:\s]*([^\n]+)'
+], re.IGNORECASE)
+
+PARAM_SECTION_RE = REGISTRY.compile(
+    'enhanced.param_section', r'Parameters?[:\s]*\n(.*?)(?:\n\n|Response|Example|$)',
+    re.IGNORECASE | re.DOTALL
+)
+# Параметры в формате: name - description
+PARAM_ITEM_RE = REGISTRY.compile('enhanced.param_item', r'(\w+)\s*[-–:]\s*(.+?)(?:\n|$)')
+FLAT_JSON_RE = REGISTRY.compile('enhanced.flat_json', r'\{[^{}]*\}')
+RESPONSE_SECTION_RE = REGISTRY.compile(
+    'enhanced.response_section', r'Response[:\s]*\n(.*?)(?:\n\n|Parameters|Example|$)',
+    re.IGNORECASE | re.DOTALL
+)
+RESPONSE_JSON_RE = REGISTRY.compile('enhanced.response_json', r'\{.*\}', re.DOTALL)
+
+
 class FleethandEndpointExtractor:
     def __init__(self, text_file='extracted_text.txt'):
         self.text_file = text_file
         self.text = self.load_text()
+        # Окна контекста endpoints - смещения в этом тексте (text_span)
+        self.source = TextSource(self.text)
         
         # Создаем папку для результатов
         self.output_dir = 'fleethand_endpoints'
@@ -31,17 +66,12 @@ class FleethandEndpointExtractor:
         """Извлекаем endpoints по специальному паттерну Fleethand"""
         print("🔍 Ищем endpoints в формате Fleethand...")
         
-        # Паттерн: Method \n URL \n METHOD \n /api/path
-        pattern = r'Method\s*\n\s*URL\s*\n\s*(GET|POST|PUT|DELETE|PATCH)\s*\n\s*(/api/[^\s\n]+)'
-        
-        for match in re.finditer(pattern, self.text, re.MULTILINE):
+        for match in ENDPOINT_PATTERN.finditer(self.text):
             method = match.group(1)
             path = match.group(2)
             
-            # Получаем больше контекста
-            start = max(0, match.start() - 1000)
-            end = min(len(self.text), match.end() + 3000)
-            context = self.text[start:end]
+            # Получаем больше контекста (окно без копирования текста)
+            context = self.source.around(match.start(), match.end(), before=1000, after=3000)
             
             endpoint_data = {
                 'id': f"{method}_{path.replace('/', '_')}",
@@ -53,7 +83,7 @@ class FleethandEndpointExtractor:
                 'request_body': self.extract_request_body(context),
                 'response': self.extract_response(context),
                 'auth_required': True,  # Все Fleethand endpoints требуют авторизации
-                'full_context': context[:2000]  # Сохраняем контекст для анализа
+                'full_context': context.head(2000).as_offsets()  # Смещения контекста в тексте для анализа
             }
             
             self.endpoints.append(endpoint_data)
@@ -84,16 +114,9 @@ class FleethandEndpointExtractor:
         return 'general'
     
     def extract_description(self, context):
-        """Извлекаем описание endpoint"""
-        # Ищем описание перед Method
-        desc_patterns = [
-            r'([^\n]+)\s*\n\s*Method',
-            r'Description[:\s]*([^\n]+)',
-            r'Purpose[:\s]*([^\n]+)'
-        ]
-        
-        for pattern in desc_patterns:
-            match = re.search(pattern, context, re.IGNORECASE)
+        """Извлекаем описание endpoint (context - TextSpan окна вокруг endpoint)"""
+        for pattern in DESCRIPTION_PATTERNS:
+            match = context.search(pattern)
             if match:
                 desc = match.group(1).strip()
                 if len(desc) > 10 and len(desc) < 200:
@@ -106,16 +129,13 @@ class FleethandEndpointExtractor:
         parameters = []
         
         # Ищем секцию Parameters
-        param_section_match = re.search(
-            r'Parameters?[:\s]*\n(.*?)(?:\n\n|Response|Example|$)',
-            context, re.IGNORECASE | re.DOTALL
-        )
+        param_section_match = context.search(PARAM_SECTION_RE)
         
         if param_section_match:
             param_text = param_section_match.group(1)
             
             # Ищем параметры в формате: name - description
-            param_matches = re.findall(r'(\w+)\s*[-–:]\s*(.+?)(?:\n|$)', param_text)
+            param_matches = PARAM_ITEM_RE.findall(param_text)
             
             for param_name, param_desc in param_matches:
                 parameters.append({
@@ -147,7 +167,7 @@ class FleethandEndpointExtractor:
     def extract_request_body(self, context):
         """Извлекаем структуру тела запроса"""
         # Ищем JSON структуры в контексте
-        json_matches = re.findall(r'\{[^{}]*\}', context)
+        json_matches = context.findall(FLAT_JSON_RE)
         
         if json_matches:
             # Берем самую большую JSON структуру
@@ -163,16 +183,13 @@ class FleethandEndpointExtractor:
     def extract_response(self, context):
         """Извлекаем пример ответа"""
         # Ищем секцию Response
-        response_match = re.search(
-            r'Response[:\s]*\n(.*?)(?:\n\n|Parameters|Example|$)',
-            context, re.IGNORECASE | re.DOTALL
-        )
+        response_match = context.search(RESPONSE_SECTION_RE)
         
         if response_match:
             response_text = response_match.group(1)
             
             # Ищем JSON в ответе
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+            json_match = RESPONSE_JSON_RE.search(response_text)
             if json_match:
                 try:
                     return json.loads(json_match.group())
@@ -3,24 +3,16 @@
 Извлекаем текст из PDF и сохраняем
 """
 
-import fitz
+from pdf_text import iter_document_chunks
 
 def extract_text():
-    doc = fitz.open('documentation.pdf')
-    text = ""
-    
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        text += f"\n=== Страница {page_num + 1} ===\n"
-        text += page.get_text()
-    
-    doc.close()
-    
-    with open('extracted_text.txt', 'w', encoding='utf-8') as f:
-        f.write(text)
-    
-    print(f"Извлечено {len(text)} символов")
+    # Страницы пишутся в файл по мере извлечения, документ целиком в память не собирается
+    total = 0
+    for chunk in iter_document_chunks('documentation.pdf', cache_file='extracted_text.txt'):
+        total += len(chunk)
+
+    print(f"Извлечено {total} символов")
     print("Сохранено в extracted_text.txt")
 
 if __name__ == "__main__":
-    extract_text()
\ No newline at end of file
+    extract_text()
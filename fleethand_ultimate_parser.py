@@ -23,39 +23,144 @@
 
 import json
 import re
+import shutil
+import time
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, Any, Callable
 from datetime import datetime
 
+from endpoint_sectioner import EndpointSectioner
+from instrumentation import ParseInstrumentation
+from json_repair import JsonRepairError, repair_json
+from json_scanner import find_json_end
+from line_index import CLASSIFIED, DESCRIPTION_LINE, TITLE_LINE, LineIndex, SectionLines
+from mcp_compact import DEFAULT_MCP_FORMAT, compact_mcp_data
+from parallel_sections import ParallelSectionParser
+from parse_cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES, ParseCache
+from patterns import REGISTRY
+from payload_table import PayloadTable
+from pdf_text import format_pages, get_page_count, iter_document_chunks, iter_pdf_pages, iter_text_file
+from schema_inference import SchemaInferrer
+
+# Версия парсера входит в ключ кэша: результаты старой версии не переиспользуются
+PARSER_VERSION = "ultimate_final_v8.3"
+
+# Пути по умолчанию (относительно рабочей директории)
+DEFAULT_PDF_PATH = "documentation.pdf"
+DEFAULT_TEXT_FILE = "extracted_text.txt"
+DEFAULT_OUTPUT_DIR = "ultimate_final_data"
+
+# Ключ результата parse() -> имя JSON файла (без расширения) в каталоге результатов
+RESULT_FILES = {
+    "endpoints": "endpoints_ultimate_final",
+    "mcp_data": "mcp_server_ultimate_final",
+    "quality": "quality_report_ultimate_final",
+    "payloads": "payloads_ultimate_final"
+}
+
+# Как часто сообщать о прогрессе внутри стадий
+PROGRESS_EVERY_ENDPOINTS = 50
+PROGRESS_EVERY_PAGES = 10
+
+# Обработчик событий прогресса: получает словарь {"stage": ..., ...}
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def report_progress(progress: Optional[ProgressCallback], stage: str, **data):
+    """Отправляет событие прогресса, если обработчик задан"""
+    if progress is not None:
+        progress({"stage": stage, **data})
+
+
+def track_pages(chunks: Iterable[str], progress: Optional[ProgressCallback],
+                total_pages: Optional[int] = None) -> Iterator[str]:
+    """Пропускает страницы документа, сообщая о каждых PROGRESS_EVERY_PAGES"""
+    pages = 0
+    for chunk in chunks:
+        pages += 1
+        if pages % PROGRESS_EVERY_PAGES == 0:
+            report_progress(progress, "pages_extracted", pages=pages, total_pages=total_pages)
+        yield chunk
+    report_progress(progress, "pages_extracted", pages=pages, total_pages=total_pages)
+
+# 🧩 Паттерны компилируются один раз при импорте и регистрируются в общем
+# реестре (счетчики вызовов и времени - REGISTRY.enable_profiling())
+
+# Интеллектуальные паттерны для descriptions
+DESCRIPTION_PATTERNS = REGISTRY.compile_all('parser.description', [
+    # Прямые паттерны
+    r'This method (.+?)\.',
+    r'This endpoint (.+?)\.',
+    # Альтернативные формы
+    r'Returns (.+?)\.',
+    r'Creates (.+?)\.',
+    r'Updates (.+?)\.',
+    r'Deletes (.+?)\.',
+    r'Assigns (.+?)\.',
+    r'Retrieves (.+?)\.',
+    r'Gets (.+?)\.',
+    # Расширенные паттерны  
+    r'Method (.+?)\.',
+    r'Endpoint (.+?)\.',
+    r'API (.+?)\.'
+], re.IGNORECASE)
+
+# Строка начинается с любого из паттернов description
+DESCRIPTION_START_RE = REGISTRY.compile(
+    'parser.description_start',
+    '|'.join(f'(?:{p.pattern})' for p in DESCRIPTION_PATTERNS),
+    re.IGNORECASE
+)
+
+# Технические строки, которые не могут быть title
+INVALID_TITLE_RE = REGISTRY.compile('parser.invalid_title', '|'.join(f'(?:{p})' for p in [
+    r'^\d+$', r'^=== Страница \d+ ===$', r'^Fleethand API$',
+    r'^Activities$|^Vehicles$|^Drivers$|^Documents$|^Forms$|^Reports$', r'^\d+ \w+$',
+    r'^Request$|^Method$|^URL$', r'^https?://', r'^\w{1,3}$',
+    r'^Status$|^Response$|^Key$|^Data type$|^Required$|^Description$'
+]))
+
+# Слова, по которым строка признается title (вхождение в строку в нижнем регистре)
+TITLE_ACTION_WORDS = ['get', 'create', 'update', 'delete', 'assign', 'append', 'confirm',
+                      'upload', 'download', 'initiate', 'cancel', 'remove', 'reject',
+                      'add', 'insert', 'upsert', 'fill']
+TITLE_API_WORDS = ['activities', 'configuration', 'vehicle', 'driver', 'document',
+                   'files', 'reports', 'sheets', 'crossings', 'groups', 'form',
+                   'cards', 'companies', 'expense', 'trip', 'eco']
+TITLE_WORDS_RE = REGISTRY.compile(
+    'parser.title_words', '|'.join(re.escape(word) for word in TITLE_ACTION_WORDS + TITLE_API_WORDS)
+)
+
+HEADERS_SECTION_RE = REGISTRY.compile(
+    'parser.headers_section',
+    r'Request headers\s*\n(.*?)(?=Request parameters|Request body|Response example|Request model|$)',
+    re.DOTALL
+)
+PARAMS_SECTION_RE = REGISTRY.compile(
+    'parser.params_section',
+    r'Request parameters\s*\n(.*?)(?=Request body|Response example|Request model|$)',
+    re.DOTALL
+)
+RESPONSE_SECTION_RE = REGISTRY.compile(
+    'parser.response_section', r'Response example\s*\n(.*?)(?=\n\n|\Z)', re.DOTALL
+)
+BODY_SECTION_RE = REGISTRY.compile(
+    'parser.body_section', r'Request body\s*\n(.*?)(?=Response example|Request model|$)', re.DOTALL
+)
+
+IDENTIFIER_RE = REGISTRY.compile('parser.identifier', r'^[a-zA-Z][a-zA-Z0-9_]*$')
+
 
 class FleethandUltimateParser:
-    def __init__(self):
-        self.stats = {
-            "endpoints": 0,
-            "headers": 0,
-            "parameters": 0,
-            "responses": 0,
-            "errors": []
-        }
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.cache = ParseCache(cache_dir, cache_max_bytes)
+        self.reset_stats()
         
-        # Интеллектуальные паттерны для descriptions
-        self.description_patterns = [
-            # Прямые паттерны
-            r'This method (.+?)\.',
-            r'This endpoint (.+?)\.',
-            # Альтернативные формы
-            r'Returns (.+?)\.',
-            r'Creates (.+?)\.',
-            r'Updates (.+?)\.',
-            r'Deletes (.+?)\.',
-            r'Assigns (.+?)\.',
-            r'Retrieves (.+?)\.',
-            r'Gets (.+?)\.',
-            # Расширенные паттерны  
-            r'Method (.+?)\.',
-            r'Endpoint (.+?)\.',
-            r'API (.+?)\.'
-        ]
+        # Интеллектуальные паттерны для descriptions (скомпилированы при импорте)
+        self.description_patterns = DESCRIPTION_PATTERNS
+        
+        # Индекс строк документа, который сейчас разбирается (extract_endpoints_streaming)
+        self.line_index: Optional[LineIndex] = None
         
         # Расширенная категоризация с метаданными
         self.advanced_categories = {
@@ -138,110 +243,296 @@ class FleethandUltimateParser:
                 'priority': 'low'
             }
         }
+        
+        # URL паттерны категорий компилируются один раз (реестр отдает
+        # уже скомпилированные объекты и следующим экземплярам парсера)
+        self.category_url_patterns = {
+            category_name: REGISTRY.compile_all(
+                f'parser.category.{category_name}', category_info['patterns'], re.IGNORECASE
+            )
+            for category_name, category_info in self.advanced_categories.items()
+        }
 
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Извлекает текст из PDF файла"""
+    def reset_stats(self, trace: bool = False):
+        """Обнуляет статистику (один экземпляр парсера обрабатывает много документов)"""
+        self.instrumentation = ParseInstrumentation(trace=trace)
+        # Уникальные примеры ответов, на которые ссылаются endpoints (example_id)
+        self.payloads = PayloadTable()
+        self.stats = {
+            "endpoints": 0,
+            "characters": 0,
+            "headers": 0,
+            "parameters": 0,
+            "responses": 0,
+            "errors": []
+        }
+
+    def extract_text_from_pdf(self, pdf_path: str, workers: int = 1) -> str:
+        """Извлекает текст из PDF файла (workers > 1 - параллельно по страницам)"""
         try:
-            import fitz  # PyMuPDF
-            doc = fitz.open(pdf_path)
-            text = ""
-            
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                page_text = page.get_text()
-                # Добавляем разделитель страниц для лучшего парсинга
-                text += f"\n=== Страница {page_num + 1} ===\n\n{page_text}\n"
-            
-            doc.close()
-            return text.strip()
+            # Страницы собираются списком и склеиваются один раз
+            return ''.join(format_pages(iter_pdf_pages(pdf_path, workers)))
             
         except ImportError:
-            raise ImportError("PyMuPDF не установлен. Выполните: pip install PyMuPDF")
+            raise
         except Exception as e:
             raise Exception(f"Ошибка извлечения текста из PDF: {e}")
 
-    def parse(self, text_file: str = "extracted_text.txt") -> Dict:
-        """Главная функция парсинга"""
+    def parse(self, text_file: str = DEFAULT_TEXT_FILE, workers: int = 1,
+              pdf_path: Optional[str] = DEFAULT_PDF_PATH, use_cache: bool = True,
+              output_dir: Optional[str] = DEFAULT_OUTPUT_DIR,
+              progress: Optional[ProgressCallback] = None,
+              trace_file: Optional[str] = None, parse_workers: int = 1,
+              mcp_format: str = DEFAULT_MCP_FORMAT) -> Dict:
+        """Главная функция парсинга
+        
+        Все входные и выходные пути явные: pdf_path - исходный документ,
+        text_file - куда положить (или откуда взять) извлеченный текст,
+        output_dir - каталог для JSON результатов. Так несколько парсингов
+        могут работать одновременно, каждый в своем каталоге.
+        
+        С output_dir=None результаты только возвращаются, без записи на диск,
+        с pdf_path=None парсится только готовый text_file.
+        
+        progress получает события на границах стадий и каждые
+        PROGRESS_EVERY_ENDPOINTS endpoints: extracting, pages_extracted,
+        parsing, endpoints_sectioned, endpoints_parsed, mcp_built,
+        quality_analyzed, files_written (или cache_hit).
+        
+        Время стадий, перцентили времени разбора endpoints, самые медленные
+        endpoints и счетчики попадают в quality["instrumentation"];
+        trace_file - куда сохранить те же замеры в формате Chrome trace.
+        
+        workers - процессы для извлечения страниц PDF, parse_workers - для
+        разбора секций endpoints.
+        
+        mcp_format - формат файла MCP данных: "inline" (полные схемы в
+        каждом tool) или "compact" (общие параметры и категории вынесены в
+        определения, см. mcp_compact). Возвращаемые и кэшируемые mcp_data
+        всегда в формате inline.
+        """
         print("🏆 FLEETHAND ULTIMATE PARSER v8.0 - ФИНАЛЬНАЯ ВЕРСИЯ")
         print("=" * 70)
         
-        # Проверяем наличие извлеченного текста или PDF
         import os
-        if not os.path.exists(text_file):
-            print(f"📄 Файл {text_file} не найден, извлекаем текст из documentation.pdf...")
-            if os.path.exists("documentation.pdf"):
-                text = self.extract_text_from_pdf("documentation.pdf")
-                # Сохраняем для последующего использования
-                with open(text_file, 'w', encoding='utf-8') as f:
-                    f.write(text)
-                print(f"💾 Текст сохранен в {text_file}")
+        self.reset_stats(trace=trace_file is not None)
+        cache_key = None
+        has_pdf = pdf_path is not None and os.path.exists(pdf_path)
+        if use_cache and has_pdf:
+            # Кэш адресуется содержимым PDF, поэтому чужой extracted_text.txt
+            # не может подмешаться к новому документу
+            cache_key = self.cache.key_for(pdf_path, PARSER_VERSION)
+            cached = self.cache.load_results(cache_key)
+            if cached is not None:
+                print(f"⚡ Результаты для {pdf_path} найдены в кэше ({cache_key[:12]}...)")
+                report_progress(progress, "cache_hit", endpoints=len(cached["endpoints"]))
+                if self.cache.has_text(cache_key):
+                    # Базы знаний читают text_file: в нем должен быть текст
+                    # этого документа, а не оставшийся от предыдущего
+                    Path(text_file).parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(self.cache.text_path(cache_key), text_file)
+                if output_dir is not None:
+                    self.save_results_ultimate(cached["endpoints"], cached["mcp_data"], cached["quality"],
+                                               output_dir, cached["payloads"], mcp_format)
+                    report_progress(progress, "files_written", output_dir=str(output_dir))
+                self.print_ultimate_report(cached["quality"], output_dir)
+                return cached
+        
+        # Проверяем наличие извлеченного текста или PDF
+        Path(text_file).parent.mkdir(parents=True, exist_ok=True)
+        from_pdf = False
+        if cache_key is not None:
+            cached_text = self.cache.text_path(cache_key)
+            if self.cache.has_text(cache_key):
+                chunks = iter_text_file(str(cached_text))
+            else:
+                print(f"📄 Извлекаем текст из {pdf_path}...")
+                chunks = iter_document_chunks(pdf_path, cache_file=str(cached_text), workers=workers)
+                from_pdf = True
+        elif not os.path.exists(text_file):
+            if has_pdf:
+                print(f"📄 Файл {text_file} не найден, извлекаем текст из {pdf_path}...")
+                # Страницы пишутся в файл и сразу уходят в парсинг
+                chunks = iter_document_chunks(pdf_path, cache_file=text_file, workers=workers)
+                from_pdf = True
+            elif pdf_path is None:
+                raise FileNotFoundError(f"Не найден {text_file}!")
             else:
-                raise FileNotFoundError("Не найден ни extracted_text.txt, ни documentation.pdf!")
+                raise FileNotFoundError(f"Не найден ни {text_file}, ни {pdf_path}!")
         else:
-            # Загружаем готовый текст
-            with open(text_file, 'r', encoding='utf-8') as f:
-                text = f.read()
-            
-        print(f"📄 Загружено {len(text):,} символов")
-        
-        # Извлекаем endpoints
-        endpoints = self.extract_endpoints_ultimate(text)
-        
-        # Создаем MCP данные
-        mcp_data = self.create_mcp_data_ultimate(endpoints)
+            # Читаем готовый текст порциями
+            chunks = iter_text_file(text_file)
+        
+        if progress is not None:
+            if from_pdf:
+                total_pages = get_page_count(pdf_path)
+                report_progress(progress, "extracting", source="pdf", total_pages=total_pages)
+                chunks = track_pages(chunks, progress, total_pages)
+            else:
+                report_progress(progress, "extracting", source="text")
+        
+        # Извлекаем endpoints по мере поступления текста
+        with self.instrumentation.stage("extract_endpoints", source="pdf" if from_pdf else "text"):
+            endpoints = self.extract_endpoints_streaming(chunks, progress, parse_workers)
+        
+        print(f"📄 Обработано {self.stats['characters']:,} символов")
+        if cache_key is not None:
+            # Базы знаний (complete_extractor и др.) читают текст из text_file
+            shutil.copyfile(cached_text, text_file)
+        if from_pdf:
+            print(f"💾 Текст сохранен в {text_file}")
+        
+        # Выводим JSON Schema примеров и создаем MCP данные
+        with self.instrumentation.stage("infer_schemas"):
+            schemas = self.infer_schemas_ultimate(endpoints)
+        with self.instrumentation.stage("create_mcp_data"):
+            mcp_data = self.create_mcp_data_ultimate(endpoints, schemas)
+        report_progress(progress, "mcp_built", tools=len(mcp_data["tools"]))
         
         # Анализируем качество
-        quality_report = self.analyze_quality_ultimate(endpoints)
+        with self.instrumentation.stage("analyze_quality"):
+            quality_report = self.analyze_quality_ultimate(endpoints)
+        report_progress(progress, "quality_analyzed",
+                        mcp_readiness=quality_report.get("quality_metrics", {}).get("mcp_readiness_score"))
+        
+        # Замеры до сохранения (время записи файлов есть только в trace)
+        quality_report["instrumentation"] = self.instrumentation.report()
         
         # Сохраняем результаты
-        self.save_results_ultimate(endpoints, mcp_data, quality_report)
+        if output_dir is not None:
+            with self.instrumentation.stage("save_results"):
+                self.save_results_ultimate(endpoints, mcp_data, quality_report, output_dir,
+                                           self.payloads.to_dict(), mcp_format)
+            report_progress(progress, "files_written", output_dir=str(output_dir))
+        
+        if trace_file is not None:
+            self.instrumentation.export_chrome_trace(trace_file)
+            print(f"⏱️ Trace сохранен в {trace_file}")
         
         # Выводим отчет
-        self.print_ultimate_report(quality_report)
+        self.print_ultimate_report(quality_report, output_dir)
         
-        return {
+        results = {
             "endpoints": endpoints,
             "mcp_data": mcp_data,
-            "quality": quality_report
+            "quality": quality_report,
+            "payloads": self.payloads.to_dict()
         }
+        
+        if cache_key is not None:
+            # Кэш - оптимизация: ошибка записи в него не отменяет готовый парсинг
+            try:
+                self.cache.store_results(cache_key, results)
+            except OSError as e:
+                print(f"⚠️ Не удалось сохранить результаты в кэш: {e}")
+        
+        return results
 
-    def extract_endpoints_ultimate(self, text: str) -> List[Dict]:
+    def extract_endpoints_ultimate(self, text: str, parse_workers: int = 1) -> List[Dict]:
         """Извлечение endpoints с проверенным алгоритмом"""
+        return self.extract_endpoints_streaming([text], parse_workers=parse_workers)
+
+    def extract_endpoints_streaming(self, chunks: Iterable[str],
+                                    progress: Optional[ProgressCallback] = None,
+                                    parse_workers: int = 1) -> List[Dict]:
+        """Извлечение endpoints из текста, поступающего порциями.
+        
+        Секции всех уникальных Method/URL пар находятся за один проход;
+        каждая секция парсится, как только известна ее граница. С
+        parse_workers > 1 секции разбираются пачками в пуле процессов
+        (см. parallel_sections), порядок endpoints не меняется. Процессы
+        пула читают секции из общей памяти, поэтому в этом режиме текст
+        сначала собирается целиком.
+        """
         endpoints = []
+        index = 0
+        parsed = 0
+        parallel = None
+        if parse_workers > 1:
+            text = ''.join(chunks)
+            chunks = [text]
+            parallel = ParallelSectionParser(self, parse_workers, text)
+        # Процессам пула нужны только смещения секций
+        sectioner = EndpointSectioner(keep_text=parallel is None)
+        # Строки документа для поиска title/description (процессы пула
+        # индексируют строки своих секций сами)
+        line_index = LineIndex() if parallel is None else None
+        self.line_index = line_index
+        
+        def numbered(sections):
+            nonlocal index
+            for section in sections:
+                yield section, index
+                index += 1
+        
+        def parse_inline(sections):
+            for section, section_index in sections:
+                yield self.parse_section_instrumented(section.text, section.method, section.url,
+                                                      section_index, section.start)
+        
+        def parse_parallel(sections):
+            return parallel.feed((section.start, section.end, section.method, section.url, section_index)
+                                 for section, section_index in sections)
+        
+        def collect(results):
+            nonlocal parsed
+            for endpoint in results:
+                if endpoint:
+                    endpoints.append(endpoint)
+                parsed += 1
+                if parsed % PROGRESS_EVERY_ENDPOINTS == 0:
+                    report_progress(progress, "parsing", sections=parsed, endpoints=len(endpoints),
+                                    characters=sectioner.total_length)
         
-        # Находим все Method/URL пары
-        method_urls = re.findall(r'(GET|POST|PUT|DELETE)\s+(\S+)', text)
-        
-        # Удаляем дубликаты
-        unique_method_urls = []
-        seen = set()
-        for method, url in method_urls:
-            key = f"{method} {url}"
-            if key not in seen:
-                seen.add(key)
-                unique_method_urls.append((method, url))
-        
-        print(f"🔍 Найдено {len(method_urls)} Method/URL пар, уникальных: {len(unique_method_urls)}")
+        try:
+            for chunk in chunks:
+                if line_index is not None:
+                    line_index.feed(chunk)
+                sections = numbered(sectioner.feed(chunk))
+                collect(parse_parallel(sections) if parallel else parse_inline(sections))
+            if line_index is not None:
+                line_index.finish()
+            sections = numbered(sectioner.finish())
+            if parallel:
+                collect(parse_parallel(sections))
+                collect(parallel.finish())
+            else:
+                collect(parse_inline(sections))
+        finally:
+            self.line_index = None
+            if parallel:
+                parallel.close()
         
-        # Обрабатываем каждый endpoint
-        for i, (method, url) in enumerate(unique_method_urls):
-            endpoint = self.parse_endpoint_ultimate(text, method, url, i)
-            if endpoint:
-                endpoints.append(endpoint)
+        print(f"🔍 Найдено уникальных Method/URL пар: {index}")
+        report_progress(progress, "endpoints_sectioned", sections=index, characters=sectioner.total_length)
         
+        self.stats["characters"] = sectioner.total_length
         self.stats["endpoints"] = len(endpoints)
+        report_progress(progress, "endpoints_parsed", endpoints=len(endpoints), errors=len(self.stats["errors"]))
         return endpoints
 
-    def parse_endpoint_ultimate(self, text: str, method: str, url: str, index: int) -> Optional[Dict]:
-        """Парсинг отдельного endpoint с максимальным качеством"""
+    def parse_section_instrumented(self, section: Optional[str], method: str, url: str,
+                                   index: int, section_start: Optional[int] = None) -> Optional[Dict]:
+        """parse_endpoint_ultimate с замером времени для инструментирования"""
+        start = time.perf_counter()
+        endpoint = self.parse_endpoint_ultimate(section, method, url, index, section_start)
+        self.instrumentation.record_endpoint(method, url, start, time.perf_counter() - start,
+                                             len(section or ''))
+        return endpoint
+
+    def parse_endpoint_ultimate(self, section: str, method: str, url: str, index: int,
+                                section_start: Optional[int] = None) -> Optional[Dict]:
+        """Парсинг отдельного endpoint с максимальным качеством.
+        
+        section_start - смещение секции в документе, строки которого
+        проиндексированы в self.line_index
+        """
         try:
-            # Находим секцию endpoint
-            section = self.extract_endpoint_section(text, method, url, index)
             if not section:
                 return None
             
             # Извлекаем title и description с интеллектуальным анализом
-            title, description = self.extract_title_description_ultimate(section)
+            title, description = self.extract_title_description_ultimate(section, section_start)
             
             # Определяем расширенную категорию
             category = self.determine_category_ultimate(url, title, description)
@@ -268,123 +559,87 @@ class FleethandUltimateParser:
             self.stats["errors"].append(f"Ошибка парсинга {method} {url}: {e}")
             return None
 
-    def extract_endpoint_section(self, text: str, method: str, url: str, index: int) -> Optional[str]:
-        """Извлечение секции endpoint (проверенный алгоритм)"""
-        
-        # Находим позицию этого Method/URL
-        pattern = rf'\b{re.escape(method)}\s+{re.escape(url)}\b'
-        matches = list(re.finditer(pattern, text))
-        
-        if not matches:
-            return None
-            
-        match = matches[0]  # Берем первое совпадение
-        start_pos = match.start()
-        
-        # Определяем границы секции
-        next_method_pattern = r'\n(?:GET|POST|PUT|DELETE)\s+\S+'
-        next_match = re.search(next_method_pattern, text[match.end():])
-        
-        if next_match:
-            end_pos = match.end() + next_match.start()
-        else:
-            end_pos = len(text)
-        
-        return text[start_pos:end_pos]
-
-    def extract_title_description_ultimate(self, section: str) -> Tuple[str, str]:
+    def extract_title_description_ultimate(self, section: str,
+                                           section_start: Optional[int] = None) -> Tuple[str, str]:
         """Интеллектуальное извлечение title и description"""
-        lines = section.split('\n')
+        lines = SectionLines.for_section(section, self.line_index, section_start)
         
         title = ""
         description = ""
         
         # Находим позицию "Method" в секции
-        method_line_idx = -1
-        for i, line in enumerate(lines):
-            if line.strip() == "Method":
-                method_line_idx = i
-                break
+        method_line_idx = lines.method_line()
         
         if method_line_idx == -1:
             return "", ""
         
-        # Ищем title перед Method
-        title_candidates = []
-        for i in range(max(0, method_line_idx - 20), method_line_idx):
-            line = lines[i].strip()
-            
-            if self.is_valid_title_ultimate(line):
-                title_candidates.append((i, line))
+        # Ищем ближайший title перед Method (не дальше 20 строк)
+        title_idx = -1
+        for i in range(method_line_idx - 1, max(0, method_line_idx - 20) - 1, -1):
+            if self.line_has_class(lines, i, TITLE_LINE):
+                title_idx = i
+                break
         
         # Берем лучший title
-        if title_candidates:
-            closest_title = title_candidates[-1][1]
-            title = closest_title
+        if title_idx != -1:
+            title = lines[title_idx].strip()
             
             # Интеллектуальный поиск description
-            description = self.find_intelligent_description(lines, title_candidates[-1][0], method_line_idx)
+            description = self.find_intelligent_description(lines, title_idx, method_line_idx)
         
         return title, description
 
+    def line_has_class(self, lines: SectionLines, i: int, line_class: int) -> bool:
+        """Проверка класса строки секции (TITLE_LINE, DESCRIPTION_LINE).
+        
+        Строка классифицируется один раз, результат хранится в индексе строк.
+        """
+        flags = lines.flags(i)
+        if not flags:
+            line = lines[i].strip()
+            flags = CLASSIFIED
+            if self.is_valid_title_ultimate(line):
+                flags |= TITLE_LINE
+            if self.is_valid_description_ultimate(line):
+                flags |= DESCRIPTION_LINE
+            lines.set_flags(i, flags)
+        return bool(flags & line_class)
+
     def is_valid_title_ultimate(self, line: str) -> bool:
         """Улучшенная валидация title"""
         if not line or len(line) < 5:
             return False
             
         # Исключаем технические строки
-        invalid_patterns = [
-            r'^\d+$', r'^=== Страница \d+ ===$', r'^Fleethand API$',
-            r'^Activities$|^Vehicles$|^Drivers$|^Documents$|^Forms$|^Reports$', r'^\d+ \w+$',
-            r'^Request$|^Method$|^URL$', r'^https?://', r'^\w{1,3}$',
-            r'^Status$|^Response$|^Key$|^Data type$|^Required$|^Description$'
-        ]
-        
-        for pattern in invalid_patterns:
-            if re.match(pattern, line):
-                return False
-        
-        # Расширенные позитивные индикаторы
-        action_words = ['get', 'create', 'update', 'delete', 'assign', 'append', 'confirm', 
-                       'upload', 'download', 'initiate', 'cancel', 'remove', 'reject',
-                       'add', 'insert', 'upsert', 'fill']
-        
-        api_words = ['activities', 'configuration', 'vehicle', 'driver', 'document', 
-                    'files', 'reports', 'sheets', 'crossings', 'groups', 'form',
-                    'cards', 'companies', 'expense', 'trip', 'eco']
+        if INVALID_TITLE_RE.match(line):
+            return False
         
         # Проверяем что есть либо action word либо api word + длина >= 2 слова
-        has_action = any(word in line.lower() for word in action_words)
-        has_api_term = any(word in line.lower() for word in api_words)
-        
-        return (len(line.split()) >= 2 and (has_action or has_api_term))
+        return len(line.split()) >= 2 and TITLE_WORDS_RE.search(line.lower()) is not None
 
-    def find_intelligent_description(self, lines: List[str], title_idx: int, method_line_idx: int) -> str:
+    def find_intelligent_description(self, lines: SectionLines, title_idx: int, method_line_idx: int) -> str:
         """Интеллектуальный поиск description с множественными стратегиями"""
         
         # Стратегия 1: Ищем сразу после title
         for i in range(title_idx + 1, min(title_idx + 5, method_line_idx)):
-            line = lines[i].strip()
-            if self.is_valid_description_ultimate(line):
-                return line
+            if self.line_has_class(lines, i, DESCRIPTION_LINE):
+                return lines[i].strip()
         
         # Стратегия 2: Ищем в более широком диапазоне
         for i in range(max(0, title_idx - 5), method_line_idx):
-            line = lines[i].strip()
-            if self.is_valid_description_ultimate(line):
-                return line
+            if self.line_has_class(lines, i, DESCRIPTION_LINE):
+                return lines[i].strip()
         
         # Стратегия 3: Ищем после Method (иногда описание идет там)
         for i in range(method_line_idx + 1, min(len(lines), method_line_idx + 10)):
-            line = lines[i].strip()
-            if self.is_valid_description_ultimate(line):
-                return line
+            if self.line_has_class(lines, i, DESCRIPTION_LINE):
+                return lines[i].strip()
         
         # Стратегия 4: Ищем паттерны в объединенном тексте
         text_around_title = ' '.join(lines[max(0, title_idx-3):min(len(lines), title_idx+7)])
         
         for pattern in self.description_patterns:
-            match = re.search(pattern, text_around_title, re.IGNORECASE)
+            match = pattern.search(text_around_title)
             if match:
                 full_sentence = self.extract_full_sentence(text_around_title, match.start())
                 if len(full_sentence) > 20:
@@ -398,9 +653,8 @@ class FleethandUltimateParser:
             return False
         
         # Проверяем паттерны
-        for pattern in self.description_patterns:
-            if re.match(pattern, line, re.IGNORECASE):
-                return True
+        if DESCRIPTION_START_RE.match(line):
+            return True
         
         # Дополнительные проверки
         return (line[0].isupper() and '.' in line and 
@@ -433,8 +687,8 @@ class FleethandUltimateParser:
         
         # Проверяем по URL паттернам
         for category_name, category_info in self.advanced_categories.items():
-            for pattern in category_info['patterns']:
-                if re.search(pattern, url, re.IGNORECASE):
+            for pattern in self.category_url_patterns[category_name]:
+                if pattern.search(url):
                     return {
                         "name": category_name,
                         "description": category_info['description'],
@@ -498,10 +752,7 @@ class FleethandUltimateParser:
         """Исправленное извлечение headers - формат построчный"""
         headers = []
         
-        headers_match = re.search(
-            r'Request headers\s*\n(.*?)(?=Request parameters|Request body|Response example|Request model|$)', 
-            section, re.DOTALL
-        )
+        headers_match = HEADERS_SECTION_RE.search(section)
         
         if not headers_match:
             return headers
@@ -556,10 +807,7 @@ class FleethandUltimateParser:
         """Исправленное извлечение parameters - формат построчный"""
         parameters = []
         
-        params_match = re.search(
-            r'Request parameters\s*\n(.*?)(?=Request body|Response example|Request model|$)', 
-            section, re.DOTALL
-        )
+        params_match = PARAMS_SECTION_RE.search(section)
         
         if not params_match:
             return parameters
@@ -616,7 +864,7 @@ class FleethandUltimateParser:
         responses = []
         
         # Ищем секции Response example
-        response_sections = re.findall(r'Response example\s*\n(.*?)(?=\n\n|\Z)', section, re.DOTALL)
+        response_sections = RESPONSE_SECTION_RE.findall(section)
         
         for response_text in response_sections:
             response_text = response_text.strip()
@@ -652,16 +900,9 @@ class FleethandUltimateParser:
                     i += 1
                     continue
                 
-                # Собираем JSON
-                json_lines = []
-                for j in range(json_start, len(lines)):
-                    json_line = lines[j]
-                    json_lines.append(json_line)
-                    
-                    if self.is_json_complete('\n'.join(json_lines)):
-                        break
-                
-                json_text = '\n'.join(json_lines)
+                # Собираем JSON: конец значения находится одним проходом
+                # сканера, и в декодер уходит ровно этот срез
+                json_text = self.slice_json_value(lines, json_start)
                 response_example = self.parse_and_fix_json_ultimate(json_text)
                 break
             
@@ -670,52 +911,73 @@ class FleethandUltimateParser:
                 responses.append({
                     "status_code": status_code,
                     "description": f"HTTP {status_code} response",
-                    "example": response_example,
+                    "example_id": self.payloads.intern(response_example),
                     "validated": self.validate_response_structure(response_example)
                 })
         
         self.stats["responses"] += len(responses)
         return responses
 
+    def decode_json(self, text: str) -> Any:
+        """json.loads с подсчетом вызовов и ошибок для инструментирования"""
+        self.instrumentation.count("json_decode")
+        try:
+            return json.loads(text)
+        except ValueError:
+            self.instrumentation.count("json_decode_errors")
+            raise
+
     def parse_and_fix_json_ultimate(self, json_text: str) -> Any:
-        """Улучшенный парсинг и исправление JSON"""
+        """Улучшенный парсинг и исправление JSON.
+        
+        Корректный JSON декодируется json.loads, поврежденный - за один
+        проход json_repair (исправления считаются в счетчиках
+        инструментирования json_repair.<вид>). Если JSON не читается и с
+        исправлениями, возвращается исходный текст.
+        """
         if not json_text.strip():
             return None
-            
+        
+        if not json_text.strip().startswith(('{', '[')):
+            return json_text
+        
         try:
-            if json_text.strip().startswith('{') or json_text.strip().startswith('['):
-                return json.loads(json_text)
-            else:
-                return json_text
+            return self.decode_json(json_text)
         except json.JSONDecodeError:
-            try:
-                # Применяем исправления
-                fixed_json = json_text
-                
-                # Исправляем распространенные ошибки
-                fixed_json = re.sub(r'("payload"\s*:\s*)([A-Z_][A-Z0-9_]*)', r'\1"\2"', fixed_json)
-                fixed_json = re.sub(r',(\s*[}\]])', r'\1', fixed_json)
-                
-                return json.loads(fixed_json)
-            except:
-                return json_text
-
-    def is_json_complete(self, text: str) -> bool:
-        """Проверка завершенности JSON"""
-        text = text.strip()
-        if not text:
-            return False
-            
+            pass
+        
         try:
-            json.loads(text)
-            return True
-        except:
-            if text.startswith('{'):
-                return text.count('{') == text.count('}') and text.endswith('}')
-            elif text.startswith('['):
-                return text.count('[') == text.count(']') and text.endswith(']')
-            
-        return False
+            value, repairs = repair_json(json_text)
+        except JsonRepairError:
+            self.instrumentation.count("json_repair_failed")
+            return json_text
+        
+        self.instrumentation.count("json_repaired")
+        for repair in repairs:
+            self.instrumentation.count(f"json_repair.{repair}")
+        return value
+
+    def slice_json_value(self, lines: List[str], json_start: int) -> str:
+        """Текст JSON-значения, начинающегося со строки json_start.
+        
+        Для объектов и массивов конец находится сканером скобок, поэтому
+        проза после закрывающей скобки в срез не попадает. Остальные
+        значения занимают одну строку, если она сама по себе валидный JSON,
+        иначе берется весь остаток (как и раньше).
+        """
+        text = '\n'.join(lines[json_start:])
+        
+        if text.startswith(('{', '[')):
+            end = find_json_end(text)
+            return text[:end] if end != -1 else text
+        
+        if json_start < len(lines):
+            try:
+                self.decode_json(lines[json_start])
+                return lines[json_start]
+            except ValueError:
+                pass
+        return text
 
     def validate_response_structure(self, response: Any) -> Dict:
         """Валидация структуры response"""
@@ -739,7 +1001,7 @@ class FleethandUltimateParser:
 
     def extract_request_body_ultimate(self, section: str) -> Optional[Any]:
         """Улучшенное извлечение request body"""
-        body_match = re.search(r'Request body\s*\n(.*?)(?=Response example|Request model|$)', section, re.DOTALL)
+        body_match = BODY_SECTION_RE.search(section)
         
         if not body_match:
             return None
@@ -789,7 +1051,7 @@ class FleethandUltimateParser:
         if not name or len(name) < 2:
             return False
         excluded = {'Key', 'Parameter', 'Data', 'Required', 'Description', 'Attribute', 'Type'}
-        return bool(re.match(r'^[a-zA-Z][a-zA-Z0-9_]*$', name)) and name not in excluded
+        return bool(IDENTIFIER_RE.match(name)) and name not in excluded
 
     def is_data_type(self, value: str) -> bool:
         valid_types = {
@@ -823,8 +1085,44 @@ class FleethandUltimateParser:
             return 'path'
         return 'query'
 
-    def create_mcp_data_ultimate(self, endpoints: List[Dict]) -> Dict:
-        """Создание расширенных MCP данных"""
+    def infer_schemas_ultimate(self, endpoints: List[Dict]) -> SchemaInferrer:
+        """JSON Schema примеров ответов и тел запросов.
+        
+        Схема выводится один раз на уникальный пример (id из self.payloads
+        или хэш тела запроса), общие структуры уходят в $defs.
+        """
+        schemas = SchemaInferrer()
+        for endpoint in endpoints:
+            for response in endpoint.get("responses", []):
+                example = self.payloads.get(response["example_id"])
+                if isinstance(example, (dict, list)):
+                    schemas.infer(example, response["example_id"], hint="response")
+            body = endpoint.get("request_body")
+            if isinstance(body, (dict, list)):
+                schemas.infer(body, hint="request_body")
+        
+        self.instrumentation.count("schema_inferred", schemas.stats["inferred"])
+        self.instrumentation.count("schema_memo_hits", schemas.stats["memo_hits"])
+        return schemas
+
+    def success_response(self, endpoint: Dict) -> Optional[Dict]:
+        """Первый 2xx response с примером-объектом (основа outputSchema)"""
+        for response in endpoint.get("responses", []):
+            if (response["status_code"].startswith("2")
+                    and isinstance(self.payloads.get(response["example_id"]), dict)):
+                return response
+        return None
+
+    def create_mcp_data_ultimate(self, endpoints: List[Dict], schemas: Optional[SchemaInferrer] = None) -> Dict:
+        """Создание расширенных MCP данных.
+        
+        schemas - результат infer_schemas_ultimate(): тело запроса
+        становится свойством body во inputSchema, пример успешного ответа -
+        outputSchema. Схемы самодостаточны: ссылки "#/$defs/..." указывают
+        на "$defs" корня самой схемы (MCP клиент получает tool отдельно).
+        """
+        if schemas is None:
+            schemas = self.infer_schemas_ultimate(endpoints)
         tools = []
         resources = []
         
@@ -859,6 +1157,20 @@ class FleethandUltimateParser:
                 if param["required"]:
                     tool["inputSchema"]["required"].append(param["name"])
             
+            # Тело запроса и ответ - по выведенным схемам
+            body = endpoint.get("request_body")
+            if isinstance(body, (dict, list)):
+                body_id = schemas.infer(body)
+                tool["inputSchema"]["properties"]["body"] = schemas.schema(body_id)
+                tool["inputSchema"]["required"].append("body")
+                body_defs = schemas.schema_definitions(body_id)
+                if body_defs:
+                    tool["inputSchema"]["$defs"] = body_defs
+            
+            response = self.success_response(endpoint)
+            if response is not None:
+                tool["outputSchema"] = schemas.standalone_schema(response["example_id"])
+            
             tools.append(tool)
             
             # Создаем MCP resource
@@ -876,9 +1188,10 @@ class FleethandUltimateParser:
             "tools": tools,
             "resources": resources,
             "metadata": {
-                "version": "ultimate_final_v8.0",
+                "version": PARSER_VERSION,
                 "total_tools": len(tools),
                 "total_resources": len(resources),
+                "total_schema_defs": len(schemas.definitions()),
                 "categories": list(set(e["category"] for e in endpoints)),
                 "generation_timestamp": datetime.now().isoformat()
             }
@@ -958,12 +1271,13 @@ class FleethandUltimateParser:
         
         return {
             "generation_time": datetime.now().isoformat(),
-            "parser_version": "ultimate_final_v8.0",
+            "parser_version": PARSER_VERSION,
             "statistics": {
                 "endpoints": total_endpoints,
                 "headers": self.stats["headers"],
                 "parameters": self.stats["parameters"],
                 "responses": self.stats["responses"],
+                "unique_response_examples": len(self.payloads),
                 "errors": len(self.stats["errors"])
             },
             "quality_metrics": {
@@ -1015,24 +1329,34 @@ class FleethandUltimateParser:
             
         return recommendations
 
-    def save_results_ultimate(self, endpoints: List[Dict], mcp_data: Dict, quality_report: Dict):
-        """Сохранение финальных результатов"""
-        output_dir = Path("ultimate_final_data")
-        output_dir.mkdir(exist_ok=True)
+    def save_results_ultimate(self, endpoints: List[Dict], mcp_data: Dict, quality_report: Dict,
+                              output_dir: str = DEFAULT_OUTPUT_DIR, payloads: Optional[Dict] = None,
+                              mcp_format: str = DEFAULT_MCP_FORMAT):
+        """Сохранение финальных результатов (payloads - таблица примеров
+        ответов {example_id: пример}, mcp_format - "inline" или "compact")"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
         
         # Сохраняем endpoints
-        with open(output_dir / "endpoints_ultimate_final.json", 'w', encoding='utf-8') as f:
+        with open(output_dir / f"{RESULT_FILES['endpoints']}.json", 'w', encoding='utf-8') as f:
             json.dump(endpoints, f, indent=2, ensure_ascii=False)
         
-        # Сохраняем MCP данные
-        with open(output_dir / "mcp_server_ultimate_final.json", 'w', encoding='utf-8') as f:
-            json.dump(mcp_data, f, indent=2, ensure_ascii=False)
+        # Сохраняем MCP данные (компактный формат - без отступов)
+        with open(output_dir / f"{RESULT_FILES['mcp_data']}.json", 'w', encoding='utf-8') as f:
+            if mcp_format == "compact":
+                json.dump(compact_mcp_data(mcp_data), f, ensure_ascii=False, separators=(',', ':'))
+            else:
+                json.dump(mcp_data, f, indent=2, ensure_ascii=False)
         
         # Сохраняем отчет о качестве
-        with open(output_dir / "quality_report_ultimate_final.json", 'w', encoding='utf-8') as f:
+        with open(output_dir / f"{RESULT_FILES['quality']}.json", 'w', encoding='utf-8') as f:
             json.dump(quality_report, f, indent=2, ensure_ascii=False)
+        
+        # Сохраняем общую таблицу примеров ответов
+        with open(output_dir / f"{RESULT_FILES['payloads']}.json", 'w', encoding='utf-8') as f:
+            json.dump(payloads or {}, f, indent=2, ensure_ascii=False)
 
-    def print_ultimate_report(self, quality_report: Dict):
+    def print_ultimate_report(self, quality_report: Dict, output_dir: Optional[str] = DEFAULT_OUTPUT_DIR):
         """Финальный отчет о результатах"""
         stats = quality_report.get("statistics", {})
         metrics = quality_report.get("quality_metrics", {})
@@ -1042,7 +1366,7 @@ class FleethandUltimateParser:
         print(f"✅ MCP Resources: {stats.get('endpoints', 0)}")
         print(f"✅ Headers: {stats.get('headers', 0)}")
         print(f"✅ Parameters: {stats.get('parameters', 0)}")
-        print(f"✅ Responses: {stats.get('responses', 0)}")
+        print(f"✅ Responses: {stats.get('responses', 0)} (уникальных примеров: {stats.get('unique_response_examples', 0)})")
         
         quality_improvements = metrics.get('quality_improvements', {})
         print(f"✅ Качество titles: {quality_improvements.get('title_quality', '0%')}")
@@ -1050,7 +1374,16 @@ class FleethandUltimateParser:
         print(f"✅ MCP готовность: {metrics.get('mcp_readiness_score', '0%')}")
         print(f"✅ Итоговое качество: {metrics.get('professional_quality', 'UNKNOWN')}")
         
-        print(f"💾 РЕЗУЛЬТАТЫ СОХРАНЕНЫ: /Users/rusty/fleethead-parser/ultimate_final_data")
+        instrumentation = quality_report.get("instrumentation")
+        if instrumentation:
+            stages = ", ".join(f"{stage['stage']} {stage['wall_seconds']:.2f}с"
+                               for stage in instrumentation["stages"])
+            timing = instrumentation["endpoint_timing"]
+            print(f"⏱️ Стадии: {stages}")
+            print(f"⏱️ Endpoint: p50 {timing['p50_ms']}мс, p99 {timing['p99_ms']}мс, max {timing['max_ms']}мс")
+        
+        if output_dir is not None:
+            print(f"💾 РЕЗУЛЬТАТЫ СОХРАНЕНЫ: {Path(output_dir).resolve()}")
         
         print("\n" + "=" * 70)
         print("🏆 FLEETHAND ULTIMATE PARSING ЗАВЕРШЕН!")
@@ -1071,5 +1404,7 @@ class FleethandUltimateParser:
 
 
 if __name__ == "__main__":
-    parser = FleethandUltimateParser()
-    results = parser.parse()
\ No newline at end of file
+    import sys
+    from parser_cli import main
+    
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+📈 Инструментирование парсинга
+==============================
+Собирает за один парсинг:
+- wall и CPU время каждой стадии (stage)
+- время разбора каждого endpoint: перцентили и самые медленные N
+  вместе с размером их секций
+- счетчики (например, вызовы json.loads и неудачные декодирования)
+- вызовы регулярных выражений из реестра patterns.REGISTRY, если в нем
+  включено профилирование (REGISTRY.enable_profiling(), заметно замедляет)
+
+report() отдает словарь для quality_report_ultimate_final.json, а
+export_chrome_trace() - файл для chrome://tracing или https://ui.perfetto.dev.
+
+При параллельном разборе каждый процесс пула ведет свой экземпляр, а
+основной процесс объединяет их через merge().
+"""
+
+import heapq
+import json
+import os
+import time
+from array import array
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from patterns import REGISTRY
+
+DEFAULT_SLOWEST_ENDPOINTS = 10
+
+# Дорожки trace: стадии и endpoints отображаются отдельными строками
+_STAGE_LANE = 0
+_ENDPOINT_LANE = 1
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Перцентиль по методу ближайшего ранга (значения уже отсортированы)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class ParseInstrumentation:
+    def __init__(self, slowest: int = DEFAULT_SLOWEST_ENDPOINTS, trace: bool = False):
+        self.slowest = slowest
+        self.trace = trace
+
+        self.stages: List[Dict[str, Any]] = []
+        self.endpoint_seconds = array('d')
+        self.counters: Dict[str, int] = defaultdict(int)
+
+        self._slowest_heap: List[Tuple[float, int, str, str, int]] = []
+        self._trace_events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+        # Счетчики реестра накопительные: запоминаем их на старте
+        self._regex_baseline = self._regex_totals() if REGISTRY.profiling else None
+        # Вызовы регулярных выражений в других процессах (из merge)
+        self._regex_merged: Dict[str, List] = {}
+
+    @contextmanager
+    def stage(self, name: str, **args):
+        """Замер стадии: with instrumentation.stage("create_mcp_data"): ..."""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            self.stages.append({
+                "stage": name,
+                "wall_seconds": round(wall, 4),
+                "cpu_seconds": round(cpu, 4)
+            })
+            if self.trace:
+                self._trace_event(name, "stage", wall_start, wall, _STAGE_LANE,
+                                  {"cpu_seconds": round(cpu, 4), **args})
+
+    def record_endpoint(self, method: str, url: str, start: float, seconds: float, section_chars: int):
+        """Время разбора одного endpoint (start - time.perf_counter() на старте)"""
+        self.endpoint_seconds.append(seconds)
+        item = (seconds, len(self.endpoint_seconds), method, url, section_chars)
+        if len(self._slowest_heap) < self.slowest:
+            heapq.heappush(self._slowest_heap, item)
+        elif seconds > self._slowest_heap[0][0]:
+            heapq.heapreplace(self._slowest_heap, item)
+
+        if self.trace:
+            self._trace_event(f"{method} {url}", "endpoint", start, seconds, _ENDPOINT_LANE,
+                              {"section_chars": section_chars})
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def regex_deltas(self) -> Dict[str, Tuple[int, int, float]]:
+        """Вызовы, совпадения и время по паттернам с момента создания (в этом процессе)"""
+        if self._regex_baseline is None or not REGISTRY.profiling:
+            return {}
+        deltas = {}
+        for name, (calls, hits, seconds) in self._regex_totals().items():
+            base_calls, base_hits, base_seconds = self._regex_baseline.get(name, (0, 0, 0.0))
+            if calls > base_calls:
+                deltas[name] = (calls - base_calls, hits - base_hits, seconds - base_seconds)
+        return deltas
+
+    def merge(self, other: 'ParseInstrumentation',
+              regex_deltas: Optional[Dict[str, Tuple[int, int, float]]] = None):
+        """Добавляет замеры endpoints, счетчики и trace другого экземпляра.
+
+        regex_deltas - other.regex_deltas(), снятые в процессе other (реестр
+        паттернов у каждого процесса свой).
+        """
+        self.endpoint_seconds.extend(other.endpoint_seconds)
+        for item in other._slowest_heap:
+            if len(self._slowest_heap) < self.slowest:
+                heapq.heappush(self._slowest_heap, item)
+            elif item[0] > self._slowest_heap[0][0]:
+                heapq.heapreplace(self._slowest_heap, item)
+        for name, n in other.counters.items():
+            self.counters[name] += n
+        for name, values in (regex_deltas or {}).items():
+            merged = self._regex_merged.setdefault(name, [0, 0, 0.0])
+            for i, value in enumerate(values):
+                merged[i] += value
+
+        if self.trace:
+            # perf_counter монотонный для всей системы: сдвигаем на разницу начал
+            shift = (other._origin - self._origin) * 1e6
+            for event in other._trace_events:
+                self._trace_events.append({**event, "ts": round(event["ts"] + shift, 1)})
+
+    def report(self) -> Dict[str, Any]:
+        timings = sorted(self.endpoint_seconds)
+        total = sum(timings)
+
+        def to_ms(seconds: float) -> float:
+            return round(seconds * 1000, 3)
+
+        return {
+            "stages": list(self.stages),
+            "endpoint_timing": {
+                "count": len(timings),
+                "total_seconds": round(total, 4),
+                "mean_ms": to_ms(total / len(timings)) if timings else 0.0,
+                "p50_ms": to_ms(percentile(timings, 0.50)),
+                "p90_ms": to_ms(percentile(timings, 0.90)),
+                "p99_ms": to_ms(percentile(timings, 0.99)),
+                "max_ms": to_ms(timings[-1]) if timings else 0.0
+            },
+            "slowest_endpoints": [
+                {"method": method, "path": url, "ms": to_ms(seconds), "section_chars": section_chars}
+                for seconds, _, method, url, section_chars in sorted(self._slowest_heap, reverse=True)
+            ],
+            "counters": dict(self.counters),
+            "regex": self._regex_report()
+        }
+
+    def export_chrome_trace(self, path: str):
+        """Сохраняет события в формате Chrome Trace Event (JSON)"""
+        # Процессы пула (после merge) получают свои дорожки с теми же именами
+        pids = sorted({self._pid} | {event["pid"] for event in self._trace_events})
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": lane, "args": {"name": name}}
+            for pid in pids
+            for lane, name in ((_STAGE_LANE, "stages"), (_ENDPOINT_LANE, "endpoints"))
+        ]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": metadata + self._trace_events, "displayTimeUnit": "ms"},
+                      f, ensure_ascii=False)
+
+    def _trace_event(self, name: str, category: str, start: float, seconds: float,
+                     lane: int, args: Dict[str, Any]):
+        self._trace_events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 1),
+            "dur": round(seconds * 1e6, 1),
+            "pid": self._pid,
+            "tid": lane,
+            "args": args
+        })
+
+    @staticmethod
+    def _regex_totals() -> Dict[str, Tuple[int, int, float]]:
+        return {
+            tracked.name: (tracked.calls, tracked.hits, tracked.seconds)
+            for tracked in REGISTRY
+        }
+
+    def _regex_report(self) -> Dict[str, Any]:
+        if (self._regex_baseline is None or not REGISTRY.profiling) and not self._regex_merged:
+            return {"profiling": False}
+
+        totals = {name: list(values) for name, values in self._regex_merged.items()}
+        for name, values in self.regex_deltas().items():
+            merged = totals.setdefault(name, [0, 0, 0.0])
+            for i, value in enumerate(values):
+                merged[i] += value
+
+        rows = [
+            {"name": name, "calls": calls, "hits": hits, "seconds": round(seconds, 6)}
+            for name, (calls, hits, seconds) in totals.items()
+        ]
+        rows.sort(key=lambda row: row["seconds"], reverse=True)
+        return {
+            "profiling": True,
+            "calls": sum(row["calls"] for row in rows),
+            "hits": sum(row["hits"] for row in rows),
+            "seconds": round(sum(row["seconds"] for row in rows), 6),
+            "top": rows[:self.slowest]
+        }
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+📬 Очередь задач парсинга
+=========================
+Загрузка PDF ставит задачу в очередь и сразу возвращает ее id, а сам
+парсинг выполняется в ограниченном пуле процессов. Статус и результат
+задачи доступны по id (веб-интерфейс отдает их через /jobs/<id>).
+
+Статусы задачи: queued -> running -> done | failed
+
+Runner получает аргумент progress - функцию, которой он сообщает события
+прогресса (словари). События передаются из процесса пула в основной
+через общий канал multiprocessing.Queue и доступны через iter_events();
+последним событием задачи всегда идет {"stage": "done" | "failed"}.
+
+Аварии процессов пула: если процесс умер (segfault PyMuPDF, OOM) или
+задача превысила job_timeout (процесс останавливается принудительно),
+ProcessPoolExecutor становится непригодным. Очередь создает и прогревает
+новый пул; задача, чей процесс упал, завершается с ошибкой, а остальные
+задачи сломанного пула перезапускаются в новом (событие
+{"stage": "requeued"}).
+"""
+
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Сколько хранить завершенные задачи, прежде чем забыть о них
+DEFAULT_JOB_TTL_SECONDS = 60 * 60
+
+# Сколько ждать последние события задачи, пришедшие позже ее результата
+EVENTS_DRAIN_TIMEOUT_SECONDS = 2.0
+
+# Предельное время выполнения задачи (как прежний таймаут subprocess.run)
+DEFAULT_JOB_TIMEOUT_SECONDS = 5 * 60
+
+# Как часто проверять сроки выполняемых задач
+DEADLINE_CHECK_SECONDS = 1.0
+
+# Сколько раз задача перезапускается, если пул сломала чужая задача
+MAX_JOB_RESTARTS = 3
+
+# Так пул останавливает уцелевшие процессы сломанного пула
+_POOL_TERMINATED_EXITCODE = -signal.SIGTERM
+
+# Сигнал остановки зависшего процесса
+_KILL_SIGNAL = getattr(signal, "SIGKILL", signal.SIGTERM)
+
+# Канал событий прогресса в процессе пула (задается в _init_process)
+_events_channel = None
+
+
+def _init_process(channel, initializer: Optional[Callable[[], None]]):
+    global _events_channel
+    _events_channel = channel
+    if initializer is not None:
+        initializer()
+
+
+def _run_job(runner: Callable[..., Dict[str, Any]], job_id: str, attempt: int,
+             args: tuple) -> Dict[str, Any]:
+    """Выполняет runner в процессе пула, пересылая его события прогресса.
+
+    Сообщения канала - (job_id, attempt, сообщение): pid процесса при
+    старте задачи, словарь события или None - "событий больше не будет".
+    """
+    _events_channel.put((job_id, attempt, os.getpid()))
+
+    def progress(event: Dict[str, Any]):
+        _events_channel.put((job_id, attempt, event))
+
+    try:
+        return runner(*args, progress=progress)
+    finally:
+        _events_channel.put((job_id, attempt, None))
+
+
+def _noop():
+    """Пустая задача для прогрева пула"""
+
+
+class JobQueue:
+    def __init__(self, runner: Callable[..., Dict[str, Any]], max_workers: int = 1,
+                 on_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 job_ttl: float = DEFAULT_JOB_TTL_SECONDS,
+                 initializer: Optional[Callable[[], None]] = None,
+                 job_timeout: Optional[float] = DEFAULT_JOB_TIMEOUT_SECONDS):
+        """
+        runner      - функция, выполняемая в процессе пула; принимает аргументы
+                      submit() и progress=..., возвращает словарь с ключом
+                      'success' (как web_interface.run_parser)
+        on_done     - вызывается в основном процессе для каждой завершенной задачи
+                      (в потоке завершения задач, не в потоке пула процессов)
+        initializer - вызывается один раз при старте каждого процесса пула
+                      (например, parser_worker.init_worker загружает парсер)
+        job_timeout - предельное время выполнения задачи в секундах (None -
+                      без ограничения); процесс зависшей задачи останавливается
+        """
+        self.runner = runner
+        self.max_workers = max_workers
+        self.on_done = on_done
+        self.job_ttl = job_ttl
+        self.initializer = initializer
+        self.job_timeout = job_timeout
+
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        # Текущий запуск задачи: future, пул, номер попытки, pid процесса,
+        # время старта, признак "процесс остановлен по сроку"
+        self._runs: Dict[str, Dict[str, Any]] = {}
+        self._events: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._closed = threading.Event()
+        # Завершение задач (ожидание последних событий, on_done) идет здесь:
+        # callback future выполняется в служебном потоке пула процессов и,
+        # если его задержать, пул перестает отдавать результаты и принимать задачи
+        self._finisher = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-finish")
+
+        self._executor, self._channel, self._listener = self._new_executor()
+        self._listener.start()
+        self._watchdog = None
+        if job_timeout is not None:
+            self._watchdog = threading.Thread(target=self._watch_deadlines, name="job-deadlines", daemon=True)
+            self._watchdog.start()
+
+    def submit(self, *args, **meta) -> str:
+        """Ставит задачу в очередь и возвращает ее id"""
+        self._forget_expired()
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            **meta
+        }
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self._events[job_id] = []
+            future = self._start(job_id, args, attempt=0)
+
+        self._watch(job_id, future)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Снимок состояния задачи или None, если такой задачи нет"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+
+            run = self._runs.get(job_id)
+            if job["status"] == "queued" and run is not None and run["future"].running():
+                job["status"] = "running"
+                job["started_at"] = time.time()
+            return dict(job)
+
+    def iter_events(self, job_id: str, start: int = 0,
+                    keepalive: float = 15.0) -> Iterator[Optional[Tuple[int, Dict[str, Any]]]]:
+        """События задачи как (номер, событие) по мере поступления, начиная с start.
+
+        Если за keepalive секунд ничего не пришло, выдает None (чтобы клиент
+        мог поддержать соединение). Заканчивается после финального события.
+        """
+        position = start
+        while True:
+            with self._changed:
+                events = self._events.get(job_id)
+                if events is None:
+                    return
+                if position >= len(events):
+                    if self._jobs[job_id]["finished_at"] is not None:
+                        return
+                    self._changed.wait(keepalive)
+                batch = events[position:]
+
+            if not batch:
+                yield None
+                continue
+            for event in batch:
+                yield position, event
+                position += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Количество задач по статусам"""
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        with self._lock:
+            job_ids = list(self._jobs)
+        for job_id in job_ids:
+            job = self.get(job_id)
+            if job is not None:
+                counts[job["status"]] += 1
+        return counts
+
+    def warm_up(self):
+        """Запускает процессы пула заранее, чтобы первая задача не ждала
+        старта процесса и его initializer"""
+        with self._lock:
+            executor = self._executor
+        futures = [executor.submit(_noop) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self, wait: bool = True):
+        self._closed.set()
+        with self._lock:
+            executor, channel, listener = self._executor, self._channel, self._listener
+        executor.shutdown(wait=wait)
+        self._finisher.shutdown(wait=wait)
+        channel.put(None)
+        if wait:
+            listener.join()
+            if self._watchdog is not None:
+                self._watchdog.join()
+
+    def _new_executor(self) -> Tuple[ProcessPoolExecutor, Any, threading.Thread]:
+        """Пул процессов со своим каналом событий и потоком, который его читает.
+        Канал у каждого пула свой: процесс, убитый во время записи в канал,
+        оставляет его блокировку занятой навсегда."""
+        channel = multiprocessing.Queue()
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, initializer=_init_process,
+            initargs=(channel, self.initializer)
+        )
+        # Поток запускает вызывающий, когда пул станет текущим (self._channel)
+        listener = threading.Thread(target=self._listen, args=(channel,), name="job-events", daemon=True)
+        return executor, channel, listener
+
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Новый пул вместо сломанного (один раз на сломанный пул).
+        Вызывается под self._lock."""
+        if self._executor is broken:
+            print("⚠️ Процесс пула аварийно завершился, пул процессов пересоздается")
+            # Сломанный пул сам останавливает свои процессы, поток его канала
+            # завершается, когда канал опустеет
+            self._executor, self._channel, self._listener = self._new_executor()
+            self._listener.start()
+            # Прогрев без ожидания: процессы стартуют и выполняют initializer,
+            # пока задачи еще перезапускаются
+            for _ in range(self.max_workers):
+                self._executor.submit(_noop)
+        return self._executor
+
+    def _start(self, job_id: str, args: tuple, attempt: int) -> Future:
+        """Отправляет задачу в пул (под self._lock). Callback на future
+        ставит вызывающий после освобождения блокировки (_watch)."""
+        executor = self._executor
+        try:
+            future = executor.submit(_run_job, self.runner, job_id, attempt, args)
+        except BrokenProcessPool:
+            executor = self._replace_executor(executor)
+            future = executor.submit(_run_job, self.runner, job_id, attempt, args)
+        self._runs[job_id] = {
+            "future": future,
+            "executor": executor,
+            "args": args,
+            "attempt": attempt,
+            "pid": None,
+            "started_at": None,
+            "timed_out": False,
+            "drained": threading.Event()
+        }
+        return future
+
+    def _watch(self, job_id: str, future: Future):
+        """Завершенная задача передается в поток завершения (_finished)"""
+        future.add_done_callback(lambda f, job_id=job_id: self._finisher.submit(self._finished, job_id, f))
+
+    def _listen(self, channel):
+        """Принимает события прогресса из процессов пула"""
+        while True:
+            try:
+                item = channel.get(timeout=DEADLINE_CHECK_SECONDS)
+            except queue.Empty:
+                if channel is not self._channel:
+                    # Пул заменен новым, его процессы остановлены
+                    return
+                continue
+            if item is None:
+                return
+            job_id, attempt, message = item
+            with self._changed:
+                job = self._jobs.get(job_id)
+                run = self._runs.get(job_id)
+                # Сообщения прежней попытки перезапущенной задачи не нужны
+                if job is None or run is None or run["attempt"] != attempt:
+                    continue
+                if message is None:
+                    run["drained"].set()
+                    continue
+                if isinstance(message, int):
+                    # Задача началась: с этого момента идет ее срок
+                    run["pid"] = message
+                    run["started_at"] = time.time()
+                    if job["status"] == "queued":
+                        job["status"] = "running"
+                        job["started_at"] = run["started_at"]
+                    continue
+                message.setdefault("time", time.time())
+                self._events[job_id].append(message)
+                self._changed.notify_all()
+
+    def _watch_deadlines(self):
+        """Останавливает процессы задач, превысивших job_timeout"""
+        while not self._closed.wait(DEADLINE_CHECK_SECONDS):
+            now = time.time()
+            with self._lock:
+                expired = [
+                    (job_id, run) for job_id, run in self._runs.items()
+                    if run["started_at"] is not None and not run["timed_out"]
+                    and now - run["started_at"] > self.job_timeout
+                ]
+                for _, run in expired:
+                    run["timed_out"] = True
+            for job_id, run in expired:
+                print(f"⏱️ Задача {job_id} выполняется дольше {self.job_timeout:.0f} с, "
+                      f"останавливаем процесс {run['pid']}")
+                try:
+                    os.kill(run["pid"], _KILL_SIGNAL)
+                except OSError:
+                    # Процесс уже завершился сам
+                    pass
+
+    def _crash_reason(self, run: Dict[str, Any]) -> Optional[str]:
+        """Почему пул сломался из-за этой задачи; None - задача ни при чем"""
+        if run["timed_out"]:
+            return f"Тайм-аут обработки (превышено {self.job_timeout:.0f} с), процесс обработчика остановлен"
+        if run["pid"] is None:
+            # Задача еще не начиналась
+            return None
+        process = getattr(run["executor"], "_processes", {}).get(run["pid"])
+        exitcode = None if process is None else process.exitcode
+        # Уцелевшие процессы сломанного пула еще живы или остановлены пулом
+        if exitcode is None or exitcode == _POOL_TERMINATED_EXITCODE:
+            return None
+        return f"Процесс обработчика аварийно завершился (код: {exitcode})"
+
+    def _restart(self, job_id: str, run: Dict[str, Any]) -> bool:
+        """Перезапускает задачу сломанного пула в новом; False - задачу
+        нужно завершить с ошибкой"""
+        if (self._closed.is_set() or self._crash_reason(run) is not None
+                or run["attempt"] >= MAX_JOB_RESTARTS):
+            return False
+        with self._changed:
+            job = self._jobs[job_id]
+            job["status"] = "queued"
+            job["started_at"] = None
+            self._events[job_id].append({"stage": "requeued", "reason": "worker_lost", "time": time.time()})
+            self._changed.notify_all()
+            self._replace_executor(run["executor"])
+            future = self._start(job_id, run["args"], run["attempt"] + 1)
+        self._watch(job_id, future)
+        return True
+
+    def _finished(self, job_id: str, future: Future):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            run = self._runs.get(job_id)
+            if job is None or run is None or run["future"] is not future:
+                return
+
+        broken = isinstance(future.exception(), BrokenProcessPool)
+        if broken:
+            if self._restart(job_id, run):
+                return
+        else:
+            # Результат и события идут разными путями: финальное событие должно
+            # оказаться после всех событий прогресса задачи
+            run["drained"].wait(EVENTS_DRAIN_TIMEOUT_SECONDS)
+        with self._lock:
+            snapshot = dict(job)
+
+        update = {
+            "started_at": snapshot["started_at"] or snapshot["created_at"],
+            "finished_at": time.time()
+        }
+        if broken:
+            update["status"] = "failed"
+            update["error"] = (self._crash_reason(run)
+                               or "Пул процессов перезапускался слишком часто, задача остановлена")
+        else:
+            try:
+                result = future.result()
+            except Exception as e:
+                update["status"] = "failed"
+                update["error"] = f"Ошибка обработчика задачи: {e}"
+                update["traceback"] = traceback.format_exc()
+            else:
+                update["result"] = result
+                if result.get("success"):
+                    update["status"] = "done"
+                else:
+                    update["status"] = "failed"
+                    update["error"] = result.get("error", "Неизвестная ошибка")
+
+        # on_done вызывается до публикации статуса: клиент, увидевший "done",
+        # уже может забрать сохраненные результаты
+        if self.on_done is not None:
+            try:
+                self.on_done({**snapshot, **update})
+            except Exception as e:
+                print(f"⚠️ Ошибка обработки результата задачи {job_id}: {e}")
+
+        final_event = {"stage": update["status"], "time": update["finished_at"]}
+        if update["status"] == "failed":
+            final_event["error"] = update["error"]
+
+        with self._changed:
+            job.update(update)
+            self._runs.pop(job_id, None)
+            self._events[job_id].append(final_event)
+            self._changed.notify_all()
+
+    def _forget_expired(self):
+        """Удаляет давно завершенные задачи, чтобы память не росла без предела"""
+        deadline = time.time() - self.job_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished_at"] is not None and job["finished_at"] < deadline
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+                self._events.pop(job_id, None)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+🩹 Терпимый разбор JSON из PDF
+==============================
+Примеры запросов и ответов, извлеченные из PDF, часто содержат
+повреждения, на которых json.loads падает. repair_json() разбирает такой
+текст за один проход и исправляет повреждения прямо во время разбора:
+
+- trailing_comma      запятая перед } или ]
+- missing_comma       пропущенная запятая между элементами
+- extra_comma         повторная запятая
+- unquoted_value      значение без кавычек ("payload": OK)
+- unquoted_key        ключ без кавычек
+- smart_quotes        строки в "умных" кавычках “...”
+- wrapped_string      строка, перенесенная на следующую строку текста
+- unterminated_string строка без закрывающей кавычки (закрывается в конце строки текста)
+- control_character   табуляция и другие управляющие символы внутри строки
+- page_break          "=== Страница N ===" и номер страницы внутри значения
+- unclosed            не закрытые в конце текста объекты и массивы
+- trailing_text       текст после значения
+
+Результат - значение и список примененных исправлений (без повторов, в
+порядке появления). Если текст не удается прочитать как JSON даже с
+исправлениями, выбрасывается JsonRepairError (подкласс ValueError).
+"""
+
+import re
+from json.decoder import scanstring
+from typing import Any, List, NamedTuple
+
+WHITESPACE_RE = re.compile(r'\s*')
+NUMBER_RE = re.compile(r'(-?(?:0|[1-9]\d*))(\.\d+)?([eE][-+]?\d+)?')
+# Значение или ключ без кавычек: до разделителя или конца строки текста
+BARE_TOKEN_RE = re.compile(r'[^\s,:{}\[\]"“”][^,:{}\[\]"“”\n]*')
+PAGE_MARKER_RE = re.compile(r'=== Страница \d+ ===')
+# Номер страницы, который PDF печатает первой строкой страницы
+PAGE_NUMBER_LINE_RE = re.compile(r'\d+[^\S\n]*(?=\n)')
+# Фрагмент строки без кавычек, обратной косой черты и управляющих символов
+STRING_CHUNK_RE = re.compile(r'[^"\\\x00-\x1f”]*')
+UNICODE_ESCAPE_RE = re.compile(r'\\u[0-9a-fA-F]{4}')
+# Начало следующего элемента объекта: "ключ":
+NEXT_KEY_RE = re.compile(r'["“][^"”\n]*["”]\s*:')
+
+LITERALS = {'true': True, 'false': False, 'null': None,
+            'NaN': float('nan'), 'Infinity': float('inf'), '-Infinity': float('-inf')}
+ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+SMART_OPEN_QUOTE = '“'
+SMART_CLOSE_QUOTE = '”'
+
+
+class JsonRepairError(ValueError):
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} (позиция {position})")
+        self.position = position
+
+
+class RepairResult(NamedTuple):
+    value: Any
+    repairs: List[str]
+
+
+class _RepairingParser:
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.repairs: List[str] = []
+
+    def repair(self, kind: str):
+        if kind not in self.repairs:
+            self.repairs.append(kind)
+
+    def error(self, message: str):
+        raise JsonRepairError(message, self.pos)
+
+    def peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ''
+
+    def skip_whitespace(self):
+        """Пробелы и артефакты разрыва страницы между токенами"""
+        text = self.text
+        while True:
+            self.pos = WHITESPACE_RE.match(text, self.pos).end()
+            marker = PAGE_MARKER_RE.match(text, self.pos)
+            if not marker:
+                return
+            self.repair('page_break')
+            self.pos = WHITESPACE_RE.match(text, marker.end()).end()
+            # Номер страницы убирается, только если за ним не разделитель
+            # (иначе это само значение)
+            number = PAGE_NUMBER_LINE_RE.match(text, self.pos)
+            if number:
+                after = WHITESPACE_RE.match(text, number.end()).end()
+                if after < len(text) and text[after] not in ',:}]':
+                    self.pos = after
+
+    def parse(self) -> RepairResult:
+        self.skip_whitespace()
+        value = self.value()
+        self.skip_whitespace()
+        if self.pos < len(self.text):
+            self.repair('trailing_text')
+        return RepairResult(value, self.repairs)
+
+    def value(self) -> Any:
+        char = self.peek()
+        if char == '{':
+            return self.object()
+        if char == '[':
+            return self.array()
+        if char == '"' or char == SMART_OPEN_QUOTE:
+            return self.string()
+        if not char:
+            self.error("Ожидалось значение")
+        return self.bare_value()
+
+    def object(self) -> dict:
+        result = {}
+        self.pos += 1
+        expect_member = True
+        while True:
+            self.skip_whitespace()
+            char = self.peek()
+            if char == '}':
+                self.pos += 1
+                return result
+            if not char:
+                self.repair('unclosed')
+                return result
+            if char == ',':
+                if expect_member:
+                    self.repair('extra_comma')
+                self.pos += 1
+                expect_member = True
+                self.skip_whitespace()
+                if self.peek() == '}':
+                    self.repair('trailing_comma')
+                continue
+            if not expect_member:
+                self.repair('missing_comma')
+
+            key = self.key()
+            self.skip_whitespace()
+            if self.peek() != ':':
+                self.error("Ожидалось ':'")
+            self.pos += 1
+            self.skip_whitespace()
+            if not self.peek():
+                self.repair('unclosed')
+                result[key] = None
+                return result
+            result[key] = self.value()
+            expect_member = False
+
+    def key(self) -> str:
+        char = self.peek()
+        if char == '"' or char == SMART_OPEN_QUOTE:
+            return self.string()
+        token = BARE_TOKEN_RE.match(self.text, self.pos)
+        if not token:
+            self.error("Ожидался ключ")
+        self.repair('unquoted_key')
+        self.pos = token.end()
+        return token.group().strip()
+
+    def array(self) -> list:
+        result = []
+        self.pos += 1
+        expect_item = True
+        while True:
+            self.skip_whitespace()
+            char = self.peek()
+            if char == ']':
+                self.pos += 1
+                return result
+            if not char:
+                self.repair('unclosed')
+                return result
+            if char == ',':
+                if expect_item:
+                    self.repair('extra_comma')
+                self.pos += 1
+                expect_item = True
+                self.skip_whitespace()
+                if self.peek() == ']':
+                    self.repair('trailing_comma')
+                continue
+            if not expect_item:
+                self.repair('missing_comma')
+            result.append(self.value())
+            expect_item = False
+
+    def string(self) -> str:
+        start = self.pos
+        if self.text[start] == '"':
+            # Быстрый путь: корректная строка декодируется C-сканером json
+            try:
+                value, self.pos = scanstring(self.text, start + 1, True)
+                return value
+            except ValueError:
+                pass
+        else:
+            self.repair('smart_quotes')
+        return self.damaged_string(start)
+
+    def damaged_string(self, start: int) -> str:
+        """Строка с переносами, управляющими символами или без закрывающей кавычки"""
+        text = self.text
+        closing = '"' if text[start] == '"' else SMART_CLOSE_QUOTE
+        parts = []
+        pos = start + 1
+        while True:
+            chunk = STRING_CHUNK_RE.match(text, pos)
+            parts.append(chunk.group())
+            pos = chunk.end()
+            if pos >= len(text):
+                self.repair('unterminated_string')
+                self.pos = pos
+                return ''.join(parts)
+
+            char = text[pos]
+            if char == closing:
+                self.pos = pos + 1
+                return ''.join(parts)
+            if char == '"' or char == SMART_CLOSE_QUOTE:
+                # Кавычка другого вида внутри строки - обычный символ
+                parts.append(char)
+                pos += 1
+            elif char == '\\':
+                escape = text[pos + 1:pos + 2]
+                if UNICODE_ESCAPE_RE.match(text, pos):
+                    parts.append(chr(int(text[pos + 2:pos + 6], 16)))
+                    pos += 6
+                elif escape in ESCAPES:
+                    parts.append(ESCAPES[escape])
+                    pos += 2
+                else:
+                    # Неизвестная последовательность - обратная косая как есть
+                    parts.append('\\')
+                    pos += 1
+            elif char == '\n':
+                pos = self.string_line_break(parts, pos)
+                if pos < 0:
+                    self.repair('unterminated_string')
+                    return ''.join(parts).rstrip()
+            else:
+                self.repair('control_character')
+                parts.append(char)
+                pos += 1
+
+    def string_line_break(self, parts: List[str], pos: int) -> int:
+        """Перевод строки внутри строки: перенос (продолжение через пробел)
+        или незакрытая строка (следующая строка текста - новый элемент)"""
+        text = self.text
+        after = WHITESPACE_RE.match(text, pos).end()
+        marker = PAGE_MARKER_RE.match(text, after)
+        if marker:
+            self.repair('page_break')
+            after = WHITESPACE_RE.match(text, marker.end()).end()
+            number = PAGE_NUMBER_LINE_RE.match(text, after)
+            if number:
+                after = WHITESPACE_RE.match(text, number.end()).end()
+
+        if after >= len(text) or text[after] in '}]' or NEXT_KEY_RE.match(text, after):
+            # Строка не закрыта: завершаем ее в конце строки текста
+            self.pos = pos
+            return -1
+
+        self.repair('wrapped_string')
+        if parts:
+            parts[-1] = parts[-1].rstrip()
+        parts.append(' ')
+        return after
+
+    def bare_value(self) -> Any:
+        text = self.text
+        number = NUMBER_RE.match(text, self.pos)
+        token = BARE_TOKEN_RE.match(text, self.pos)
+        word = token.group().rstrip() if token else ''
+
+        # Число заканчивается разделителем или пробелом ("1 2" - два числа)
+        if number and (number.end() - self.pos == len(word) or text[number.end()].isspace()):
+            self.pos = number.end()
+            integer, fraction, exponent = number.groups()
+            if fraction or exponent:
+                return float(number.group())
+            return int(integer)
+        if word in LITERALS:
+            self.pos += len(word)
+            return LITERALS[word]
+        if not word:
+            self.error(f"Неожиданный символ {text[self.pos]!r}")
+
+        self.repair('unquoted_value')
+        self.pos += len(word)
+        return word
+
+
+def repair_json(text: str) -> RepairResult:
+    """Разбирает JSON, исправляя повреждения; возвращает (value, repairs)"""
+    return _RepairingParser(text).parse()
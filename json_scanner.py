@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+🔎 Потоковый сканер JSON
+========================
+Находит конец JSON-значения за один проход, отслеживая глубину вложенности
+скобок и границы строк. Используется вместо многократного json.loads на
+растущем буфере при поиске примеров ответов.
+
+scan_json_spans() за один линейный проход находит во всем документе все
+сбалансированные JSON-объекты и массивы верхнего уровня со смещениями;
+JsonSpanIndex дает по ним поиск в диапазоне документа.
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+from typing import Iterator, List, NamedTuple
+
+# Строка целиком (с экранированием) или скобка. Незакрытая кавычка ни с чем
+# не совпадает и пропускается как обычный символ - так обрывки строк из PDF
+# не "съедают" остаток документа.
+_JSON_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]]')
+
+_OPENERS = {'{', '['}
+
+
+def find_json_end(text: str, start: int = 0) -> int:
+    """Позиция сразу после JSON-объекта или массива, начинающегося в start.
+
+    Возвращает -1, если text[start] не "{"/"[" или значение не закрыто до
+    конца текста. Вид закрывающей скобки не сверяется с открывающей:
+    важна только глубина, как и в прежней проверке по количеству скобок.
+    """
+    if start >= len(text) or text[start] not in _OPENERS:
+        return -1
+
+    depth = 0
+    for token in _JSON_TOKEN_RE.finditer(text, start):
+        char = token.group()
+        if char in _OPENERS:
+            depth += 1
+        elif char == '}' or char == ']':
+            depth -= 1
+            if depth == 0:
+                return token.end()
+    return -1
+
+
+# Вне JSON кавычки - обычный текст, значение начинается с открывающей скобки
+_OPENER_RE = re.compile(r'[{\[]')
+_OPENER_FOR = {'}': '{', ']': '['}
+
+
+class JsonSpan(NamedTuple):
+    start: int
+    end: int
+    kind: str   # "object" или "array"
+
+
+def scan_json_spans(text: str) -> List[JsonSpan]:
+    """Все объекты и массивы верхнего уровня в порядке документа.
+
+    Закрывающая скобка должна соответствовать открывающей: лишние
+    закрывающие пропускаются, а открывающая, так и не закрытая (обрывок
+    JSON или скобка в тексте), не поглощает значения внутри нее - они
+    считаются значениями верхнего уровня. Каждый символ просматривается
+    один раз; каждая скобка попадает в стек и снимается с него не больше
+    одного раза, найденное значение удаляется не больше одного раза.
+    """
+    # Найденные значения в порядке документа. Значения внутри открытой
+    # скобки лежат в конце списка, начиная с ее отметки; когда скобка
+    # закрывается, они заменяются одним значением.
+    spans: List[JsonSpan] = []
+    # Открытые скобки: (позиция, скобка, отметка в spans)
+    stack = []
+    # Сколько открытых скобок каждого вида: лишняя закрывающая скобка
+    # отбрасывается сразу, без просмотра стека
+    open_counts = {'{': 0, '[': 0}
+    position = 0
+    while True:
+        if not stack:
+            match = _OPENER_RE.search(text, position)
+        else:
+            match = _JSON_TOKEN_RE.search(text, position)
+        if match is None:
+            break
+        position = match.end()
+        token = match.group()
+
+        if token in _OPENERS:
+            stack.append((match.start(), token, len(spans)))
+            open_counts[token] += 1
+        elif token == '}' or token == ']':
+            expected = _OPENER_FOR[token]
+            if not open_counts[expected]:
+                continue
+            # Незакрытые скобки над парной снимаются: их значения остаются
+            # в spans и достаются парной
+            while True:
+                start, opener, mark = stack.pop()
+                open_counts[opener] -= 1
+                if opener == expected:
+                    break
+            del spans[mark:]
+            spans.append(JsonSpan(start, position, "object" if opener == '{' else "array"))
+
+    # Значения внутри незакрытых скобок остаются значениями верхнего уровня
+    return spans
+
+
+class JsonSpanIndex:
+    def __init__(self, text: str):
+        self.text = text
+        self.spans = scan_json_spans(text)
+        self._starts = array('q', (span.start for span in self.spans))
+
+    def __len__(self):
+        return len(self.spans)
+
+    def __iter__(self) -> Iterator[JsonSpan]:
+        return iter(self.spans)
+
+    def between(self, start: int, end: int) -> Iterator[JsonSpan]:
+        """Значения, целиком лежащие в text[start:end]"""
+        for i in range(bisect_left(self._starts, start), len(self.spans)):
+            span = self.spans[i]
+            if span.start >= end:
+                break
+            if span.end <= end:
+                yield span
+
+    def value(self, span: JsonSpan) -> str:
+        return self.text[span.start:span.end]
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+📏 Индекс строк документа
+=========================
+Поиск title и description секции раньше разбивал всю секцию на строки,
+искал строку "Method" сравнением каждой строки и заново проверял
+перекрывающиеся окна строк регулярными выражениями.
+
+LineIndex один раз на документ собирает:
+- смещения начал строк (компактный array)
+- номера строк "Method" (строка, которая после strip() равна "Method")
+- классы строк (title / description), которые вычисляются лениво при
+  первом обращении и дальше берутся из bytearray
+
+Текст можно подавать порциями вместе с EndpointSectioner: индекс хранит
+только смещения, сам текст строк берется из секции (SectionLines).
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Union
+
+# Строка, равная "Method" после strip() (\s совпадает с str.isspace)
+METHOD_LINE_RE = re.compile(r'^[^\S\n]*Method[^\S\n]*$', re.MULTILINE)
+NEWLINE_RE = re.compile(r'\n')
+
+# Классы строк в LineIndex.flags (0 - строка еще не классифицирована)
+CLASSIFIED = 1
+TITLE_LINE = 2
+DESCRIPTION_LINE = 4
+
+
+class LineIndex:
+    def __init__(self, text: Optional[str] = None):
+        self.starts = array('q', [0])
+        self.method_lines = array('q')
+        self.flags = bytearray(1)
+        self.length = 0
+
+        # Незавершенная последняя строка (ждет перевода строки или finish)
+        self._tail = ""
+        if text is not None:
+            self.feed(text)
+            self.finish()
+
+    def __len__(self):
+        return len(self.starts)
+
+    def feed(self, chunk: str):
+        """Добавляет порцию текста (порции идут подряд, как в EndpointSectioner)"""
+        if not chunk:
+            return
+        base = self.length
+        self.length += len(chunk)
+        line_count = len(self.starts)
+        self.starts.extend(match.end() + base for match in NEWLINE_RE.finditer(chunk))
+        self.flags.extend(bytes(len(self.starts) - line_count))
+
+        # Строки "Method" ищутся только среди завершенных строк
+        text = self._tail + chunk
+        complete = text.rfind('\n') + 1
+        if complete:
+            self._find_method_lines(text, complete, base - len(self._tail))
+            text = text[complete:]
+        self._tail = text
+
+    def finish(self):
+        """Последняя строка документа завершена концом текста"""
+        if self._tail:
+            self._find_method_lines(self._tail, len(self._tail), self.length - len(self._tail))
+            self._tail = ""
+
+    def _find_method_lines(self, text: str, end: int, offset: int):
+        for match in METHOD_LINE_RE.finditer(text, 0, end):
+            self.method_lines.append(bisect_right(self.starts, match.start() + offset) - 1)
+
+    def line_of(self, position: int) -> int:
+        """Номер строки, содержащей позицию"""
+        return bisect_right(self.starts, position) - 1
+
+    def line_end(self, line: int) -> int:
+        """Позиция перевода строки line (или текущий конец текста)"""
+        if line + 1 < len(self.starts):
+            return self.starts[line + 1] - 1
+        return self.length
+
+    def first_method_line(self, first: int, last: int) -> Optional[int]:
+        """Первая строка "Method" среди строк first..last"""
+        i = bisect_left(self.method_lines, first)
+        if i < len(self.method_lines) and self.method_lines[i] <= last:
+            return self.method_lines[i]
+        return None
+
+
+class SectionLines:
+    """Строки секции text[start:end] документа как список (аналог
+    section.split('\\n')) поверх LineIndex документа"""
+
+    def __init__(self, index: LineIndex, text: str, start: int = 0):
+        self.index = index
+        self.text = text
+        self.start = start
+        self.first = index.line_of(start)
+        self.last = index.line_of(start + len(text))
+
+    @classmethod
+    def for_section(cls, section: str, index: Optional[LineIndex] = None,
+                    start: Optional[int] = None) -> 'SectionLines':
+        """Строки секции по индексу документа, если секция начинается с начала
+        строки и кончается ее концом, иначе - по собственному индексу секции"""
+        if index is not None and start is not None:
+            end = start + len(section)
+            line = index.line_of(start)
+            last = index.line_of(end)
+            if (index.starts[line] == start and end <= index.length
+                    and (end == index.length or index.line_end(last) == end)):
+                return cls(index, section, start)
+        return cls(LineIndex(section), section)
+
+    def __len__(self):
+        return self.last - self.first + 1
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        line = self.first + i
+        begin = self.index.starts[line] - self.start
+        end = min(self.index.line_end(line) - self.start, len(self.text))
+        return self.text[begin:end]
+
+    def method_line(self) -> int:
+        """Номер (в секции) первой строки "Method" или -1"""
+        line = self.index.first_method_line(self.first, self.last)
+        return -1 if line is None else line - self.first
+
+    def flags(self, i: int) -> int:
+        return self.index.flags[self.first + i]
+
+    def set_flags(self, i: int, flags: int):
+        self.index.flags[self.first + i] = flags
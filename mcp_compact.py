@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+📦 Компактный формат MCP данных
+===============================
+В обычном (inline) формате create_mcp_data_ultimate каждый tool несет
+полный inputSchema: одни и те же headers apiKey/externalId и общие
+параметры повторяются в каждом tool, а каждый resource копирует весь
+category_info в metadata.
+
+compact_mcp_data() выносит повторы в общие определения и ставит вместо
+них JSON pointer:
+
+- свойство inputSchema, одинаковое (имя и схема) хотя бы в min_uses
+  tools -> "$defs"/param_<имя>, в tool - {"$ref": "#/$defs/param_<имя>"}
+- metadata resource, одинаковые хотя бы у min_uses resources ->
+  "categories"/<категория>, в resource - {"$ref": "#/categories/<категория>"}
+
+Если под одним именем встречаются разные значения, следующие получают
+суффикс (_2, _3, ...).
+
+В inline формате каждая схема tool несет в своем "$defs" общие структуры
+ответов и тел запросов (schema_inference). Компактный формат переносит
+их в "$defs" документа: ссылки "#/$defs/<Имя>" в нем разрешаются от
+корня файла. Имена структур уникальны в пределах документа, а имена
+параметров с префиксом param_ с ними не пересекаются.
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from payload_table import payload_id
+
+MCP_FORMATS = ("inline", "compact")
+DEFAULT_MCP_FORMAT = "inline"
+
+# Минимальное число использований, чтобы значение стало общим определением
+DEFAULT_MIN_USES = 2
+
+PARAMETER_PREFIX = "param_"
+
+
+def pointer_token(name: str) -> str:
+    """Экранирование имени для JSON pointer (RFC 6901)"""
+    return name.replace('~', '~0').replace('/', '~1')
+
+
+class SharedDefinitions:
+    """Общие определения одного раздела документа ("$defs", "categories")"""
+
+    def __init__(self, section: str, uses: Counter, min_uses: int = DEFAULT_MIN_USES):
+        self.section = section
+        self.uses = uses
+        self.min_uses = min_uses
+        self.definitions: Dict[str, Any] = {}
+        # (имя, id значения) -> имя определения
+        self._names: Dict[Tuple[str, str], str] = {}
+
+    def ref(self, name: str, value: Any, value_id: str) -> Any:
+        """Ссылка на общее определение или само значение, если оно редкое"""
+        key = (name, value_id)
+        if self.uses[key] < self.min_uses:
+            return value
+        definition = self._names.get(key)
+        if definition is None:
+            definition, n = name, 1
+            while definition in self.definitions:
+                n += 1
+                definition = f"{name}_{n}"
+            self.definitions[definition] = value
+            self._names[key] = definition
+        return {"$ref": f"#/{pointer_token(self.section)}/{pointer_token(definition)}"}
+
+
+def hoist_schema_definitions(tools: List[Dict], definitions: Dict[str, Any]) -> List[Dict]:
+    """Tools без "$defs" в схемах: определения переносятся в definitions"""
+    hoisted = []
+    for tool in tools:
+        tool = dict(tool)
+        for key in ("inputSchema", "outputSchema"):
+            schema = tool.get(key)
+            if isinstance(schema, dict) and "$defs" in schema:
+                schema = dict(schema)
+                definitions.update(schema.pop("$defs"))
+                tool[key] = schema
+        hoisted.append(tool)
+    return hoisted
+
+
+def compact_mcp_data(mcp_data: Dict, min_uses: int = DEFAULT_MIN_USES) -> Dict:
+    """MCP данные с общими определениями параметров и категорий (mcp_data не меняется)"""
+    schema_definitions: Dict[str, Any] = dict(mcp_data.get("$defs", {}))
+    tools = hoist_schema_definitions(mcp_data["tools"], schema_definitions)
+    resources = mcp_data["resources"]
+
+    # Один проход считает повторы, второй заменяет их ссылками
+    parameter_ids = [[payload_id(schema) for schema in tool["inputSchema"]["properties"].values()]
+                     for tool in tools]
+    category_ids = [payload_id(resource["metadata"]) for resource in resources]
+    parameters = SharedDefinitions("$defs", Counter(
+        (PARAMETER_PREFIX + name, value_id)
+        for tool, ids in zip(tools, parameter_ids)
+        for name, value_id in zip(tool["inputSchema"]["properties"], ids)
+    ), min_uses)
+    categories = SharedDefinitions("categories", Counter(
+        (resource["metadata"].get("name", "category"), value_id)
+        for resource, value_id in zip(resources, category_ids)
+    ), min_uses)
+
+    compact_tools = []
+    for tool, ids in zip(tools, parameter_ids):
+        input_schema = tool["inputSchema"]
+        properties = {
+            name: parameters.ref(PARAMETER_PREFIX + name, schema, value_id)
+            for (name, schema), value_id in zip(input_schema["properties"].items(), ids)
+        }
+        compact_tools.append({**tool, "inputSchema": {**input_schema, "properties": properties}})
+
+    compact_resources = [
+        {**resource, "metadata": categories.ref(resource["metadata"].get("name", "category"),
+                                                resource["metadata"], value_id)}
+        for resource, value_id in zip(resources, category_ids)
+    ]
+
+    compact = {
+        **mcp_data,
+        "tools": compact_tools,
+        "resources": compact_resources,
+        "$defs": {**schema_definitions, **parameters.definitions},
+        "categories": categories.definitions
+    }
+    compact["metadata"] = {**mcp_data["metadata"], "format": "compact"}
+    return compact
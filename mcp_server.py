@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+🛰️ Локальный MCP сервер (stdio)
+===============================
+Отдает tools и resources, найденные парсером, по протоколу MCP
+(JSON-RPC 2.0, одно сообщение на строку stdin/stdout).
+
+Сервер не читает mcp_server_ultimate_final.json при старте: команда
+build один раз готовит снимок (snapshot). В нем все tools, resources и
+содержимое resources уже закодированы в JSON (UTF-8) и лежат подряд в
+одном блоке, а перед блоком записан небольшой marshal-индекс:
+смещения tools и resources (array) и словарь uri -> (начало, конец)
+содержимого. При запуске читается только индекс, блок отображается в
+память (mmap), и ответы собираются из готовых фрагментов без
+декодирования:
+
+- tools/list, resources/list - страница по page_size, cursor - номер
+  первого элемента следующей страницы; элементы в блоке разделены
+  запятыми, поэтому страница - один срез блока
+- resources/read - по индексу uri (endpoint целиком: headers,
+  parameters, responses с примерами из payloads_ultimate_final.json)
+
+Схемы tools в снимке самодостаточны: в inline формате они такими и
+приходят от парсера, в компактном общие структуры ответов ("#/$defs/...")
+добавляются в "$defs" корня каждой схемы, а ссылки на параметры
+("#/$defs/param_...") и категории ("#/categories/...") подставляются
+значениями.
+
+Использование:
+    python mcp_server.py build ultimate_final_data       # -> ultimate_final_data/mcp_server_ultimate_final.snapshot
+    python mcp_server.py serve ultimate_final_data/mcp_server_ultimate_final.snapshot
+
+Снимок привязан к версии marshal (версии Python): при несовпадении его
+нужно пересобрать командой build.
+"""
+
+import argparse
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+import traceback
+from array import array
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+# Файл снимка: SNAPSHOT_MAGIC, длина индекса (<Q), marshal индекса, блок JSON
+SNAPSHOT_MAGIC = b"FHMCP\x00\x01\n"
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_SUFFIX = ".snapshot"
+HEADER_LENGTH = struct.Struct('<Q')
+
+# Имена файлов результатов парсера (fleethand_ultimate_parser.RESULT_FILES;
+# сервер не импортирует парсер, чтобы запускаться быстро)
+MCP_DATA_FILE = "mcp_server_ultimate_final.json"
+ENDPOINTS_FILE = "endpoints_ultimate_final.json"
+PAYLOADS_FILE = "payloads_ultimate_final.json"
+SNAPSHOT_FILE = "mcp_server_ultimate_final" + SNAPSHOT_SUFFIX
+
+SERVER_NAME = "fleethand-api-docs"
+SERVER_VERSION = "1.0.0"
+PROTOCOL_VERSIONS = ("2025-06-18", "2025-03-26", "2024-11-05")
+
+DEFAULT_PAGE_SIZE = 100
+
+# Коды ошибок JSON-RPC
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+DEFS_POINTER = "#/$defs/"
+PARAMETER_POINTER = "#/$defs/param_"
+CATEGORIES_POINTER = "#/categories/"
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def encode(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def pointer_name(ref: str, prefix: str) -> str:
+    """Имя из JSON pointer вида prefix + имя (RFC 6901)"""
+    return ref[len(prefix):].replace('~1', '/').replace('~0', '~')
+
+
+# --- Сборка снимка -----------------------------------------------------------
+
+def inline_parameters(schema: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    """inputSchema компактного формата: свойства-ссылки на параметры -> значения"""
+    properties = schema.get("properties")
+    if not properties:
+        return schema
+    inlined = {}
+    for name, value in properties.items():
+        ref = value.get("$ref") if isinstance(value, dict) else None
+        if isinstance(ref, str) and ref.startswith(PARAMETER_POINTER):
+            value = defs[pointer_name(ref, DEFS_POINTER)]
+        inlined[name] = value
+    return {**schema, "properties": inlined}
+
+
+def standalone_schema(schema: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    """Схема tool без ссылок на документ: параметры подставлены, нужные
+    общие структуры (компактный формат хранит их в "$defs" документа)
+    добавлены в "$defs" корня схемы"""
+    # Импорт только при сборке снимка: serve его не оплачивает
+    from schema_inference import self_contained_schema
+    return self_contained_schema(inline_parameters(schema, defs), defs)
+
+
+def resolve_categories(metadata: Any, categories: Dict[str, Any]) -> Any:
+    """metadata resource компактного формата -> значение"""
+    if isinstance(metadata, dict) and set(metadata) == {"$ref"}:
+        ref = metadata["$ref"]
+        if ref.startswith(CATEGORIES_POINTER):
+            return categories[pointer_name(ref, CATEGORIES_POINTER)]
+    return metadata
+
+
+def endpoint_contents(endpoint: Dict[str, Any], payloads: Dict[str, Any]) -> Dict[str, Any]:
+    """Endpoint для resources/read: примеры ответов подставлены из payloads"""
+    responses = []
+    for response in endpoint.get("responses", []):
+        response = dict(response)
+        if "example_id" in response:
+            response["example"] = payloads.get(response["example_id"])
+        responses.append(response)
+    return {**endpoint, "responses": responses}
+
+
+def build_snapshot(mcp_data: Dict[str, Any], endpoints: Optional[List[Dict]] = None,
+                   payloads: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Содержимое снимка из MCP данных (inline или compact) и, если есть,
+    endpoints с таблицей примеров ответов: tools и resources - списки
+    JSON строк, contents - uri -> JSON элементов contents через запятую"""
+    defs = mcp_data.get("$defs", {})
+    categories = mcp_data.get("categories", {})
+
+    tools = []
+    for tool in mcp_data["tools"]:
+        tool = dict(tool)
+        for key in ("inputSchema", "outputSchema"):
+            if key in tool:
+                tool[key] = standalone_schema(tool[key], defs)
+        tools.append(encode(tool))
+
+    # Endpoints по uri resource (у GET и POST одного пути uri общий)
+    by_uri: Dict[str, List[Dict]] = {}
+    for endpoint in endpoints or []:
+        by_uri.setdefault(f"fleethand://api{endpoint['path']}", []).append(endpoint)
+
+    resources = []
+    contents: Dict[str, str] = {}
+    for resource in mcp_data["resources"]:
+        resource = {**resource, "metadata": resolve_categories(resource.get("metadata"), categories)}
+        resources.append(encode(resource))
+        uri = resource["uri"]
+        if uri in contents:
+            continue
+        items = by_uri.get(uri) or [resource]
+        contents[uri] = ','.join(
+            encode({"uri": uri, "mimeType": resource.get("mimeType", "application/json"),
+                    "text": encode(endpoint_contents(item, payloads or {}) if item is not resource else item)})
+            for item in items
+        )
+
+    metadata = mcp_data.get("metadata", {})
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "server": {"name": SERVER_NAME, "version": metadata.get("version", SERVER_VERSION)},
+        "tools": tools,
+        "resources": resources,
+        "contents": contents
+    }
+
+
+def build_snapshot_from_results(results_dir: str, output: Optional[str] = None) -> str:
+    """Собирает снимок из каталога результатов парсера; возвращает путь к нему.
+    
+    (os.path вместо pathlib: serve не должен платить за лишние импорты)
+    """
+    mcp_path = os.path.join(results_dir, MCP_DATA_FILE)
+    if not os.path.exists(mcp_path):
+        raise SnapshotError(f"Не найден {mcp_path}")
+
+    def load(name: str, default: Any) -> Any:
+        path = os.path.join(results_dir, name)
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    snapshot = build_snapshot(load(MCP_DATA_FILE, None), load(ENDPOINTS_FILE, None),
+                              load(PAYLOADS_FILE, {}))
+    output_path = output or os.path.join(results_dir, SNAPSHOT_FILE)
+    write_snapshot(snapshot, output_path)
+    return output_path
+
+
+def write_snapshot(snapshot: Dict[str, Any], path: str):
+    """Записывает результат build_snapshot: индекс и блок JSON"""
+    blob: List[bytes] = []
+    size = 0
+
+    def append(data: bytes) -> int:
+        nonlocal size
+        start = size
+        blob.append(data)
+        size += len(data)
+        return start
+
+    def item_list(items: List[str]) -> bytes:
+        # Элемент i - блок[offsets[i]:offsets[i + 1] - 1], за каждым запятая
+        offsets = array('q', (append(item.encode('utf-8') + b',') for item in items))
+        offsets.append(size)
+        return offsets.tobytes()
+
+    index = {
+        "format": SNAPSHOT_FORMAT,
+        "server": snapshot["server"],
+        "tools": item_list(snapshot["tools"]),
+        "resources": item_list(snapshot["resources"]),
+        "contents": {}
+    }
+    for uri, contents in snapshot["contents"].items():
+        data = contents.encode('utf-8')
+        start = append(data)
+        index["contents"][uri] = (start, start + len(data))
+
+    header = marshal.dumps(index)
+    with open(path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC + HEADER_LENGTH.pack(len(header)) + header)
+        f.writelines(blob)
+
+
+class Snapshot:
+    """Снимок, открытый для чтения: индекс в памяти, блок JSON через mmap"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            prefix = f.read(len(SNAPSHOT_MAGIC) + HEADER_LENGTH.size)
+            if len(prefix) < len(SNAPSHOT_MAGIC) + HEADER_LENGTH.size or not prefix.startswith(SNAPSHOT_MAGIC):
+                raise SnapshotError(f"{path} - не снимок MCP сервера; соберите его командой build")
+            header_length, = HEADER_LENGTH.unpack_from(prefix, len(SNAPSHOT_MAGIC))
+            try:
+                index = marshal.loads(f.read(header_length))
+            except (EOFError, ValueError, TypeError) as e:
+                raise SnapshotError(f"Снимок {path} не читается ({e}); пересоберите его командой build")
+            if not isinstance(index, dict) or index.get("format") != SNAPSHOT_FORMAT:
+                raise SnapshotError(f"Неизвестный формат снимка {path}; пересоберите его командой build")
+            self.base = len(prefix) + header_length
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.server_info: Dict[str, Any] = index["server"]
+        self.tools = array('q')
+        self.tools.frombytes(index["tools"])
+        self.resources = array('q')
+        self.resources.frombytes(index["resources"])
+        self.contents: Dict[str, Tuple[int, int]] = index["contents"]
+
+    @staticmethod
+    def count(offsets: array) -> int:
+        return len(offsets) - 1
+
+    def items(self, offsets: array, start: int, end: int) -> bytes:
+        """JSON элементов start..end-1 через запятую (один срез блока)"""
+        end = min(end, self.count(offsets))
+        if start >= end:
+            return b""
+        return self.data[self.base + offsets[start]:self.base + offsets[end] - 1]
+
+    def read(self, uri: str) -> Optional[bytes]:
+        span = self.contents.get(uri)
+        if span is None:
+            return None
+        return self.data[self.base + span[0]:self.base + span[1]]
+
+    def close(self):
+        self.data.close()
+
+
+def load_snapshot(path: str) -> Snapshot:
+    return Snapshot(path)
+
+
+# --- Сервер ------------------------------------------------------------------
+
+class JsonRpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class McpServer:
+    def __init__(self, snapshot: Snapshot, page_size: int = DEFAULT_PAGE_SIZE):
+        self.snapshot = snapshot
+        self.page_size = page_size
+
+        self.stats = {
+            "requests": 0,
+            "errors": 0
+        }
+
+        # Обработчики возвращают готовый JSON поля result (UTF-8)
+        self.handlers = {
+            "initialize": self.initialize,
+            "ping": lambda params: b"{}",
+            "tools/list": lambda params: self.list_page("tools", snapshot.tools, params),
+            "resources/list": lambda params: self.list_page("resources", snapshot.resources, params),
+            "resources/read": self.read_resource
+        }
+
+    def initialize(self, params: Dict[str, Any]) -> bytes:
+        requested = params.get("protocolVersion")
+        return encode({
+            "protocolVersion": requested if requested in PROTOCOL_VERSIONS else PROTOCOL_VERSIONS[0],
+            "capabilities": {
+                "tools": {"listChanged": False},
+                "resources": {"subscribe": False, "listChanged": False}
+            },
+            "serverInfo": self.snapshot.server_info
+        }).encode('utf-8')
+
+    def list_page(self, key: str, offsets: array, params: Dict[str, Any]) -> bytes:
+        total = self.snapshot.count(offsets)
+        cursor = params.get("cursor")
+        start = 0
+        if cursor is not None:
+            # isdigit() принимает и не-ASCII цифры ("²"), которые int() не разбирает
+            if (not isinstance(cursor, str) or not cursor.isascii() or not cursor.isdigit()
+                    or int(cursor) > total):
+                raise JsonRpcError(INVALID_PARAMS, f"Неверный cursor: {cursor!r}")
+            start = int(cursor)
+        end = start + self.page_size
+        page = [b'{"', key.encode('ascii'), b'":[', self.snapshot.items(offsets, start, end), b']']
+        if end < total:
+            page.append(b',"nextCursor":"%d"' % end)
+        page.append(b'}')
+        return b''.join(page)
+
+    def read_resource(self, params: Dict[str, Any]) -> bytes:
+        uri = params.get("uri")
+        contents = self.snapshot.read(uri) if isinstance(uri, str) else None
+        if contents is None:
+            raise JsonRpcError(INVALID_PARAMS, f"Resource не найден: {uri!r}")
+        return b'{"contents":[' + contents + b']}'
+
+    def handle_line(self, line: bytes) -> Optional[bytes]:
+        """Ответ на одно сообщение (None для уведомлений)"""
+        try:
+            message = json.loads(line)
+        except ValueError:
+            self.stats["errors"] += 1
+            return self.error_response(None, PARSE_ERROR, "Parse error")
+        if isinstance(message, dict) and "method" not in message and ("result" in message or "error" in message):
+            # Ответ клиента на запрос сервера: сервер запросов не отправляет
+            return None
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            self.stats["errors"] += 1
+            return self.error_response(message.get("id") if isinstance(message, dict) else None,
+                                       INVALID_REQUEST, "Invalid Request")
+
+        if "id" not in message:
+            # Уведомления (notifications/initialized и др.) без ответа
+            return None
+        self.stats["requests"] += 1
+        request_id = message["id"]
+        handler = self.handlers.get(message["method"])
+        if handler is None:
+            self.stats["errors"] += 1
+            return self.error_response(request_id, METHOD_NOT_FOUND, f"Method not found: {message['method']}")
+        params = message.get("params")
+        if params is None:
+            params = {}
+        elif not isinstance(params, dict):
+            # Все методы сервера принимают именованные параметры
+            self.stats["errors"] += 1
+            return self.error_response(request_id, INVALID_PARAMS, "Invalid params: ожидается объект")
+        try:
+            result = handler(params)
+        except JsonRpcError as e:
+            self.stats["errors"] += 1
+            return self.error_response(request_id, e.code, e.message)
+        except Exception as e:
+            # Один неудачный запрос не должен останавливать сервер; stdout
+            # занят протоколом, подробности - в stderr
+            self.stats["errors"] += 1
+            traceback.print_exc(file=sys.stderr)
+            return self.error_response(request_id, INTERNAL_ERROR, f"Internal error: {e}")
+        return b''.join((b'{"jsonrpc":"2.0","id":', encode(request_id).encode('utf-8'),
+                         b',"result":', result, b'}'))
+
+    @staticmethod
+    def error_response(request_id: Any, code: int, message: str) -> bytes:
+        return encode({"jsonrpc": "2.0", "id": request_id,
+                       "error": {"code": code, "message": message}}).encode('utf-8')
+
+    def serve(self, stdin: BinaryIO, stdout: BinaryIO):
+        """Читает сообщения до конца stdin, ответы пишет по одному на строку"""
+        for line in stdin:
+            if not line.strip():
+                continue
+            response = self.handle_line(line)
+            if response is not None:
+                stdout.write(response + b'\n')
+                stdout.flush()
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Локальный MCP сервер по снимку результатов парсера")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Собрать снимок из каталога результатов")
+    build.add_argument("results_dir", help="Каталог результатов (ultimate_final_data)")
+    build.add_argument("-o", "--output", help=f"Файл снимка (по умолчанию <results_dir>/{SNAPSHOT_FILE})")
+    serve = commands.add_parser("serve", help="Обслуживать MCP запросы через stdin/stdout")
+    serve.add_argument("snapshot", help="Файл снимка")
+    serve.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                       help="Tools/resources на страницу tools/list и resources/list")
+    args = arg_parser.parse_args(argv)
+
+    try:
+        if args.command == "build":
+            path = build_snapshot_from_results(args.results_dir, args.output)
+            print(f"💾 Снимок сохранен: {path}", file=sys.stderr)
+            return 0
+        server = McpServer(load_snapshot(args.snapshot), max(1, args.page_size))
+    except (OSError, SnapshotError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    # stdout - канал протокола, поэтому сообщения сервера идут в stderr
+    server.serve(sys.stdin.buffer, sys.stdout.buffer)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
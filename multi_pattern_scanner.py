@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+🔦 Однопроходный сканер для набора паттернов
+============================================
+Вместо отдельного re.finditer по всему тексту для каждого паттерна текст
+просматривается один раз: объединенное выражение находит позиции, с которых
+может начаться совпадение хотя бы одного паттерна (ключевые слова вроде
+"must", "token", "webhook"), и только в этих позициях пробуются паттерны,
+чье начало подходит к символу.
+
+Результат совпадает с последовательными finditer: для каждого паттерна
+хранится позиция конца его последнего совпадения, поэтому совпадения
+одного паттерна не пересекаются, как и в finditer.
+
+Начальные ключевые слова выводятся из самих выражений. Паттерны, для
+которых это сделать не удалось (например, могут начинаться с любого
+символа), сканируются обычным finditer.
+
+Кандидаты ищутся без IGNORECASE (он замедляет re в разы) по копии текста
+в нижнем регистре, а ключевые слова собраны в префиксное дерево. Если
+нижний регистр меняет длину текста, используется медленный путь с
+IGNORECASE по исходному тексту.
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+_ZERO_WIDTH = {sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT}
+_CATEGORY_FRAGMENTS = {
+    sre_constants.CATEGORY_DIGIT: '\\d',
+    sre_constants.CATEGORY_SPACE: '\\s',
+    sre_constants.CATEGORY_WORD: '\\w',
+}
+# Символ, по которому бакет не определить: паттерн пробуется везде
+_ANY = None
+
+# Символы, которые re.IGNORECASE считает равными латинским буквам, но
+# str.lower() в них не переводит (U+0130 меняет длину строки и уводит
+# на медленный путь, U+212A str.lower() переводит в "k" сам)
+_EXTRA_FOLDS = {0x131: 'i', 0x17F: 's'}
+
+
+def _class_prefix(members) -> Optional[Tuple[str, Optional[set], None]]:
+    """Фрагмент [класса] и символы для бакетов (None - любые)"""
+    parts = []
+    chars = set()
+    for op, av in members:
+        if op == sre_constants.LITERAL:
+            parts.append(re.escape(chr(av)))
+            chars.add(chr(av))
+        elif op == sre_constants.RANGE:
+            low, high = av
+            parts.append(f"{re.escape(chr(low))}-{re.escape(chr(high))}")
+            if chars is not None and high - low <= 128:
+                chars.update(chr(c) for c in range(low, high + 1))
+            else:
+                chars = _ANY
+        elif op == sre_constants.CATEGORY and av in _CATEGORY_FRAGMENTS:
+            parts.append(_CATEGORY_FRAGMENTS[av])
+            if av == sre_constants.CATEGORY_DIGIT and chars is not None:
+                chars.update('0123456789')
+            else:
+                chars = _ANY
+        else:
+            return None
+    return f"[{''.join(parts)}]", chars, None
+
+
+def _prefixes(items) -> Optional[List[Tuple[str, Optional[set], Optional[str]]]]:
+    """Фрагменты, с одного из которых обязано начинаться любое совпадение.
+
+    Каждый элемент - (регулярный фрагмент, символы для бакетов, литерал
+    или None для класса символов). None, если такого набора нет или разбор
+    не поддерживается.
+    """
+    items = list(items)
+    i = 0
+    while i < len(items) and items[i][0] in _ZERO_WIDTH:
+        i += 1
+
+    run = ''
+    while i < len(items) and items[i][0] == sre_constants.LITERAL:
+        run += chr(items[i][1])
+        i += 1
+    if run:
+        return [(re.escape(run), {run[0]}, run)]
+
+    if i >= len(items):
+        return None
+
+    op, av = items[i]
+    if op == sre_constants.SUBPATTERN:
+        _, add_flags, del_flags, sub = av
+        if add_flags or del_flags:
+            return None
+        return _prefixes(sub)
+    if op == sre_constants.BRANCH:
+        result = []
+        for alternative in av[1]:
+            prefixes = _prefixes(alternative)
+            if prefixes is None:
+                return None
+            result.extend(prefixes)
+        return result
+    if op == sre_constants.IN:
+        prefix = _class_prefix(av)
+        return [prefix] if prefix is not None else None
+    if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+        low, _, sub = av
+        return _prefixes(sub) if low > 0 else None
+    return None
+
+
+def _trie_regex(words: List[str], lookahead: bool = False) -> List[str]:
+    """Альтернативы для набора слов, сгруппированные префиксным деревом.
+
+    Слово, продолжающее более короткое слово из набора, не нужно: для
+    поиска кандидата достаточно короткого. С lookahead первый символ
+    поглощается, а остаток проверяется опережающей проверкой, чтобы
+    кандидаты не перекрывались по длине слова.
+    """
+    if '' in words:
+        return []
+
+    groups: Dict[str, List[str]] = {}
+    for word in words:
+        groups.setdefault(word[0], []).append(word[1:])
+
+    alternatives = []
+    for first, rests in sorted(groups.items()):
+        rest = _trie_regex(rests)
+        if not rest:
+            alternatives.append(re.escape(first))
+        elif lookahead:
+            alternatives.append(f"{re.escape(first)}(?={'|'.join(rest)})")
+        elif len(rest) == 1:
+            alternatives.append(re.escape(first) + rest[0])
+        else:
+            alternatives.append(f"{re.escape(first)}(?:{'|'.join(rest)})")
+    return alternatives
+
+
+class MultiPatternScanner:
+    """Сканирует текст один раз для нескольких групп паттернов.
+
+    groups: имя группы -> список паттернов (re.Pattern или TrackedPattern).
+    scan() возвращает имя группы -> список совпадений в том же порядке,
+    что дали бы вложенные циклы "for pattern in group: finditer(text)".
+    """
+
+    def __init__(self, groups: Dict[str, Sequence]):
+        self.groups = {name: list(patterns) for name, patterns in groups.items()}
+
+        self._patterns = []        # (группа, индекс в группе, паттерн)
+        self._fallback = []        # индексы паттернов для обычного finditer
+        self._buckets: Dict[str, List[int]] = {}
+        self._wildcard: List[int] = []
+
+        fragments = []
+        literals = []
+        classes = []
+        ignore_case = False
+        for name, patterns in self.groups.items():
+            for local_index, pattern in enumerate(patterns):
+                index = len(self._patterns)
+                self._patterns.append((name, local_index, pattern))
+
+                regex = getattr(pattern, 'regex', pattern)
+                try:
+                    prefixes = _prefixes(sre_parse.parse(regex.pattern, regex.flags))
+                except Exception:
+                    prefixes = None
+                if not prefixes:
+                    self._fallback.append(index)
+                    continue
+
+                ignore_case = ignore_case or bool(regex.flags & re.IGNORECASE)
+                bucket_chars = set()
+                for fragment, chars, literal in prefixes:
+                    fragments.append(fragment)
+                    if literal is not None:
+                        literals.append(literal)
+                    else:
+                        classes.append(fragment)
+                    if chars is _ANY:
+                        bucket_chars = _ANY
+                    elif bucket_chars is not _ANY:
+                        bucket_chars.update(char.lower() for char in chars)
+                        bucket_chars.update(char.upper().lower() for char in chars)
+
+                if bucket_chars is _ANY:
+                    self._wildcard.append(index)
+                else:
+                    for char in bucket_chars:
+                        self._buckets.setdefault(char, []).append(index)
+
+        self._all_indexed = sorted(
+            {i for indexes in self._buckets.values() for i in indexes} | set(self._wildcard)
+        )
+        for char, indexes in self._buckets.items():
+            self._buckets[char] = sorted(set(indexes) | set(self._wildcard))
+
+        # Медленный путь: все фрагменты как есть, с IGNORECASE
+        unique = sorted(set(fragments), key=lambda f: (-len(f), f))
+        self._candidates = re.compile(
+            f"(?=(?:{'|'.join(unique)}))", re.IGNORECASE if ignore_case else 0
+        ) if unique else None
+
+        # Быстрый путь: те же фрагменты в нижнем регистре для текста в нижнем
+        # регистре (только для ASCII, где lower() не меняет смысл класса)
+        self._lower_candidates = None
+        lowered = [literal.lower() for literal in literals]
+        if unique and all(f.isascii() for f in lowered + classes):
+            self._lower_candidates = re.compile(
+                '|'.join(_trie_regex(lowered, lookahead=True) + [c.lower() for c in classes])
+            )
+
+    def _iter_candidates(self, text: str):
+        """Позиции, с которых может начаться совпадение хотя бы одного паттерна"""
+        if self._lower_candidates is not None:
+            lowered = text.lower()
+            if len(lowered) == len(text):
+                if any(chr(code) in lowered for code in _EXTRA_FOLDS):
+                    lowered = lowered.translate(_EXTRA_FOLDS)
+                return self._lower_candidates.finditer(lowered)
+        return self._candidates.finditer(text)
+
+    def scan(self, text: str) -> Dict[str, List['re.Match']]:
+        found = [[] for _ in self._patterns]
+        next_allowed = [0] * len(self._patterns)
+
+        if self._candidates is not None:
+            buckets = self._buckets
+            every = self._all_indexed
+            patterns = self._patterns
+            for candidate in self._iter_candidates(text):
+                pos = candidate.start()
+                for index in buckets.get(text[pos].lower(), every):
+                    if pos < next_allowed[index]:
+                        continue
+                    match = patterns[index][2].match(text, pos)
+                    if match is not None:
+                        found[index].append(match)
+                        next_allowed[index] = match.end()
+
+        for index in self._fallback:
+            found[index] = list(self._patterns[index][2].finditer(text))
+
+        result = {name: [] for name in self.groups}
+        for index, (name, _, _) in enumerate(self._patterns):
+            result[name].extend(found[index])
+        return result
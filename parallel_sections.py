@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+🧵 Параллельный разбор секций endpoints
+=======================================
+После нахождения секций разбор каждой (title/description, категория,
+headers, parameters, responses, request body, оценка качества) не зависит
+от остальных. ParallelSectionParser собирает секции в пачки по
+SECTIONS_PER_TASK и разбирает их в пуле процессов, а результаты отдает
+строго в порядке документа.
+
+Текст документа публикуется один раз в общей памяти (shared_text): в
+задачу уходят только смещения секций и пары Method/URL, процессы пула
+читают секции из общего блока. Затраты на передачу задач не зависят от
+размера секций и документа.
+
+Каждый процесс пула разбирает пачку своим экземпляром парсера со своей
+статистикой и возвращает ее вместе с endpoints; основной процесс
+складывает счетчики (headers, parameters, responses, errors), таблицы
+примеров ответов (payload_table) и замеры инструментирования. Общее состояние из нескольких процессов не меняется.
+
+Пул и блок общей памяти создаются только когда набралась первая полная
+пачка: маленькие документы разбираются в основном процессе без затрат на
+запуск пула.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from shared_text import SharedText, SharedTextHandle, SharedTextView, attach
+
+# Секций в одной задаче пула
+SECTIONS_PER_TASK = 100
+
+# Счетчики self.stats, которые складываются из пачек
+SUMMED_STATS = ("headers", "parameters", "responses")
+
+# Парсер процесса пула (создается в _init_worker)
+_worker_parser = None
+# Текущий документ процесса пула (подключается при первой пачке)
+_worker_text: Optional[SharedTextView] = None
+
+
+def _init_worker():
+    global _worker_parser
+    from fleethand_ultimate_parser import FleethandUltimateParser
+    _worker_parser = FleethandUltimateParser()
+
+
+def _attach_text(handle: SharedTextHandle) -> SharedTextView:
+    global _worker_text
+    if _worker_text is None or _worker_text.handle != handle:
+        if _worker_text is not None:
+            _worker_text.close()
+        _worker_text = attach(handle)
+    return _worker_text
+
+
+def _parse_batch(handle: SharedTextHandle, batch: List[Tuple[int, int, str, str, int]], trace: bool):
+    """Разбирает пачку секций (byte_start, byte_end, method, url, index);
+    возвращает endpoints, статистику, примеры ответов и замеры пачки"""
+    parser = _worker_parser
+    text = _attach_text(handle)
+    parser.reset_stats(trace=trace)
+    endpoints = [parser.parse_section_instrumented(text.slice(byte_start, byte_end), method, url, index)
+                 for byte_start, byte_end, method, url, index in batch]
+    instrumentation = parser.instrumentation
+    return endpoints, parser.stats, parser.payloads.to_dict(), instrumentation, instrumentation.regex_deltas()
+
+
+class ParallelSectionParser:
+    def __init__(self, parser, workers: int, text: str, batch_size: int = SECTIONS_PER_TASK):
+        """parser - FleethandUltimateParser, в чьи stats и instrumentation
+        складываются результаты; text - весь текст документа"""
+        self.parser = parser
+        self.workers = workers
+        self.text = text
+        self.batch_size = batch_size
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._shared: Optional[SharedText] = None
+        self._batch: List[Tuple[int, int, str, str, int]] = []
+        self._in_flight = deque()
+
+    def feed(self, sections: Iterable[Tuple[int, int, str, str, int]]) -> Iterator[Optional[Dict[str, Any]]]:
+        """Принимает секции (start, end, method, url, index) со смещениями в
+        text; выдает готовые endpoints (None для неразобранных) в порядке документа"""
+        for section in sections:
+            self._batch.append(section)
+            if len(self._batch) >= self.batch_size:
+                self._submit()
+                # Не больше 2 × workers пачек в работе, как в pdf_text
+                while len(self._in_flight) > self.workers * 2:
+                    yield from self._collect()
+
+    def finish(self) -> Iterator[Optional[Dict[str, Any]]]:
+        """Разбирает остаток и выдает все оставшиеся endpoints"""
+        if self._executor is None:
+            # Документ меньше одной пачки: пул не нужен
+            batch, self._batch = self._batch, []
+            for start, end, method, url, index in batch:
+                yield self.parser.parse_section_instrumented(self.text[start:end], method, url, index)
+            return
+
+        if self._batch:
+            self._submit()
+        while self._in_flight:
+            yield from self._collect()
+
+    def close(self):
+        if self._executor is not None:
+            for future in self._in_flight:
+                future.cancel()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def _submit(self):
+        if self._executor is None:
+            self._shared = SharedText(self.text)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        batch, self._batch = self._batch, []
+        tasks = [(*self._shared.byte_range(start, end), method, url, index)
+                 for start, end, method, url, index in batch]
+        self._in_flight.append(self._executor.submit(_parse_batch, self._shared.handle(), tasks,
+                                                     self.parser.instrumentation.trace))
+
+    def _collect(self) -> List[Optional[Dict[str, Any]]]:
+        endpoints, stats, payloads, instrumentation, regex_deltas = self._in_flight.popleft().result()
+        for name in SUMMED_STATS:
+            self.parser.stats[name] += stats[name]
+        self.parser.stats["errors"].extend(stats["errors"])
+        # Id примеров - хэши содержимого, поэтому таблицы пачек просто объединяются
+        self.parser.payloads.update(payloads)
+        self.parser.instrumentation.merge(instrumentation, regex_deltas)
+        return endpoints
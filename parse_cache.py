@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+🗄️ Content-addressed кэш результатов парсинга
+=============================================
+Ключ записи - SHA-256 байтов PDF плюс версия парсера, поэтому разные
+документы не могут столкнуться, а повторная загрузка того же файла
+возвращает готовый результат без извлечения текста и парсинга.
+
+Структура:
+    .parse_cache/
+    └── <sha256>-<parser_version>/
+        ├── extracted_text.txt   # текст документа
+        └── results.json         # endpoints, mcp_data, quality
+
+Размер кэша ограничен: при превышении лимита удаляются записи, которые
+дольше всего не использовались (LRU по времени последнего обращения).
+Запись, в которую другая задача еще пишет (есть временные .part/.tmp
+файлы или еще нет results.json), не удаляется, пока не пролежит без
+изменений IN_PROGRESS_GRACE_SECONDS - так брошенные записи упавших
+процессов все же освобождают место.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_DIR = os.environ.get("PARSER_CACHE_DIR", ".parse_cache")
+DEFAULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+
+TEXT_FILE = "extracted_text.txt"
+RESULTS_FILE = "results.json"
+
+# Временные файлы незавершенной записи (pdf_text и store_results)
+PARTIAL_SUFFIXES = (".part", ".tmp")
+
+# Сколько незавершенная запись защищена от удаления с последнего изменения
+IN_PROGRESS_GRACE_SECONDS = 60 * 60
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 содержимого файла, читаемого блоками"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def key_for(self, pdf_path: str, parser_version: str) -> str:
+        """Ключ записи для документа и версии парсера"""
+        return f"{file_sha256(pdf_path)}-{parser_version}"
+
+    def entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def text_path(self, key: str) -> Path:
+        """Путь к тексту документа (каталог записи создается при необходимости)"""
+        entry = self.entry_dir(key)
+        entry.mkdir(parents=True, exist_ok=True)
+        return entry / TEXT_FILE
+
+    def has_text(self, key: str) -> bool:
+        return (self.entry_dir(key) / TEXT_FILE).exists()
+
+    def load_results(self, key: str) -> Optional[Dict]:
+        """Готовые результаты парсинга или None, если их нет в кэше"""
+        results_path = self.entry_dir(key) / RESULTS_FILE
+        try:
+            with open(results_path, 'r', encoding='utf-8') as f:
+                results = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        self.touch(key)
+        return results
+
+    def store_results(self, key: str, results: Dict):
+        """Сохраняет результаты и при необходимости освобождает место"""
+        entry = self.entry_dir(key)
+        entry.mkdir(parents=True, exist_ok=True)
+
+        # Пишем атомарно: параллельный читатель видит либо старый файл, либо новый
+        tmp_path = entry / f"{RESULTS_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, entry / RESULTS_FILE)
+
+        self.touch(key)
+        self.evict(keep=key)
+
+    def touch(self, key: str):
+        """Отмечает обращение к записи (для LRU)"""
+        now = time.time()
+        try:
+            os.utime(self.entry_dir(key), (now, now))
+        except OSError:
+            pass
+
+    def entries(self) -> List[Tuple[float, int, Path, bool]]:
+        """Записи кэша как (время последнего обращения, размер, путь, запись
+        еще заполняется). Файлы и записи, которые параллельные задачи
+        переименовали или удалили во время обхода, пропускаются."""
+        result = []
+        if not self.cache_dir.exists():
+            return result
+
+        now = time.time()
+        for entry in self.cache_dir.iterdir():
+            try:
+                entry_stat = entry.stat()
+                files = list(entry.iterdir()) if entry.is_dir() else None
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            if files is None:
+                continue
+
+            size = 0
+            modified = entry_stat.st_mtime
+            complete = False
+            partial = False
+            for f in files:
+                try:
+                    st = f.stat()
+                except FileNotFoundError:
+                    continue
+                size += st.st_size
+                modified = max(modified, st.st_mtime)
+                if f.name == RESULTS_FILE:
+                    complete = True
+                elif f.name.endswith(PARTIAL_SUFFIXES):
+                    partial = True
+            in_progress = (partial or not complete) and now - modified < IN_PROGRESS_GRACE_SECONDS
+            result.append((entry_stat.st_mtime, size, entry, in_progress))
+        return result
+
+    def evict(self, keep: Optional[str] = None):
+        """Удаляет давно не использованные записи, пока кэш больше лимита.
+        Записи, которые еще заполняются другими задачами, не трогаются."""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _, _ in entries)
+
+        for _, size, entry, in_progress in entries:
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep or in_progress:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+🖥️ Командная строка парсера
+===========================
+Точка входа fleethand_ultimate_parser.py. Без позиционных аргументов
+работает как раньше: documentation.pdf (или --pdf/--text) -> ultimate_final_data/.
+
+С входными файлами или каталогами обрабатывает весь корпус за один запуск:
+
+    python fleethand_ultimate_parser.py docs/ extra/api.pdf -o results --jobs 4
+
+Из каталогов берутся *.pdf и *.txt (текст, уже извлеченный из PDF;
+.txt с тем же именем, что у PDF рядом, пропускается). Результаты каждого
+документа пишутся в <output>/<имя документа>/, сводка по корпусу -
+в <output>/batch_summary.json.
+
+--jobs N запускает N процессов, которые один раз загружают парсер и
+обрабатывают документ за документом (parser_worker), а не новый
+интерпретатор на каждый файл.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from fleethand_ultimate_parser import (
+    DEFAULT_OUTPUT_DIR, DEFAULT_PDF_PATH, DEFAULT_TEXT_FILE, FleethandUltimateParser
+)
+from mcp_compact import DEFAULT_MCP_FORMAT, MCP_FORMATS
+from parse_cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES
+from parser_worker import init_worker, parse_document
+from patterns import REGISTRY
+
+INPUT_SUFFIXES = ('.pdf', '.txt')
+BATCH_SUMMARY_FILE = "batch_summary.json"
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    arg_parser = argparse.ArgumentParser(description="Fleethand Ultimate Parser")
+    arg_parser.add_argument("inputs", nargs="*",
+                            help="PDF или .txt файлы и каталоги с ними (пакетный режим)")
+    arg_parser.add_argument("--pdf", default=DEFAULT_PDF_PATH,
+                            help="PDF документации (по умолчанию documentation.pdf)")
+    arg_parser.add_argument("--text", default=DEFAULT_TEXT_FILE,
+                            help="Файл извлеченного текста (по умолчанию extracted_text.txt)")
+    arg_parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT_DIR,
+                            help="Каталог для результатов (по умолчанию ultimate_final_data)")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=1,
+                            help="Сколько документов обрабатывать параллельно (пакетный режим)")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="Количество процессов для извлечения страниц PDF")
+    arg_parser.add_argument("--parse-workers", type=int, default=1,
+                            help="Количество процессов для разбора секций endpoints")
+    arg_parser.add_argument("--mcp-format", choices=MCP_FORMATS, default=DEFAULT_MCP_FORMAT,
+                            help="Формат mcp_server_ultimate_final.json: inline - полные схемы в каждом tool, "
+                                 "compact - общие параметры и категории в определениях по ссылкам")
+    arg_parser.add_argument("--trace", metavar="FILE",
+                            help="Сохранить замеры стадий и endpoints в формате Chrome trace "
+                                 "(в пакетном режиме - в каталог каждого документа)")
+    arg_parser.add_argument("--profile-regex", action="store_true",
+                            help="Считать вызовы регулярных выражений (замедляет парсинг)")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="Не использовать кэш извлеченного текста и результатов")
+    arg_parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                            help="Каталог кэша (по умолчанию .parse_cache или $PARSER_CACHE_DIR)")
+    arg_parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+                            help="Максимальный размер кэша в МБ")
+    return arg_parser
+
+
+def collect_inputs(paths: List[str]) -> List[str]:
+    """Входные документы: файлы как есть, каталоги - их *.pdf и *.txt"""
+    documents = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(p for p in Path(path).iterdir()
+                           if p.is_file() and p.suffix.lower() in INPUT_SUFFIXES)
+            pdf_stems = {p.stem for p in files if p.suffix.lower() == '.pdf'}
+            documents.extend(str(p) for p in files
+                             if p.suffix.lower() == '.pdf' or p.stem not in pdf_stems)
+        elif os.path.isfile(path):
+            documents.append(path)
+        else:
+            raise FileNotFoundError(f"Не найден {path}")
+
+    # Один и тот же файл, указанный дважды, обрабатывается один раз
+    unique = []
+    seen = set()
+    for document in documents:
+        key = os.path.realpath(document)
+        if key not in seen:
+            seen.add(key)
+            unique.append(document)
+    return unique
+
+
+def plan_outputs(documents: List[str], output_root: str) -> List[Tuple[str, str]]:
+    """Пары (документ, каталог результатов); одинаковые имена получают суффикс"""
+    plan = []
+    used = set()
+    for document in documents:
+        name = Path(document).stem
+        candidate = name
+        n = 2
+        while candidate in used:
+            candidate = f"{name}_{n}"
+            n += 1
+        used.add(candidate)
+        plan.append((document, os.path.join(output_root, candidate)))
+    return plan
+
+
+def print_document_result(done: int, total: int, result: Dict):
+    name = os.path.basename(result['input'])
+    if result['success']:
+        print(f"[{done}/{total}] ✅ {name}: {result['endpoints']} endpoints, "
+              f"MCP готовность {result['mcp_readiness']}, {result['seconds']:.2f}с")
+    else:
+        print(f"[{done}/{total}] ❌ {name}: {result['error']}")
+
+
+def run_batch(args) -> int:
+    documents = collect_inputs(args.inputs)
+    if not documents:
+        print("❌ Не найдено ни одного PDF или .txt документа")
+        return 1
+
+    plan = plan_outputs(documents, args.output)
+    jobs = max(1, min(args.jobs, len(plan)))
+    cache_max_bytes = args.cache_max_mb * 1024 * 1024
+    use_cache = not args.no_cache
+    trace_name = os.path.basename(args.trace) if args.trace else None
+
+    def trace_file(output_dir: str) -> Optional[str]:
+        return os.path.join(output_dir, trace_name) if trace_name else None
+
+    print(f"📚 Документов: {len(plan)}, процессов: {jobs}, результаты: {Path(args.output).resolve()}")
+    start = time.perf_counter()
+    results = []
+
+    if jobs == 1:
+        init_worker(args.cache_dir, cache_max_bytes, args.profile_regex)
+        for document, output_dir in plan:
+            result = parse_document(document, output_dir, use_cache, args.workers,
+                                    trace_file(output_dir), args.parse_workers, args.mcp_format)
+            results.append(result)
+            print_document_result(len(results), len(plan), result)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                 initargs=(args.cache_dir, cache_max_bytes, args.profile_regex)) as executor:
+            futures = [
+                executor.submit(parse_document, document, output_dir, use_cache, args.workers,
+                                trace_file(output_dir), args.parse_workers, args.mcp_format)
+                for document, output_dir in plan
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                print_document_result(len(results), len(plan), result)
+
+    elapsed = time.perf_counter() - start
+    failed = [r for r in results if not r['success']]
+    order = {document: i for i, (document, _) in enumerate(plan)}
+    results.sort(key=lambda r: order[r['input']])
+
+    summary = {
+        "documents": len(results),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "endpoints": sum(r.get('endpoints', 0) for r in results),
+        "jobs": jobs,
+        "seconds": round(elapsed, 3),
+        "results": results
+    }
+    Path(args.output).mkdir(parents=True, exist_ok=True)
+    with open(Path(args.output) / BATCH_SUMMARY_FILE, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    print("=" * 70)
+    print(f"📊 Обработано документов: {summary['succeeded']}/{summary['documents']}, "
+          f"endpoints: {summary['endpoints']}, время: {elapsed:.2f}с")
+    if failed:
+        print(f"❌ С ошибками: {len(failed)} (подробности в {BATCH_SUMMARY_FILE})")
+    return 1 if failed else 0
+
+
+def run_single(args) -> int:
+    """Прежний режим: один документ, результаты прямо в --output"""
+    parser = FleethandUltimateParser(cache_dir=args.cache_dir,
+                                     cache_max_bytes=args.cache_max_mb * 1024 * 1024)
+    if args.profile_regex:
+        REGISTRY.enable_profiling()
+    parser.parse(text_file=args.text, workers=args.workers, pdf_path=args.pdf,
+                 use_cache=not args.no_cache, output_dir=args.output, trace_file=args.trace,
+                 parse_workers=args.parse_workers, mcp_format=args.mcp_format)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    if args.inputs:
+        return run_batch(args)
+    return run_single(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
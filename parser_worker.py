@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+🔥 Прогретые процессы-обработчики парсера
+=========================================
+Процесс пула один раз при старте импортирует PyMuPDF и создает
+FleethandUltimateParser (init_worker), а затем обрабатывает документы
+в своем адресном пространстве (parse_pdf): без запуска нового
+интерпретатора на каждый документ и без обмена результатами через
+JSON файлы на диске.
+
+    executor = ProcessPoolExecutor(max_workers=4, initializer=init_worker)
+    result = executor.submit(parse_pdf, "api.pdf").result()
+
+parse_pdf возвращает ту же структуру, что раньше собирал web_interface
+из файлов ultimate_final_data/: {'success', 'results', 'stdout', 'stderr'},
+где results - имя файла результата -> данные.
+
+parse_document обрабатывает один документ пакета (PDF или готовый текст)
+и пишет результаты в свой каталог, возвращая только краткую сводку.
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+from fleethand_ultimate_parser import DEFAULT_TEXT_FILE, RESULT_FILES, FleethandUltimateParser, ProgressCallback
+from mcp_compact import DEFAULT_MCP_FORMAT
+from parse_cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES
+from patterns import REGISTRY
+
+# Парсер текущего процесса (создается в init_worker или при первом вызове)
+_parser: Optional[FleethandUltimateParser] = None
+
+
+def init_worker(cache_dir: str = DEFAULT_CACHE_DIR, cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                profile_regex: bool = False):
+    """Инициализатор процесса пула: загружает PyMuPDF и создает парсер"""
+    global _parser
+    try:
+        import fitz  # noqa: F401 - импорт PyMuPDF оплачивается один раз
+    except ImportError:
+        # Понятную ошибку отдаст сам парсинг: пул не должен падать при старте
+        pass
+    _parser = FleethandUltimateParser(cache_dir=cache_dir, cache_max_bytes=cache_max_bytes)
+    if profile_regex:
+        REGISTRY.enable_profiling()
+
+
+def get_parser() -> FleethandUltimateParser:
+    if _parser is None:
+        init_worker()
+    return _parser
+
+
+def parse_pdf(pdf_path: str, use_cache: bool = True,
+              progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """Парсит PDF в текущем процессе и возвращает результаты без записи на диск.
+
+    Извлеченный текст пишется во временный каталог задачи, который
+    удаляется после парсинга. Вывод парсера перехватывается и
+    возвращается в 'stdout', события прогресса передаются в progress.
+    """
+    workspace = tempfile.mkdtemp(prefix='parse_job_')
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            parsed = get_parser().parse(
+                text_file=os.path.join(workspace, DEFAULT_TEXT_FILE),
+                pdf_path=os.path.abspath(pdf_path),
+                use_cache=use_cache,
+                output_dir=None,
+                progress=progress
+            )
+        return {
+            'success': True,
+            'results': {file_name: parsed[key] for key, file_name in RESULT_FILES.items()},
+            'stdout': output.getvalue(),
+            'stderr': ''
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Ошибка парсера: {e}',
+            'stdout': output.getvalue(),
+            'stderr': traceback.format_exc()
+        }
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def parse_document(input_path: str, output_dir: str, use_cache: bool = True,
+                   workers: int = 1, trace_file: Optional[str] = None,
+                   parse_workers: int = 1, mcp_format: str = DEFAULT_MCP_FORMAT) -> Dict[str, Any]:
+    """Парсит PDF или файл извлеченного текста, результаты пишет в output_dir.
+
+    Текст, извлеченный из PDF, сохраняется рядом с результатами
+    (extracted_text.txt), как при обычном запуске парсера.
+    """
+    start = time.perf_counter()
+    output = io.StringIO()
+    is_pdf = input_path.lower().endswith('.pdf')
+    try:
+        with contextlib.redirect_stdout(output):
+            parsed = get_parser().parse(
+                text_file=os.path.join(output_dir, DEFAULT_TEXT_FILE) if is_pdf else input_path,
+                workers=workers,
+                pdf_path=input_path if is_pdf else None,
+                use_cache=use_cache,
+                output_dir=output_dir,
+                trace_file=trace_file,
+                parse_workers=parse_workers,
+                mcp_format=mcp_format
+            )
+        metrics = parsed["quality"].get("quality_metrics", {})
+        return {
+            'success': True,
+            'input': input_path,
+            'output_dir': output_dir,
+            'endpoints': len(parsed["endpoints"]),
+            'mcp_readiness': metrics.get('mcp_readiness_score'),
+            'quality': metrics.get('professional_quality'),
+            'seconds': round(time.perf_counter() - start, 3)
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'input': input_path,
+            'output_dir': output_dir,
+            'error': f'Ошибка парсера: {e}',
+            'stdout': output.getvalue(),
+            'stderr': traceback.format_exc(),
+            'seconds': round(time.perf_counter() - start, 3)
+        }
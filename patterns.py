@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+🧩 Реестр скомпилированных регулярных выражений
+===============================================
+Все паттерны парсера и экстракторов компилируются один раз при импорте
+модуля и регистрируются под понятными именами.
+
+Для профилирования реестр умеет считать по каждому паттерну число вызовов,
+число совпадений и затраченное время:
+
+    from patterns import REGISTRY
+    REGISTRY.enable_profiling()
+    ...
+    for row in REGISTRY.stats()[:10]:
+        print(row)
+
+Пока профилирование выключено, методы паттерна - это методы самого
+re.Pattern, так что накладных расходов нет.
+"""
+
+import re
+import time
+from typing import Dict, Iterable, List
+
+_METHODS = ('search', 'match', 'fullmatch', 'finditer', 'findall', 'sub', 'split')
+
+
+class TrackedPattern:
+    """Скомпилированный паттерн с именем и счетчиками для профилирования"""
+
+    def __init__(self, name: str, regex: 're.Pattern'):
+        self.name = name
+        self.regex = regex
+        self.pattern = regex.pattern
+        self.flags = regex.flags
+        self.reset_stats()
+        self._bind(profiling=False)
+
+    def reset_stats(self):
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+    def _bind(self, profiling: bool):
+        for method in _METHODS:
+            original = getattr(self.regex, method)
+            setattr(self, method, self._tracked(method, original) if profiling else original)
+
+    def _tracked(self, method: str, original):
+        if method == 'finditer':
+            def finditer(*args, **kwargs):
+                self.calls += 1
+                iterator = original(*args, **kwargs)
+                while True:
+                    start = time.perf_counter()
+                    match = next(iterator, None)
+                    self.seconds += time.perf_counter() - start
+                    if match is None:
+                        return
+                    self.hits += 1
+                    yield match
+            return finditer
+
+        def tracked(*args, **kwargs):
+            start = time.perf_counter()
+            result = original(*args, **kwargs)
+            self.seconds += time.perf_counter() - start
+            self.calls += 1
+            if method == 'findall':
+                self.hits += len(result)
+            elif method == 'sub':
+                self.hits += 1
+            elif method == 'split':
+                self.hits += len(result) - 1
+            elif result is not None:
+                self.hits += 1
+            return result
+        return tracked
+
+    def __repr__(self):
+        return f"TrackedPattern({self.name!r}, {self.pattern!r})"
+
+
+class PatternRegistry:
+    """Именованный реестр паттернов, общий для всех парсеров и экстракторов"""
+
+    def __init__(self):
+        self._patterns: Dict[str, TrackedPattern] = {}
+        self.profiling = False
+
+    def compile(self, name: str, pattern: str, flags: int = 0) -> TrackedPattern:
+        """Компилирует и регистрирует паттерн (повторный вызов возвращает тот же объект)"""
+        existing = self._patterns.get(name)
+        if existing is not None:
+            if existing.pattern != pattern or existing.flags != re.compile(pattern, flags).flags:
+                raise ValueError(f"Паттерн {name!r} уже зарегистрирован с другим выражением")
+            return existing
+
+        tracked = TrackedPattern(name, re.compile(pattern, flags))
+        if self.profiling:
+            tracked._bind(profiling=True)
+        self._patterns[name] = tracked
+        return tracked
+
+    def compile_all(self, name: str, patterns: Iterable[str], flags: int = 0) -> List[TrackedPattern]:
+        """Компилирует список паттернов под именами name[0], name[1], ..."""
+        return [self.compile(f"{name}[{i}]", pattern, flags) for i, pattern in enumerate(patterns)]
+
+    def get(self, name: str) -> TrackedPattern:
+        return self._patterns[name]
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def __iter__(self):
+        return iter(list(self._patterns.values()))
+
+    def enable_profiling(self):
+        """Включает подсчет вызовов, совпадений и времени"""
+        self.profiling = True
+        for tracked in self._patterns.values():
+            tracked._bind(profiling=True)
+
+    def disable_profiling(self):
+        self.profiling = False
+        for tracked in self._patterns.values():
+            tracked._bind(profiling=False)
+
+    def reset_stats(self):
+        for tracked in self._patterns.values():
+            tracked.reset_stats()
+
+    def stats(self) -> List[Dict]:
+        """Счетчики по паттернам, самые затратные первыми"""
+        rows = [
+            {
+                "name": tracked.name,
+                "calls": tracked.calls,
+                "hits": tracked.hits,
+                "seconds": round(tracked.seconds, 6)
+            }
+            for tracked in self._patterns.values()
+            if tracked.calls
+        ]
+        rows.sort(key=lambda row: row["seconds"], reverse=True)
+        return rows
+
+
+REGISTRY = PatternRegistry()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+🗃️ Общая таблица payloads
+=========================
+Endpoints одной категории часто содержат одинаковые примеры ответов, а
+в документации повторяются одни и те же JSON модели. Раньше каждая
+запись хранила свою полную копию.
+
+PayloadTable хранит каждое уникальное значение один раз. Значение
+приводится к канонической форме (JSON с отсортированными ключами, без
+пробелов), по ней считается хэш; он и есть id, по которому записи
+ссылаются на значение:
+
+    table = PayloadTable()
+    response["example_id"] = table.intern(example)
+    ...
+    table.get(response["example_id"])       # то же значение (тот же объект)
+
+Id зависит только от содержимого, поэтому таблицы разных процессов
+объединяются через update() без перенумерации, а одинаковые значения из
+разных процессов получают один id.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterator, Optional
+
+# Длина хэша в байтах (id - вдвое больше hex-символов)
+PAYLOAD_ID_BYTES = 8
+
+
+def canonical_json(value: Any) -> str:
+    """Каноническая форма значения: порядок ключей и пробелы не важны"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def payload_id(value: Any) -> str:
+    """Id значения - хэш его канонической формы"""
+    digest = hashlib.blake2b(canonical_json(value).encode('utf-8'), digest_size=PAYLOAD_ID_BYTES)
+    return digest.hexdigest()
+
+
+class PayloadTable:
+    def __init__(self, payloads: Optional[Dict[str, Any]] = None):
+        """payloads - ранее сохраненная таблица {id: значение}"""
+        self.payloads: Dict[str, Any] = dict(payloads or {})
+        self.stats = {
+            "interned": 0,
+            "duplicates": 0
+        }
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def __contains__(self, value_id: str) -> bool:
+        return value_id in self.payloads
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.payloads)
+
+    def intern(self, value: Any) -> str:
+        """Добавляет значение (если его еще нет) и возвращает его id.
+        Хранится первое из одинаковых значений."""
+        value_id = payload_id(value)
+        self.stats["interned"] += 1
+        if value_id in self.payloads:
+            self.stats["duplicates"] += 1
+        else:
+            self.payloads[value_id] = value
+        return value_id
+
+    def get(self, value_id: str, default: Any = None) -> Any:
+        return self.payloads.get(value_id, default)
+
+    def update(self, payloads: Dict[str, Any]):
+        """Добавляет значения другой таблицы (уже известные id пропускаются)"""
+        for value_id, value in payloads.items():
+            self.payloads.setdefault(value_id, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.payloads
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+📄 Постраничное извлечение текста из PDF
+========================================
+Генераторы вместо накопления всего документа в одной строке:
+- iter_pdf_pages() выдает страницы как (page_no, text)
+- iter_document_chunks() выдает страницы в формате парсера
+  (с разделителями "=== Страница N ===") и сразу пишет их в файл кэша
+
+Пиковая память определяется одной страницей, а не размером документа.
+
+С workers > 1 страницы извлекаются несколькими процессами: каждый сам
+открывает документ и обрабатывает свой диапазон страниц, а результаты
+выдаются строго в порядке страниц.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Диапазонов на процесс: мелкие диапазоны выравнивают нагрузку, когда
+# страницы сильно различаются по объему текста
+RANGES_PER_WORKER = 4
+
+
+def page_separator(page_no: int) -> str:
+    """Разделитель страниц, на который опирается парсер"""
+    return f"\n=== Страница {page_no} ===\n\n"
+
+
+def open_pdf(pdf_path: str):
+    """Открывает PDF через PyMuPDF"""
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        raise ImportError("PyMuPDF не установлен. Выполните: pip install PyMuPDF")
+    return fitz.open(pdf_path)
+
+
+def get_page_count(pdf_path: str) -> int:
+    """Количество страниц в PDF"""
+    doc = open_pdf(pdf_path)
+    try:
+        return len(doc)
+    finally:
+        doc.close()
+
+
+def iter_pdf_pages(pdf_path: str, workers: int = 1) -> Iterator[Tuple[int, str]]:
+    """Выдает страницы PDF по одной как (номер страницы с 1, текст)"""
+    if workers > 1:
+        yield from iter_pdf_pages_parallel(pdf_path, workers)
+        return
+
+    doc = open_pdf(pdf_path)
+    try:
+        for page_num in range(len(doc)):
+            yield page_num + 1, doc[page_num].get_text()
+    finally:
+        doc.close()
+
+
+def extract_page_range(pdf_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """Извлекает страницы [start, stop) - выполняется в процессе-воркере"""
+    doc = open_pdf(pdf_path)
+    try:
+        return [(page_num + 1, doc[page_num].get_text()) for page_num in range(start, stop)]
+    finally:
+        doc.close()
+
+
+def split_page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """Делит страницы на непрерывные диапазоны примерно равного размера"""
+    if page_count <= 0:
+        return []
+    parts = min(page_count, max(1, workers * RANGES_PER_WORKER))
+    step, extra = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        stop = start + step + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def iter_pdf_pages_parallel(pdf_path: str, workers: int) -> Iterator[Tuple[int, str]]:
+    """Параллельное извлечение страниц с выдачей в порядке документа.
+
+    Одновременно в работе не больше 2 × workers диапазонов, поэтому
+    готовые, но еще не выданные страницы не накапливаются без ограничения.
+    """
+    ranges = split_page_ranges(get_page_count(pdf_path), workers)
+    if not ranges:
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        in_flight = deque()
+        next_range = 0
+        while next_range < len(ranges) or in_flight:
+            while next_range < len(ranges) and len(in_flight) < workers * 2:
+                start, stop = ranges[next_range]
+                in_flight.append(executor.submit(extract_page_range, pdf_path, start, stop))
+                next_range += 1
+            yield from in_flight.popleft().result()
+
+
+def format_pages(pages: Iterable[Tuple[int, str]]) -> Iterator[str]:
+    """Превращает страницы в порции текста документа.
+
+    Результат после склейки совпадает с прежним
+    ''.join(f"\\n=== Страница N ===\\n\\n{text}\\n").strip(): ведущие пробелы
+    отбрасываются, а хвостовые придерживаются, пока не станет ясно, что за
+    ними идет еще текст.
+    """
+    started = False
+    held_whitespace = ""
+
+    for page_no, page_text in pages:
+        chunk = f"{page_separator(page_no)}{page_text}\n"
+        if not started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+
+        body = chunk.rstrip()
+        if body:
+            yield held_whitespace + body
+            held_whitespace = chunk[len(body):]
+        else:
+            held_whitespace += chunk
+
+
+def iter_document_chunks(pdf_path: str, cache_file: Optional[str] = None,
+                         workers: int = 1) -> Iterator[str]:
+    """Выдает текст документа постранично, попутно записывая его в cache_file.
+
+    Файл пишется во временный .part и переименовывается только после
+    последней страницы, чтобы прерванное извлечение не оставило обрезанный
+    кэш, которому потом поверит парсер. Имя .part включает pid: две задачи,
+    одновременно извлекающие один и тот же документ, не пишут в один файл.
+    """
+    if cache_file is None:
+        yield from format_pages(iter_pdf_pages(pdf_path, workers))
+        return
+
+    part_file = f"{cache_file}.{os.getpid()}.part"
+    try:
+        with open(part_file, 'w', encoding='utf-8') as f:
+            for chunk in format_pages(iter_pdf_pages(pdf_path, workers)):
+                f.write(chunk)
+                yield chunk
+        os.replace(part_file, cache_file)
+    finally:
+        if os.path.exists(part_file):
+            os.remove(part_file)
+
+
+def iter_text_file(text_file: str, chunk_size: int = 1 << 20) -> Iterator[str]:
+    """Читает уже извлеченный текст порциями"""
+    with open(text_file, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
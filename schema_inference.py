@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+🧬 Вывод JSON Schema по примерам
+================================
+По примерам ответов и тел запросов строится JSON Schema, чтобы MCP
+клиенты могли проверять payloads, не выводя схему из примера заново.
+
+- Схема каждого уникального примера выводится один раз: результат
+  запоминается по id примера (payload_table.payload_id - хэш канонической
+  формы), повторные примеры берут готовую схему.
+- Схемы объектов интернируются по своей канонической форме: одинаковые
+  по структуре объекты (набор ключей и типы значений) разных примеров -
+  один и тот же объект схемы.
+- Структуры объектов, которые встречаются хотя бы в min_uses разных
+  примерах, выносятся в общие definitions() и подставляются ссылкой
+  {"$ref": "#/$defs/<Имя>"}. Корень схемы всегда остается объектом схемы
+  (MCP требует у outputSchema "type": "object").
+- MCP клиент берет схему tool отдельно от файла, поэтому ссылки должны
+  разрешаться внутри самой схемы: standalone_schema() кладет в "$defs"
+  корня схемы только нужные ей определения (schema_definitions()).
+
+    inferrer = SchemaInferrer()
+    schema_id = inferrer.infer(example)          # id примера
+    inferrer.schema(schema_id)                   # схема со ссылками на $defs
+    inferrer.definitions()                       # {"Payload": {...}, ...}
+    inferrer.standalone_schema(schema_id)        # схема с нужными ей $defs
+"""
+
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set
+
+from payload_table import canonical_json, payload_id
+
+# Ссылки на общие структуры (относительно документа с "$defs")
+DEFS_POINTER = "#/$defs/"
+
+# Минимальное число разных примеров, в которых должна встретиться
+# структура, чтобы попасть в $defs
+DEFAULT_MIN_USES = 2
+
+NAME_PART_RE = re.compile(r'[A-Za-z0-9]+')
+
+
+def json_type(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def _collect_refs(node: Any, definitions: Dict[str, Any], found: Dict[str, Any]):
+    """Определения, на которые ссылается node (включая ссылки из самих определений)"""
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith(DEFS_POINTER):
+            name = ref[len(DEFS_POINTER):].replace('~1', '/').replace('~0', '~')
+            if name not in found and name in definitions:
+                found[name] = definitions[name]
+                _collect_refs(definitions[name], definitions, found)
+        for value in node.values():
+            _collect_refs(value, definitions, found)
+    elif isinstance(node, list):
+        for value in node:
+            _collect_refs(value, definitions, found)
+
+
+def referenced_definitions(schema: Any, definitions: Dict[str, Any]) -> Dict[str, Any]:
+    """Часть definitions, нужная schema: имя -> определение"""
+    found: Dict[str, Any] = {}
+    _collect_refs(schema, definitions, found)
+    return found
+
+
+def self_contained_schema(schema: Dict[str, Any], definitions: Dict[str, Any]) -> Dict[str, Any]:
+    """Схема, в "$defs" корня которой есть все определения из definitions,
+    на которые она ссылается (уже лежащие там сохраняются)"""
+    found = referenced_definitions(schema, definitions)
+    if not found:
+        return schema
+    return {**schema, "$defs": {**schema.get("$defs", {}), **found}}
+
+
+def definition_name(hint: str) -> str:
+    """Имя определения из имени свойства: "vehicle_list" -> "VehicleList" """
+    name = ''.join(part[:1].upper() + part[1:] for part in NAME_PART_RE.findall(hint))
+    if not name or name[0].isdigit():
+        name = f"Schema{name}"
+    return name
+
+
+class SchemaInferrer:
+    def __init__(self, min_uses: int = DEFAULT_MIN_USES):
+        self.min_uses = min_uses
+
+        # id примера -> схема (без ссылок, объекты общие)
+        self.schemas: Dict[str, Dict[str, Any]] = {}
+        # Каноническая форма схемы объекта -> сама схема (интернирование)
+        self.shapes: Dict[str, Dict[str, Any]] = {}
+        # Ниже ключ - id объекта схемы из shapes (объекты живут, пока жив
+        # SchemaInferrer). Имя свойства, под которым структура встретилась впервые:
+        self.shape_hints: Dict[int, str] = {}
+        # В скольких разных примерах встретилась структура
+        self.shape_uses: Counter = Counter()
+
+        # Заполняются при первом обращении к schema()/definitions()
+        self._def_names: Optional[Dict[int, str]] = None
+        self._definitions: Optional[Dict[str, Dict[str, Any]]] = None
+        self._resolved: Dict[str, Dict[str, Any]] = {}
+        self._referenced: Dict[str, Dict[str, Any]] = {}
+
+        self.stats = {
+            "inferred": 0,
+            "memo_hits": 0
+        }
+
+    def infer(self, value: Any, value_id: Optional[str] = None, hint: str = "payload") -> str:
+        """Выводит (или берет готовую) схему примера; возвращает id примера.
+        value_id - уже посчитанный payload_id(value), hint - имя для $defs"""
+        if value_id is None:
+            value_id = payload_id(value)
+        if value_id in self.schemas:
+            self.stats["memo_hits"] += 1
+            return value_id
+
+        self.stats["inferred"] += 1
+        schema = self.schemas[value_id] = self._infer(value, hint)
+        # Структуры, на которые ссылается итоговая схема (промежуточные
+        # результаты слияния элементов массива не считаются). Корень всегда
+        # остается на месте, поэтому сам по себе в $defs не выносится.
+        shapes: Dict[int, Dict[str, Any]] = {}
+        self._collect(schema, shapes)
+        shapes.pop(id(schema), None)
+        self.shape_uses.update(shapes.keys())
+        # Новые структуры меняют набор $defs
+        self._def_names = None
+        self._definitions = None
+        self._resolved.clear()
+        self._referenced.clear()
+        return value_id
+
+    def schema(self, value_id: str) -> Dict[str, Any]:
+        """Схема примера, в которой общие структуры заменены ссылками на $defs"""
+        resolved = self._resolved.get(value_id)
+        if resolved is None:
+            resolved = self._resolve(self.schemas[value_id], root=True)
+            self._resolved[value_id] = resolved
+        return resolved
+
+    def definitions(self) -> Dict[str, Dict[str, Any]]:
+        """Общие структуры для "$defs" (в порядке первого появления)"""
+        if self._definitions is None:
+            names = self._definition_names()
+            self._definitions = {
+                names[id(shape)]: self._resolve(shape, root=True)
+                for shape in self.shapes.values() if id(shape) in names
+            }
+        return self._definitions
+
+    def schema_definitions(self, value_id: str) -> Dict[str, Dict[str, Any]]:
+        """Определения $defs, на которые ссылается схема примера"""
+        referenced = self._referenced.get(value_id)
+        if referenced is None:
+            referenced = referenced_definitions(self.schema(value_id), self.definitions())
+            self._referenced[value_id] = referenced
+        return referenced
+
+    def standalone_schema(self, value_id: str) -> Dict[str, Any]:
+        """Схема примера с нужными ей определениями в "$defs" корня"""
+        schema = self.schema(value_id)
+        referenced = self.schema_definitions(value_id)
+        return {**schema, "$defs": referenced} if referenced else schema
+
+    def _infer(self, value: Any, hint: str) -> Dict[str, Any]:
+        if isinstance(value, dict):
+            schema = {
+                "type": "object",
+                "properties": {key: self._infer(item, key) for key, item in value.items()},
+                "required": list(value)
+            }
+            return self._intern(schema, hint)
+        if isinstance(value, list):
+            schema = {"type": "array"}
+            items = None
+            for item in value:
+                item_schema = self._infer(item, f"{hint}_item")
+                items = item_schema if items is None else self._merge(items, item_schema, f"{hint}_item")
+            if items is not None:
+                schema["items"] = items
+            return schema
+        return {"type": json_type(value)}
+
+    def _intern(self, schema: Dict[str, Any], hint: str) -> Dict[str, Any]:
+        """Одинаковые структуры объектов - один объект схемы"""
+        key = canonical_json(schema)
+        interned = self.shapes.get(key)
+        if interned is None:
+            interned = self.shapes[key] = schema
+            self.shape_hints[id(schema)] = hint
+        return interned
+
+    def _collect(self, schema: Dict[str, Any], shapes: Dict[int, Dict[str, Any]]):
+        """Непустые структуры объектов внутри schema (по id объекта схемы)"""
+        if schema.get("properties"):
+            if id(schema) in shapes:
+                return
+            shapes[id(schema)] = schema
+            for item in schema["properties"].values():
+                self._collect(item, shapes)
+        elif "items" in schema:
+            self._collect(schema["items"], shapes)
+        elif "anyOf" in schema:
+            for item in schema["anyOf"]:
+                self._collect(item, shapes)
+
+    def _merge(self, a: Dict[str, Any], b: Dict[str, Any], hint: str) -> Dict[str, Any]:
+        """Схема, которой соответствуют значения обеих схем (элементы массива)"""
+        if a is b or a == b:
+            return a
+        if a.get("type") == "object" and b.get("type") == "object" and "properties" in a and "properties" in b:
+            properties = dict(a["properties"])
+            for key, schema in b["properties"].items():
+                properties[key] = (self._merge(properties[key], schema, key)
+                                   if key in properties else schema)
+            required = [key for key in a["required"] if key in b["required"]]
+            return self._intern({"type": "object", "properties": properties, "required": required}, hint)
+        if a.get("type") == "array" and b.get("type") == "array":
+            if "items" in a and "items" in b:
+                return {"type": "array", "items": self._merge(a["items"], b["items"], f"{hint}_item")}
+            return a if "items" in a else b
+        if set(a) == {"type"} and set(b) == {"type"}:
+            types = []
+            for schema in (a, b):
+                for schema_type in schema["type"] if isinstance(schema["type"], list) else [schema["type"]]:
+                    if schema_type not in types:
+                        types.append(schema_type)
+            if "integer" in types and "number" in types:
+                types.remove("integer")
+            return {"type": types[0] if len(types) == 1 else types}
+
+        variants: List[Dict[str, Any]] = list(a["anyOf"]) if set(a) == {"anyOf"} else [a]
+        for schema in b["anyOf"] if set(b) == {"anyOf"} else [b]:
+            if schema not in variants:
+                variants.append(schema)
+        return {"anyOf": variants}
+
+    def _definition_names(self) -> Dict[int, str]:
+        """id(объекта схемы) -> имя в $defs для общих структур"""
+        if self._def_names is None:
+            self._def_names = {}
+            taken: Set[str] = set()
+            for shape in self.shapes.values():
+                if self.shape_uses[id(shape)] < self.min_uses:
+                    continue
+                base = definition_name(self.shape_hints[id(shape)])
+                name, n = base, 1
+                while name in taken:
+                    n += 1
+                    name = f"{base}{n}"
+                taken.add(name)
+                self._def_names[id(shape)] = name
+        return self._def_names
+
+    def _resolve(self, schema: Dict[str, Any], root: bool = False) -> Dict[str, Any]:
+        names = self._definition_names()
+        if not root and id(schema) in names:
+            return {"$ref": DEFS_POINTER + names[id(schema)]}
+        if "properties" in schema:
+            return {**schema, "properties": {key: self._resolve(item) for key, item in schema["properties"].items()}}
+        if "items" in schema:
+            return {**schema, "items": self._resolve(schema["items"])}
+        if "anyOf" in schema:
+            return {"anyOf": [self._resolve(item) for item in schema["anyOf"]]}
+        return schema
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+🧠 Текст документа в общей памяти
+=================================
+Процессы пула не должны получать многомегабайтный текст документа через
+pickle - ни целиком, ни по секциям. SharedText один раз кладет текст в
+UTF-8 в блок multiprocessing.shared_memory; процессы подключаются к нему
+по имени (attach) без копирования всего документа и работают со
+смещениями: в задачу уходит только (byte_start, byte_end), а строка
+декодируется лишь для нужного фрагмента.
+
+Смещения парсера - позиции символов str, в общей памяти - байты UTF-8.
+Владелец текста переводит одни в другие через byte_offset(): для
+ASCII-текста они совпадают, иначе используется таблица смещений каждого
+CHECKPOINT_CHARS-го символа (один проход по тексту при публикации).
+
+    with SharedText(text) as shared:
+        handle = shared.handle()                 # уходит в процесс пула
+        ...
+        view = attach(handle)                    # в процессе пула
+        section = view.slice(byte_start, byte_end)
+"""
+
+from array import array
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+# Шаг таблицы символ -> байт для не-ASCII текста
+CHECKPOINT_CHARS = 4096
+
+
+class SharedTextHandle(NamedTuple):
+    """То, что передается в процессы: имя блока и длина текста в байтах"""
+    name: str
+    size: int
+
+
+class SharedText:
+    def __init__(self, text: str, checkpoint: int = CHECKPOINT_CHARS):
+        """Публикует text в новом блоке общей памяти (владелец блока)"""
+        data = text.encode('utf-8')
+        self.text = text
+        self.size = len(data)
+        self.checkpoint = checkpoint
+        self.is_ascii = self.size == len(text)
+
+        # Блок нулевого размера создать нельзя
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, self.size))
+        self._shm.buf[:self.size] = data
+        del data
+
+        # Байтовое смещение каждого checkpoint-го символа
+        self._byte_checkpoints = array('q')
+        if not self.is_ascii:
+            position = 0
+            for start in range(0, len(text), checkpoint):
+                self._byte_checkpoints.append(position)
+                position += len(text[start:start + checkpoint].encode('utf-8'))
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def handle(self) -> SharedTextHandle:
+        return SharedTextHandle(self._shm.name, self.size)
+
+    def byte_offset(self, char_offset: int) -> int:
+        """Позиция символа в str -> позиция в байтах UTF-8"""
+        if self.is_ascii:
+            return char_offset
+        if char_offset >= len(self.text):
+            return self.size
+        block = char_offset // self.checkpoint
+        block_start = block * self.checkpoint
+        return (self._byte_checkpoints[block]
+                + len(self.text[block_start:char_offset].encode('utf-8')))
+
+    def byte_range(self, start: int, end: int):
+        return self.byte_offset(start), self.byte_offset(end)
+
+    def close(self):
+        """Освобождает блок; подключенные процессы сохраняют свое отображение"""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> 'SharedText':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SharedTextView:
+    def __init__(self, handle: SharedTextHandle):
+        """Подключение к блоку SharedText в другом процессе (только чтение)"""
+        self.handle = handle
+        try:
+            # Python 3.13+: блоком владеет создатель, не регистрируем его здесь
+            self._shm = shared_memory.SharedMemory(name=handle.name, track=False)
+        except TypeError:
+            self._shm = shared_memory.SharedMemory(name=handle.name)
+
+    def slice(self, byte_start: int, byte_end: int) -> str:
+        """Фрагмент текста по байтовым смещениям"""
+        return str(self._shm.buf[byte_start:byte_end], 'utf-8')
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+
+def attach(handle: SharedTextHandle) -> SharedTextView:
+    return SharedTextView(handle)
@@ -11,6 +11,79 @@ from typing import Dict, List, Any
 from datetime import datetime
 import os
 
+from patterns import REGISTRY
+
+# 🧩 Паттерны компилируются один раз при импорте (общий реестр patterns.py)
+
+# Паттерны для поиска
+ENDPOINT_PATTERN = REGISTRY.compile('smart.endpoint', r'(GET|POST|PUT|DELETE|PATCH)\s+(/api/v\d+/[\w/\{\}:-]+)')
+
+# Паттерны для моделей
+MODEL_PATTERNS = REGISTRY.compile_all('smart.model', [
+    r'(?:Model|Schema|Type|Interface|Entity):\s*(\w+)',
+    r'```(?:json|typescript|javascript)\n(\{[^`]+\})\n```',
+    r'"(\w+)":\s*\{[^}]+\}',
+], re.MULTILINE | re.DOTALL)
+MODEL_JSON_RE = REGISTRY.compile('smart.model_json', r'\{.*\}', re.DOTALL)
+
+# Паттерны для параметров
+PARAM_SECTION_RE = REGISTRY.compile(
+    'smart.param_section',
+    r'(?:Parameters?|Query Parameters?|Path Parameters?|Body Parameters?)[:\s]*\n((?:[-•*]\s*.+\n?)+)',
+    re.IGNORECASE | re.MULTILINE
+)
+PARAM_ITEM_RE = REGISTRY.compile('smart.param_item', r'[-•*]\s*`?(\w+)`?\s*[:\-–]\s*(.+?)(?:\n|$)')
+
+CODE_BLOCK_RE = REGISTRY.compile(
+    'smart.code_block',
+    r'(?:Example|Sample|Usage)[:\s]*\n```(\w*)\n(.*?)\n```',
+    re.IGNORECASE | re.DOTALL
+)
+CURL_RE = REGISTRY.compile('smart.curl', r'curl\s+.*?(?:\n\n|$)', re.DOTALL)
+
+# Паттерны для ошибок
+ERROR_SECTION_RE = REGISTRY.compile(
+    'smart.error_section',
+    r'(?:Error Codes?|HTTP Status|Status Codes?)[:\s]*\n((?:[-•*]\s*.+\n?)+)',
+    re.IGNORECASE | re.MULTILINE
+)
+ERROR_CODE_RE = REGISTRY.compile('smart.error_code', r'\b([4-5]\d{2})\b\s*[:\-–]\s*(.+?)(?:\n|$)')
+
+AUTH_SECTION_RE = REGISTRY.compile(
+    'smart.auth_section',
+    r'(?:Authentication|Authorization|Security|API Key|Token)[:\s]*(.+?)(?:\n\n|$)',
+    re.IGNORECASE | re.DOTALL
+)
+
+WEBHOOK_PATTERNS = REGISTRY.compile_all('smart.webhook', [
+    r'(?:Webhook|Event|Notification)[:\s]*`?(\w+)`?',
+    r'(?:event_type|eventType)["\']:\s*["\'](\w+)["\']'
+])
+
+# Паттерны для правил
+RULE_PATTERNS = REGISTRY.compile_all('smart.rule', [
+    r'(?:Rule|Requirement|Constraint|Limitation|Note|Important)[:\s]*(.+?)(?:\n|$)',
+    r'(?:must|should|cannot|limited to|maximum|minimum)\s+(.+?)(?:\.|$)'
+], re.IGNORECASE)
+
+# Ищем последовательности вызовов
+WORKFLOW_PATTERNS = REGISTRY.compile_all('smart.workflow', [
+    r'(?:Workflow|Process|Steps?|Scenario)[:\s]*\n((?:\d+\..*\n)+)',
+    r'(?:First|Then|Finally|After that)[,\s]+(.+?)(?:\.|$)'
+], re.MULTILINE)
+
+DESCRIPTION_RE = REGISTRY.compile(
+    'smart.description', r'(?:Description|Summary)[:\s]*(.+?)(?:\n\n|Parameters?|Example|$)',
+    re.IGNORECASE | re.DOTALL
+)
+SENTENCE_SPLIT_RE = REGISTRY.compile('smart.sentence_split', r'[.!?]\s+')
+FIRST_SENTENCE_RE = REGISTRY.compile('smart.first_sentence', r'^[^.!?]+[.!?]')
+LIST_ITEM_RE = REGISTRY.compile('smart.list_item', r'[-•]\s*`?\w+`?')
+NESTED_OBJECT_RE = REGISTRY.compile('smart.nested_object', r'\{[^}]*\{')
+API_VERSION_RE = REGISTRY.compile('smart.api_version', r'/v(\d+)/')
+BASE_URL_RE = REGISTRY.compile('smart.base_url', r'https?://[^\s]+/api')
+
+
 class SmartKnowledgeExtractor:
     def __init__(self, text_file='extracted_text.txt'):
         self.text_file = text_file
@@ -53,11 +126,8 @@ class SmartKnowledgeExtractor:
         """1. Извлекаем все API endpoints"""
         print("📍 Извлекаем Endpoints...")
         
-        # Паттерны для поиска
-        endpoint_pattern = r'(GET|POST|PUT|DELETE|PATCH)\s+(/api/v\d+/[\w/\{\}:-]+)'
-        
         # Ищем все endpoints
-        for match in re.finditer(endpoint_pattern, self.text):
+        for match in ENDPOINT_PATTERN.finditer(self.text):
             method = match.group(1)
             path = match.group(2)
             
@@ -91,20 +161,13 @@ class SmartKnowledgeExtractor:
         """2. Извлекаем модели данных и схемы"""
         print("📊 Извлекаем Models & Schemas...")
         
-        # Паттерны для моделей
-        patterns = [
-            r'(?:Model|Schema|Type|Interface|Entity):\s*(\w+)',
-            r'```(?:json|typescript|javascript)\n(\{[^`]+\})\n```',
-            r'"(\w+)":\s*\{[^}]+\}',
-        ]
-        
-        for pattern in patterns:
-            for match in re.finditer(pattern, self.text, re.MULTILINE | re.DOTALL):
+        for pattern in MODEL_PATTERNS:
+            for match in pattern.finditer(self.text):
                 # Анализируем найденную структуру
                 if '{' in match.group(0):
                     try:
                         # Пытаемся распарсить как JSON
-                        json_str = re.search(r'\{.*\}', match.group(0), re.DOTALL).group()
+                        json_str = MODEL_JSON_RE.search(match.group(0)).group()
                         model_data = {
                             'model_name': self.extract_model_name(match.group(0)),
                             'structure': json_str,
@@ -123,14 +186,10 @@ class SmartKnowledgeExtractor:
         """3. Извлекаем все параметры детально"""
         print("🔧 Извлекаем Parameters...")
         
-        # Паттерны для параметров
-        param_sections = re.findall(
-            r'(?:Parameters?|Query Parameters?|Path Parameters?|Body Parameters?)[:\s]*\n((?:[-•*]\s*.+\n?)+)',
-            self.text, re.IGNORECASE | re.MULTILINE
-        )
+        param_sections = PARAM_SECTION_RE.findall(self.text)
         
         for section in param_sections:
-            params = re.findall(r'[-•*]\s*`?(\w+)`?\s*[:\-–]\s*(.+?)(?:\n|$)', section)
+            params = PARAM_ITEM_RE.findall(section)
             for param_name, param_desc in params:
                 param_data = {
                     'name': param_name,
@@ -151,10 +210,7 @@ class SmartKnowledgeExtractor:
         print("💻 Извлекаем Examples...")
         
         # Ищем все блоки кода
-        code_blocks = re.findall(
-            r'(?:Example|Sample|Usage)[:\s]*\n```(\w*)\n(.*?)\n```',
-            self.text, re.IGNORECASE | re.DOTALL
-        )
+        code_blocks = CODE_BLOCK_RE.findall(self.text)
         
         for language, code in code_blocks:
             example_data = {
@@ -169,7 +225,7 @@ class SmartKnowledgeExtractor:
             self.knowledge_bases['examples'].append(example_data)
         
         # Также ищем CURL примеры
-        curl_examples = re.findall(r'curl\s+.*?(?:\n\n|$)', self.text, re.DOTALL)
+        curl_examples = CURL_RE.findall(self.text)
         for curl in curl_examples:
             self.knowledge_bases['examples'].append({
                 'type': 'curl',
@@ -184,14 +240,10 @@ class SmartKnowledgeExtractor:
         """5. Извлекаем коды ошибок и их решения"""
         print("❌ Извлекаем Error Codes...")
         
-        # Паттерны для ошибок
-        error_sections = re.findall(
-            r'(?:Error Codes?|HTTP Status|Status Codes?)[:\s]*\n((?:[-•*]\s*.+\n?)+)',
-            self.text, re.IGNORECASE | re.MULTILINE
-        )
+        error_sections = ERROR_SECTION_RE.findall(self.text)
         
         # Также ищем отдельные упоминания кодов
-        error_codes = re.findall(r'\b([4-5]\d{2})\b\s*[:\-–]\s*(.+?)(?:\n|$)', self.text)
+        error_codes = ERROR_CODE_RE.findall(self.text)
         
         for code, description in error_codes:
             error_data = {
@@ -210,10 +262,7 @@ class SmartKnowledgeExtractor:
         """6. Извлекаем методы авторизации"""
         print("🔐 Извлекаем Authentication...")
         
-        auth_sections = re.findall(
-            r'(?:Authentication|Authorization|Security|API Key|Token)[:\s]*(.+?)(?:\n\n|$)',
-            self.text, re.IGNORECASE | re.DOTALL
-        )
+        auth_sections = AUTH_SECTION_RE.findall(self.text)
         
         for section in auth_sections:
             auth_data = {
@@ -233,13 +282,8 @@ class SmartKnowledgeExtractor:
         """7. Извлекаем webhooks и события"""
         print("🪝 Извлекаем Webhooks...")
         
-        webhook_patterns = [
-            r'(?:Webhook|Event|Notification)[:\s]*`?(\w+)`?',
-            r'(?:event_type|eventType)["\']:\s*["\'](\w+)["\']'
-        ]
-        
-        for pattern in webhook_patterns:
-            for match in re.finditer(pattern, self.text):
+        for pattern in WEBHOOK_PATTERNS:
+            for match in pattern.finditer(self.text):
                 event_name = match.group(1)
                 context = self.text[max(0, match.start()-300):min(len(self.text), match.end()+300)]
                 
@@ -258,14 +302,8 @@ class SmartKnowledgeExtractor:
         """8. Извлекаем бизнес-правила и ограничения"""
         print("📋 Извлекаем Business Rules...")
         
-        # Паттерны для правил
-        rule_patterns = [
-            r'(?:Rule|Requirement|Constraint|Limitation|Note|Important)[:\s]*(.+?)(?:\n|$)',
-            r'(?:must|should|cannot|limited to|maximum|minimum)\s+(.+?)(?:\.|$)'
-        ]
-        
-        for pattern in rule_patterns:
-            for match in re.finditer(pattern, self.text, re.IGNORECASE):
+        for pattern in RULE_PATTERNS:
+            for match in pattern.finditer(self.text):
                 rule = match.group(1).strip()
                 if len(rule) > 20 and len(rule) < 500:
                     rule_data = {
@@ -282,14 +320,8 @@ class SmartKnowledgeExtractor:
         """9. Извлекаем типичные сценарии использования"""
         print("🔄 Извлекаем Workflows...")
         
-        # Ищем последовательности вызовов
-        workflow_patterns = [
-            r'(?:Workflow|Process|Steps?|Scenario)[:\s]*\n((?:\d+\..*\n)+)',
-            r'(?:First|Then|Finally|After that)[,\s]+(.+?)(?:\.|$)'
-        ]
-        
-        for pattern in workflow_patterns:
-            for match in re.finditer(pattern, self.text, re.MULTILINE):
+        for pattern in WORKFLOW_PATTERNS:
+            for match in pattern.finditer(self.text):
                 workflow_data = {
                     'workflow': match.group(0),
                     'steps': self.parse_workflow_steps(match.group(0)),
@@ -324,13 +356,12 @@ class SmartKnowledgeExtractor:
     
     def extract_description(self, context):
         """Извлекаем описание из контекста"""
-        desc_pattern = r'(?:Description|Summary)[:\s]*(.+?)(?:\n\n|Parameters?|Example|$)'
-        match = re.search(desc_pattern, context, re.IGNORECASE | re.DOTALL)
+        match = DESCRIPTION_RE.search(context)
         if match:
             return match.group(1).strip()[:500]
         
         # Берем первое предложение после endpoint
-        sentences = re.split(r'[.!?]\s+', context)
+        sentences = SENTENCE_SPLIT_RE.split(context)
         if sentences:
             return sentences[0].strip()[:500]
         return ""
@@ -338,7 +369,7 @@ class SmartKnowledgeExtractor:
     def extract_summary(self, context):
         """Извлекаем краткое описание"""
         # Берем первое предложение
-        first_sentence = re.search(r'^[^.!?]+[.!?]', context.strip())
+        first_sentence = FIRST_SENTENCE_RE.search(context.strip())
         if first_sentence:
             return first_sentence.group(0).strip()
         return ""
@@ -358,8 +389,8 @@ class SmartKnowledgeExtractor:
     def assess_complexity(self, context):
         """Оцениваем сложность endpoint"""
         # Простая эвристика: количество параметров и вложенность
-        param_count = len(re.findall(r'[-•]\s*`?\w+`?', context))
-        nested_objects = len(re.findall(r'\{[^}]*\{', context))
+        param_count = len(LIST_ITEM_RE.findall(context))
+        nested_objects = len(NESTED_OBJECT_RE.findall(context))
         
         if param_count < 3 and nested_objects == 0:
             return 'simple'
@@ -416,14 +447,14 @@ class SmartKnowledgeExtractor:
     
     def extract_api_version(self):
         """Извлекаем версию API"""
-        version_match = re.search(r'/v(\d+)/', self.text)
+        version_match = API_VERSION_RE.search(self.text)
         if version_match:
             return f"v{version_match.group(1)}"
         return "v1"
     
     def extract_base_url(self):
         """Извлекаем базовый URL"""
-        url_match = re.search(r'https?://[^\s]+/api', self.text)
+        url_match = BASE_URL_RE.search(self.text)
         if url_match:
             return url_match.group(0)
         return "https://api.fleethand.com"
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+🔭 Ленивые окна контекста
+=========================
+Экстракторы баз знаний берут для каждого совпадения окно контекста в
+1-3 КБ вокруг него. TextSpan хранит только (start, end) в общем тексте
+документа и отдает подстроку, лишь когда она действительно нужна
+(str(span)); поиск регулярными выражениями и проверки вхождения идут
+прямо по тексту документа через pos/endpos без копирования.
+
+В записи баз знаний вместо скопированного текста попадают смещения
+(span.as_offsets()), по которым контекст читается из файла текста.
+
+    source = TextSource(text)
+    context = source.around(match.start(), match.end(), before=1000, after=2000)
+    context.search(PATTERN)            # как PATTERN.search(str(context))
+    context.contains_lower('deprecated')
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List
+
+
+@lru_cache(maxsize=None)
+def _ignore_case(needle: str):
+    return re.compile(re.escape(needle), re.IGNORECASE)
+
+
+class TextSource:
+    def __init__(self, text: str):
+        self.text = text
+
+    def __len__(self):
+        return len(self.text)
+
+    def span(self, start: int, end: int) -> 'TextSpan':
+        start = max(0, start)
+        end = min(len(self.text), end)
+        return TextSpan(self, start, max(start, end))
+
+    def around(self, start: int, end: int, before: int = 0, after: int = 0) -> 'TextSpan':
+        """Окно [start - before, end + after), обрезанное границами текста"""
+        return self.span(start - before, end + after)
+
+
+class TextSpan:
+    __slots__ = ('source', 'start', 'end')
+
+    def __init__(self, source: TextSource, start: int, end: int):
+        self.source = source
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __str__(self):
+        return self.source.text[self.start:self.end]
+
+    def __repr__(self):
+        return f"TextSpan({self.start}, {self.end})"
+
+    def head(self, length: int) -> 'TextSpan':
+        """Первые length символов окна (как str(span)[:length])"""
+        return TextSpan(self.source, self.start, min(self.end, self.start + length))
+
+    def contains(self, needle: str) -> bool:
+        return self.source.text.find(needle, self.start, self.end) != -1
+
+    def contains_lower(self, needle: str) -> bool:
+        """needle in str(span).lower(); needle - ASCII в нижнем регистре.
+
+        Поиск без учета регистра находит все такие вхождения (и, для
+        редких символов вроде "ſ", лишние): окно копируется, только если
+        найденное совпадение не подтверждается его lower().
+        """
+        match = _ignore_case(needle).search(self.source.text, self.start, self.end)
+        if match is None:
+            return False
+        if match.group().lower() == needle:
+            return True
+        return needle in str(self).lower()
+
+    # Поиск по тексту документа в пределах окна. Совпадает с поиском по
+    # str(span) для паттернов без ^, \b и lookbehind на левой границе окна
+    # (они видят символы перед start).
+
+    def search(self, pattern):
+        return pattern.search(self.source.text, self.start, self.end)
+
+    def findall(self, pattern) -> List[Any]:
+        return pattern.findall(self.source.text, self.start, self.end)
+
+    def finditer(self, pattern) -> Iterator:
+        return pattern.finditer(self.source.text, self.start, self.end)
+
+    def as_offsets(self) -> Dict[str, int]:
+        return {'start': self.start, 'end': self.end}
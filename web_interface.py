@@ -7,6 +7,7 @@
 
 Features:
 - Drag & Drop загрузка PDF
+- Фоновая очередь задач: парсинг не держит HTTP запрос (статус в /jobs/<id>)
 - Прогресс обработки в реальном времени
 - Интерактивное отображение результатов
 - Экспорт в различных форматах
@@ -15,15 +16,18 @@ Features:
 import os
 import json
 import tempfile
-import subprocess
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List
 
-from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, send_file, flash, redirect, url_for, stream_with_context
 from werkzeug.utils import secure_filename
 from werkzeug.datastructures import FileStorage
 
+from job_queue import JobQueue
+from parser_worker import init_worker, parse_pdf
+
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this-in-production'
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
@@ -33,10 +37,18 @@ UPLOAD_FOLDER = 'uploads'
 RESULTS_FOLDER = 'results'
 ALLOWED_EXTENSIONS = {'pdf'}
 
+# Процессов для парсинга. Каждая задача работает в своем временном каталоге,
+# поэтому задачи независимы и пропускная способность растет с числом процессов
+PARSER_WORKERS = int(os.environ.get('PARSER_WORKERS', str(os.cpu_count() or 1)))
+
 # Создаем необходимые папки
 for folder in [UPLOAD_FOLDER, RESULTS_FOLDER]:
     Path(folder).mkdir(exist_ok=True)
 
+# Очередь создается при первой задаче (не в процессе-наблюдателе reloader'а)
+job_queue = None
+job_queue_lock = threading.Lock()
+
 def allowed_file(filename: str) -> bool:
     """Проверка допустимости файла"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -50,73 +62,48 @@ def get_file_size(file_path: str) -> str:
         size /= 1024.0
     return f"{size:.1f} TB"
 
-def run_parser(pdf_path: str) -> Dict[str, Any]:
-    """Запуск парсера и получение результатов"""
-    try:
-        # Копируем PDF в рабочую директорию как documentation.pdf
-        import shutil
-        import os
-        shutil.copy2(pdf_path, 'documentation.pdf')
-        
-        # Удаляем кэшированные файлы для корректной обработки нового PDF
-        cache_files = ['extracted_text.txt', 'ultimate_final_data/']
-        for cache_file in cache_files:
-            if os.path.exists(cache_file):
-                if os.path.isfile(cache_file):
-                    os.remove(cache_file)
-                elif os.path.isdir(cache_file):
-                    shutil.rmtree(cache_file)
-        
-        # Запускаем парсер
-        result = subprocess.run(
-            ['python3', 'fleethand_ultimate_parser.py'],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 минут таймаут
-        )
-        
-        if result.returncode == 0:
-            # Читаем результаты
-            results_dir = Path('ultimate_final_data')
-            if results_dir.exists():
-                results = {}
-                
-                # Читаем все JSON файлы из результатов
-                for json_file in results_dir.glob('*.json'):
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        results[json_file.stem] = json.load(f)
-                
-                return {
-                    'success': True,
-                    'results': results,
-                    'stdout': result.stdout,
-                    'stderr': result.stderr
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': 'Результаты не найдены',
-                    'stdout': result.stdout,
-                    'stderr': result.stderr
-                }
-        else:
-            return {
-                'success': False,
-                'error': f'Ошибка парсера (код: {result.returncode})',
-                'stdout': result.stdout,
-                'stderr': result.stderr
-            }
-            
-    except subprocess.TimeoutExpired:
-        return {
-            'success': False,
-            'error': 'Тайм-аут обработки (превышено 5 минут)'
-        }
-    except Exception as e:
-        return {
-            'success': False,
-            'error': f'Неожиданная ошибка: {str(e)}'
-        }
+def run_parser(pdf_path: str, progress=None) -> Dict[str, Any]:
+    """Запуск парсера и получение результатов
+    
+    Выполняется в прогретом процессе пула (см. parser_worker): парсер и
+    PyMuPDF уже загружены, результаты возвращаются напрямую, без файлов.
+    Каждая задача работает в собственном временном каталоге, поэтому
+    задачи выполняются параллельно. События прогресса парсера уходят
+    в progress (его передает JobQueue).
+    """
+    return parse_pdf(pdf_path, progress=progress)
+
+def results_file_name(filename: str) -> str:
+    """Имя файла с результатами для загруженного PDF"""
+    return f"{filename}_results.json"
+
+def save_job_results(job: Dict[str, Any]):
+    """Сохраняет результаты успешной задачи для скачивания"""
+    if job['status'] != 'done':
+        return
+    results_file = os.path.join(RESULTS_FOLDER, results_file_name(job['filename']))
+    with open(results_file, 'w', encoding='utf-8') as f:
+        json.dump(job['result'], f, ensure_ascii=False, indent=2)
+
+def get_job_queue() -> JobQueue:
+    """Очередь задач парсинга
+    
+    Первые запросы приходят параллельно (threaded сервер): без блокировки
+    каждый из них создал бы свою очередь со своим пулом процессов.
+    """
+    global job_queue
+    with job_queue_lock:
+        if job_queue is None:
+            job_queue = JobQueue(run_parser, max_workers=PARSER_WORKERS, on_done=save_job_results,
+                                 initializer=init_worker)
+        return job_queue
+
+def get_job_stats() -> Dict[str, int]:
+    """Статистика задач; пул процессов ради нее не создается"""
+    queue = job_queue
+    if queue is None:
+        return {'queued': 0, 'running': 0, 'done': 0, 'failed': 0}
+    return queue.stats()
 
 @app.route('/')
 def index():
@@ -163,36 +150,88 @@ def upload_file():
 
 @app.route('/process/<filename>')
 def process_file(filename: str):
-    """Обработка загруженного файла"""
+    """Постановка загруженного файла в очередь на обработку"""
+    filename = secure_filename(filename)
     file_path = os.path.join(UPLOAD_FOLDER, filename)
     
     if not os.path.exists(file_path):
         return jsonify({'success': False, 'error': 'Файл не найден'})
     
-    # Запускаем парсинг
-    results = run_parser(file_path)
+    # Парсинг выполняется в пуле процессов, запрос возвращается сразу
+    job_id = get_job_queue().submit(file_path, filename=filename)
     
-    if results['success']:
-        # Сохраняем результаты
-        results_file = os.path.join(RESULTS_FOLDER, f"{filename}_results.json")
-        with open(results_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
-        
-        return jsonify({
-            'success': True,
+    return jsonify({
+        'success': True,
+        'message': 'Файл поставлен в очередь на обработку',
+        'job_id': job_id,
+        'status_url': url_for('job_status', job_id=job_id),
+        'events_url': url_for('job_events', job_id=job_id)
+    }), 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id: str):
+    """Статус задачи парсинга и ее результаты"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Задача не найдена'}), 404
+    
+    response = {
+        'success': job['status'] != 'failed',
+        'job_id': job['id'],
+        'status': job['status'],
+        'filename': job['filename'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at']
+    }
+    
+    if job['status'] == 'done':
+        response.update({
             'message': 'Обработка завершена успешно!',
-            'results': results['results'],
-            'download_url': url_for('download_results', filename=f"{filename}_results.json")
+            'results': job['result']['results'],
+            'download_url': url_for('download_results', filename=results_file_name(job['filename']))
         })
-    else:
-        return jsonify({
-            'success': False,
-            'error': results.get('error', 'Неизвестная ошибка'),
+    elif job['status'] == 'failed':
+        result = job['result'] or {}
+        response.update({
+            'error': job['error'],
             'details': {
-                'stdout': results.get('stdout', ''),
-                'stderr': results.get('stderr', '')
+                'stdout': result.get('stdout', ''),
+                'stderr': result.get('stderr', '')
             }
         })
+    
+    return jsonify(response)
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id: str):
+    """Поток событий прогресса задачи (Server-Sent Events)
+    
+    Каждое событие парсера отправляется как "event: progress" с JSON в data,
+    финальное - как "event: done" или "event: failed", после чего поток
+    закрывается. Переподключившийся клиент продолжает с Last-Event-ID.
+    """
+    queue = get_job_queue()
+    if queue.get(job_id) is None:
+        return jsonify({'success': False, 'error': 'Задача не найдена'}), 404
+    
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    start = int(last_event_id) + 1 if last_event_id.isdigit() else 0
+    
+    def stream():
+        for item in queue.iter_events(job_id, start=start):
+            if item is None:
+                yield ': keepalive\n\n'
+                continue
+            number, event = item
+            kind = event['stage'] if event['stage'] in ('done', 'failed') else 'progress'
+            yield f"id: {number}\nevent: {kind}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/download/<filename>')
 def download_results(filename: str):
@@ -214,8 +253,11 @@ def api_status():
             'PDF parsing',
             'MCP server generation', 
             'Quality reporting',
-            'Multi-format export'
+            'Multi-format export',
+            'Background job queue'
         ],
+        'parser_workers': PARSER_WORKERS,
+        'jobs': get_job_stats(),
         'supported_formats': ['PDF'],
         'max_file_size': '50MB'
     })
@@ -236,4 +278,9 @@ if __name__ == '__main__':
     print("📊 Results folder:", RESULTS_FOLDER)
     print("🌐 Откройте: http://localhost:5000")
     
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        # Процесс приложения (не наблюдатель reloader'а): процессы-обработчики
+        # загружают парсер до первой загрузки PDF
+        get_job_queue().warm_up()
+    
     app.run(debug=True, host='0.0.0.0', port=9000)
\ No newline at end of file
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+📇 Позиционный индекс слов документа
+====================================
+Строится одним проходом по тексту: для каждого слова (\\w+ в нижнем
+регистре) хранятся позиции его вхождений, а для всего текста - позиции
+концов "предложений" (точка или перевод строки).
+
+Запрос по термину стоит O(число вхождений), а не O(размер документа),
+поэтому глоссарий не дорожает с ростом числа терминов.
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+WORD_RE = re.compile(r'\w+')
+SEGMENT_END_RE = re.compile(r'[.\n]')
+
+
+def iter_words(text: str) -> Iterable[str]:
+    """Слова текста в нижнем регистре (та же разбивка, что и в индексе)"""
+    return (match.group().lower() for match in WORD_RE.finditer(text))
+
+
+class WordIndex:
+    def __init__(self, text: str):
+        self.text = text
+        self.positions: Dict[str, List[int]] = defaultdict(list)
+        for match in WORD_RE.finditer(text):
+            self.positions[match.group().lower()].append(match.start())
+        self.segment_ends = array('q', (match.start() for match in SEGMENT_END_RE.finditer(text)))
+        self._vocabulary = None
+
+    def occurrences(self, word: str) -> List[int]:
+        """Позиции вхождений слова целиком (без учета регистра)"""
+        return self.positions.get(word.lower(), [])
+
+    def contains_substring(self, fragment: str) -> bool:
+        """Есть ли fragment внутри какого-либо слова документа.
+
+        Для фрагментов из букв равносильно fragment in text.lower(), но
+        проверяется по словарю, а не по всему тексту.
+        """
+        if self._vocabulary is None:
+            self._vocabulary = '\n'.join(self.positions)
+        return fragment.lower() in self._vocabulary
+
+    def segment_end(self, pos: int) -> int:
+        """Позиция ближайшей точки или перевода строки начиная с pos"""
+        i = bisect_left(self.segment_ends, pos)
+        return self.segment_ends[i] if i < len(self.segment_ends) else len(self.text)
+
+    def segment_occurrences(self, word: str) -> List[Tuple[int, int]]:
+        """Первое вхождение слова в каждом "предложении" как (начало, конец предложения).
+
+        Совпадает с re.findall(rf'\\b{word}\\b[^.\\n]*', text, re.IGNORECASE):
+        совпадение поглощает остаток предложения, поэтому следующие
+        вхождения в том же предложении не считаются.
+        """
+        result = []
+        last_end = -1
+        for pos in self.occurrences(word):
+            if pos < last_end:
+                continue
+            last_end = self.segment_end(pos)
+            result.append((pos, last_end))
+        return result